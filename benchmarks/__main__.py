@@ -0,0 +1,7 @@
+"""Run the benchmark suite with ``python -m benchmarks``."""
+
+import sys
+
+from .suite import main
+
+sys.exit(main())
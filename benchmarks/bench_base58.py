@@ -0,0 +1,65 @@
+"""Compare the built-in base58btc codec with the `base58` package.
+
+Run with ``python -m benchmarks.bench_base58``.
+"""
+
+import os
+
+from peerdid.core.multibase import (
+    decode_multibase_batch,
+    from_base58,
+    from_multibase,
+    to_base58,
+    to_multibase,
+)
+from peerdid.core.multicodec import Codec
+
+from .common import bench, report
+
+
+def main():
+    """Run the benchmark on 34-byte multicodec-prefixed keys."""
+    key = Codec.ED25519.encode_multicodec(os.urandom(32))
+    encoded = to_base58(key)
+
+    try:
+        import base58
+    except ImportError:
+        base58 = None
+
+    lib_decode = lib_encode = None
+    if base58:
+        lib_decode = bench("base58.b58decode", lambda: base58.b58decode(encoded))
+        lib_encode = bench("base58.b58encode", lambda: base58.b58encode(key))
+        report(lib_decode)
+        report(lib_encode)
+    else:
+        print("base58 package not installed, skipping comparison")
+    report(bench("from_base58", lambda: from_base58(encoded)), lib_decode)
+    report(bench("to_base58", lambda: to_base58(key)), lib_encode)
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("numpy not installed, skipping batch decoding")
+        return
+    count = 1000
+    values = [
+        to_multibase(Codec.ED25519.encode_multicodec(os.urandom(32)))
+        for _ in range(count)
+    ]
+    serial = bench(
+        "from_multibase x{}".format(count), lambda: list(map(from_multibase, values))
+    )
+    report(serial)
+    report(
+        bench(
+            "decode_multibase_batch x{}".format(count),
+            lambda: decode_multibase_batch(values, 34),
+        ),
+        serial,
+    )
+
+
+if __name__ == "__main__":
+    main()
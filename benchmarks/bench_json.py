@@ -0,0 +1,66 @@
+"""Compare the JSON backends on service-heavy Peer DIDs.
+
+Run with ``python -m benchmarks.bench_json``. The service caches are cleared
+before each call, so every call encodes or decodes its service.
+"""
+
+from functools import partial
+
+from peerdid.core import json_backend
+from peerdid.core.json_backend import JSONBackend, default_backend
+from peerdid.core.peer_did_helper import (
+    clear_service_caches,
+    decode_service_dicts,
+    encode_service,
+)
+from peerdid.dids import create_peer_did_numalgo_2, resolve_peer_did_json
+
+from .common import bench, report
+from .suite import encryption_keys, service, signing_keys
+
+
+def _uncached(func, *args):
+    def call():
+        clear_service_caches()
+        return func(*args)
+
+    return call
+
+
+def main():
+    """Run the benchmark."""
+    fast = default_backend()
+    if fast.name == JSONBackend.name:
+        print("no faster JSON backend installed, skipping comparison")
+        return
+    keys = encryption_keys(1), signing_keys(1)
+    for count in (1, 6):
+        svc = service(count)
+        encoded = encode_service(svc)[2:]
+        peer_did = create_peer_did_numalgo_2(*keys, svc)
+        text = json_backend.dumps_compact(svc)
+        cases = [
+            ("dumps_compact", partial(json_backend.dumps_compact, svc)),
+            ("loads", partial(json_backend.loads, text)),
+            ("encode_service", _uncached(encode_service, svc)),
+            ("decode_service_dicts", _uncached(decode_service_dicts, encoded)),
+            (
+                "create_peer_did_numalgo_2",
+                _uncached(create_peer_did_numalgo_2, *keys, svc),
+            ),
+            ("resolve_peer_did_json", _uncached(resolve_peer_did_json, peer_did)),
+        ]
+        for name, func in cases:
+            label = "{} services={}".format(name, count)
+            try:
+                json_backend.set_backend(JSONBackend())
+                baseline = bench(label + " (json)", func)
+                json_backend.set_backend(fast)
+                report(baseline)
+                report(bench("{} ({})".format(label, fast.name), func), baseline)
+            finally:
+                json_backend.set_backend(None)
+
+
+if __name__ == "__main__":
+    main()
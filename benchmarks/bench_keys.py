@@ -0,0 +1,58 @@
+"""Measure cached key encodings and key interning.
+
+Run with ``python -m benchmarks.bench_keys``.
+"""
+
+from peerdid.core.multibase import to_multibase
+from peerdid.dids import create_peer_did_numalgo_2, resolve_peer_did
+from peerdid.keys import (
+    BaseKey,
+    disable_key_interning,
+    enable_key_interning,
+)
+
+from .common import bench, report
+from .suite import encryption_keys, signing_keys
+
+MEDIATOR_KEY = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+
+
+def main():
+    """Run the benchmark."""
+    key = signing_keys(1)[0]
+    uncached = bench(
+        "multicodec + to_multibase",
+        lambda: to_multibase(key.codec.encode_multicodec(key.public_key)),
+    )
+    report(uncached)
+    report(bench("BaseKey.to_multibase (cached)", key.to_multibase), uncached)
+
+    # Peer DIDs sharing a key, as when many connections use the same mediator
+    peer_did = create_peer_did_numalgo_2(
+        encryption_keys(1) + [BaseKey.from_multibase(MEDIATOR_KEY)],
+        signing_keys(1),
+        None,
+    )
+    plain = bench("from_multibase", lambda: BaseKey.from_multibase(MEDIATOR_KEY))
+    plain_resolve = bench("resolve_peer_did", lambda: resolve_peer_did(peer_did))
+    enable_key_interning()
+    try:
+        report(plain)
+        report(
+            bench(
+                "from_multibase (interned)",
+                lambda: BaseKey.from_multibase(MEDIATOR_KEY),
+            ),
+            plain,
+        )
+        report(plain_resolve)
+        report(
+            bench("resolve_peer_did (interned)", lambda: resolve_peer_did(peer_did)),
+            plain_resolve,
+        )
+    finally:
+        disable_key_interning()
+
+
+if __name__ == "__main__":
+    main()
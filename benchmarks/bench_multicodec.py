@@ -0,0 +1,76 @@
+"""Compare multicodec prefix handling with the varint round trip it replaced.
+
+Run with ``python -m benchmarks.bench_multicodec``.
+"""
+
+import os
+
+import varint
+
+from peerdid.core.multibase import from_multibase
+from peerdid.core.multicodec import Codec, from_multicodec
+from peerdid.dids import resolve_peer_did
+
+from .common import bench, report
+
+PEER_DID = (
+    "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+    ".Vz6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+    ".Vz6MkgoLTnTypo3tDRwCkZXSccTPHRLhF4ZnjhueYAFpEX6vg"
+)
+
+
+def varint_from_multicodec(value):
+    """Decode a multicodec value the way earlier releases did."""
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    prefix_int = varint.decode_bytes(value)
+    codec = Codec(prefix_int)
+    prefix = varint.encode(prefix_int)
+    return value[len(prefix) :], codec
+
+
+def varint_encode_multicodec(codec, value):
+    """Encode a multicodec value the way earlier releases did."""
+    return varint.encode(codec.value) + value
+
+
+def main():
+    """Run the benchmark."""
+    public_key = os.urandom(32)
+    value = Codec.ED25519.encode_multicodec(public_key)
+    multibase = (
+        "z" + from_multibase("z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V")[0]
+    )
+
+    old = bench("varint from_multicodec", lambda: varint_from_multicodec(value))
+    report(old)
+    report(bench("from_multicodec", lambda: from_multicodec(value)), old)
+
+    old = bench(
+        "varint encode_multicodec",
+        lambda: varint_encode_multicodec(Codec.ED25519, public_key),
+    )
+    report(old)
+    report(
+        bench("encode_multicodec", lambda: Codec.ED25519.encode_multicodec(public_key)),
+        old,
+    )
+
+    old = bench(
+        "from_multibase + varint decode",
+        lambda: varint_from_multicodec(from_multibase(multibase)[1]),
+    )
+    report(old)
+    report(
+        bench(
+            "from_multibase + from_multicodec",
+            lambda: from_multicodec(from_multibase(multibase)[1]),
+        ),
+        old,
+    )
+    report(bench("resolve_peer_did (3 keys)", lambda: resolve_peer_did(PEER_DID)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Compare direct-to-JSON resolution with serializing the pydid model.
+
+Run with ``python -m benchmarks.bench_resolve_json``.
+"""
+
+from peerdid.dids import resolve_peer_did, resolve_peer_did_json
+from peerdid.keys import KeyFormat
+
+from .common import bench, report
+
+PEER_DID_NUMALGO_0 = "did:peer:0z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+PEER_DID_NUMALGO_2 = (
+    "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+    ".Vz6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+    ".Vz6MkgoLTnTypo3tDRwCkZXSccTPHRLhF4ZnjhueYAFpEX6vg"
+    ".SeyJ0IjoiZG0iLCJzIjoiaHR0cHM6Ly9leGFtcGxlLmNvbS9lbmRwb2ludCIsInIiOlsiZGlkOmV4YW1wbGU6c29tZW1lZGlhdG9yI3NvbWVrZXkiXSwiYSI6WyJkaWRjb21tL3YyIiwiZGlkY29tbS9haXAyO2Vudj1yZmM1ODciXX0"
+)
+
+
+def main():
+    """Run the benchmark."""
+    for name, peer_did in (
+        ("numalgo 0", PEER_DID_NUMALGO_0),
+        ("numalgo 2", PEER_DID_NUMALGO_2),
+    ):
+        for format in KeyFormat:
+            label = "{} {}".format(name, format.name)
+            model = bench(
+                "resolve_peer_did().to_json() " + label,
+                lambda: resolve_peer_did(peer_did, format).to_json(),
+            )
+            report(model)
+            report(
+                bench(
+                    "resolve_peer_did_json() " + label,
+                    lambda: resolve_peer_did_json(peer_did, format),
+                ),
+                model,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Worst-case latency of Peer DID validation on adversarial input.
+
+Run with ``python -m benchmarks.bench_validation``.
+
+Each input is validated with the legacy regular expression, with the parser
+without limits, and with the parser under the default limits, for growing
+input sizes. Parser times grow linearly without limits, and stay flat once
+the limits reject the input up front.
+"""
+
+from peerdid.dids import PEER_DID_PATTERN, PeerDIDLimits, is_peer_did
+
+from .common import bench, report
+
+UNLIMITED = PeerDIDLimits(None, None, None)
+KEY = ".Vz6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+
+
+def adversarial_inputs(size: int):
+    """Generate adversarial inputs of roughly `size` characters."""
+    yield "many keys", "did:peer:2" + KEY * (size // len(KEY))
+    yield "many keys, invalid tail", "did:peer:2" + KEY * (size // len(KEY)) + "!"
+    yield "long key", "did:peer:2.Vz" + "6" * size
+    yield "long key, invalid tail", "did:peer:2.Vz" + "6" * size + "0"
+    yield "empty elements", "did:peer:2" + ".Vz6" + "." * size
+    yield "long service", "did:peer:2" + KEY + ".S" + "a" * size
+    yield "long service, invalid tail", "did:peer:2" + KEY + ".S" + "a" * size + "_"
+
+
+def main():
+    """Run the benchmark."""
+    for size in (1_000, 10_000, 100_000):
+        for name, value in adversarial_inputs(size):
+            label = "{} ({} chars)".format(name, size)
+            report(bench("regex " + label, lambda: PEER_DID_PATTERN.match(value)))
+            report(bench("parser " + label, lambda: is_peer_did(value, UNLIMITED)))
+            report(bench("parser+limits " + label, lambda: is_peer_did(value)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark helpers."""
+
+import json
+import platform
+import sys
+import time
+import timeit
+
+from typing import Callable, Dict, Iterable, NamedTuple
+
+import peerdid
+
+BenchResult = NamedTuple(
+    "BenchResult",
+    [
+        ("name", str),
+        ("loops", int),
+        ("best_us", float),
+        ("mean_us", float),
+    ],
+)
+
+
+def bench(name: str, func: Callable[[], object], repeat: int = 5) -> BenchResult:
+    """Time a callable, reporting the per-call time in microseconds."""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    times = [t / loops * 1e6 for t in timer.repeat(repeat=repeat, number=loops)]
+    return BenchResult(name, loops, min(times), sum(times) / len(times))
+
+
+def report(result: BenchResult, baseline: BenchResult = None):
+    """Print a benchmark result, with the speedup relative to a baseline."""
+    line = "{:<52} {:>10.3f} us/op".format(result.name, result.best_us)
+    if baseline:
+        line += "  ({:.2f}x)".format(baseline.best_us / result.best_us)
+    print(line)
+
+
+def save_results(path: str, results: Iterable[BenchResult]):
+    """Write benchmark results to a JSON file, along with the environment."""
+    data = {
+        "peerdid": peerdid.__version__,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": [result._asdict() for result in results],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, BenchResult]:
+    """Read benchmark results written by `save_results`, keyed by name."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {entry["name"]: BenchResult(**entry) for entry in data["results"]}
@@ -0,0 +1,371 @@
+"""Benchmark suite for Peer DID creation, resolution and the codecs beneath them.
+
+Run with ``python -m benchmarks``. Use ``--json`` to save the results and
+``--baseline`` to compare against previously saved results, for instance::
+
+    python -m benchmarks --json before.json
+    python -m benchmarks --baseline before.json --max-regression 0.1
+
+Cases bind their inputs with `functools.partial` rather than closures, since
+they are generated in loops. Inputs are derived deterministically, so results of different runs are
+comparable case by case.
+"""
+
+import argparse
+import hashlib
+import re
+
+from functools import partial
+
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+from peerdid.batch import extract_keys_batch
+from peerdid.core.curves import CURVES, clear_point_cache, decompress_point
+from peerdid.core.jwk_okp import jwk_to_public_key, public_key_to_jwk
+from peerdid.core.multibase import from_base58, from_multibase, to_base58, to_multibase
+from peerdid.core.multicodec import Codec, codec_info, from_multicodec
+from peerdid.core.peer_did_helper import (
+    clear_service_caches,
+    decode_service,
+    encode_service,
+)
+from peerdid.dids import (
+    create_peer_did_numalgo_0,
+    create_peer_did_numalgo_2,
+    extract_keys,
+    peek_services,
+    resolve_peer_did,
+    resolve_peer_did_formats,
+    resolve_peer_did_json,
+)
+from peerdid.keys import (
+    BaseKey,
+    Ed25519VerificationKey,
+    KeyFormat,
+    KeyRelationshipType,
+    P256VerificationKey,
+    Secp256k1VerificationKey,
+    X25519KeyAgreementKey,
+)
+
+from .common import BenchResult, bench, load_results, report, save_results
+
+Case = Tuple[str, Callable[[], object]]
+
+KEY_COUNTS = (1, 4, 16)
+
+
+def public_key(seed: str) -> bytes:
+    """Derive a stable 32-byte public key from a seed."""
+    return hashlib.sha256(seed.encode()).digest()
+
+
+def compressed_point(curve_name: str, seed: str) -> bytes:
+    """Derive a stable compressed point on an EC curve from a seed."""
+    curve = CURVES[curve_name]
+    counter = 0
+    while True:
+        point = b"\x02" + public_key("{}{}".format(seed, counter))
+        try:
+            decompress_point(curve, point)
+            return point
+        except ValueError:
+            # about half of the x coordinates are not on the curve
+            counter += 1
+
+
+def codec_public_key(codec: Codec, seed: str) -> bytes:
+    """Derive a stable public key valid for a codec from a seed."""
+    info = codec_info(codec)
+    if info.kty == "EC":
+        return compressed_point(info.crv, seed)
+    return public_key(seed)
+
+
+def signing_keys(count: int) -> List[BaseKey]:
+    """Ed25519 keys for creating Peer DIDs."""
+    return [Ed25519VerificationKey(public_key("sig{}".format(i))) for i in range(count)]
+
+
+def encryption_keys(count: int) -> List[BaseKey]:
+    """X25519 keys for creating Peer DIDs."""
+    return [X25519KeyAgreementKey(public_key("enc{}".format(i))) for i in range(count)]
+
+
+def service(count: int):
+    """A DIDComm messaging service, or a list of `count` of them."""
+    if not count:
+        return None
+    entries = [
+        {
+            "type": "DIDCommMessaging",
+            "serviceEndpoint": "https://mediator{}.example.com/endpoint".format(i),
+            "routingKeys": [
+                "did:example:mediator{}#key-{}".format(i, k) for k in range(3)
+            ],
+            "accept": ["didcomm/v2", "didcomm/aip2;env=rfc587"],
+        }
+        for i in range(count)
+    ]
+    return entries[0] if count == 1 else entries
+
+
+# "large" stays within the default service length limit of parse_peer_did
+SERVICES = (("none", 0), ("small", 1), ("large", 6))
+
+
+def cases() -> Iterator[Case]:
+    """Generate every benchmark case."""
+    yield from codec_cases()
+    yield from service_cases()
+    yield from create_cases()
+    yield from resolve_cases()
+    yield from ec_jwk_cases()
+    yield from format_cases()
+    yield from peek_cases()
+    yield from extract_cases()
+
+
+def codec_cases() -> Iterator[Case]:
+    """Key encodings: base58, multibase, multicodec and JWK."""
+    for codec in Codec:
+        raw = codec_public_key(codec, "codec")
+        prefixed = codec.encode_multicodec(raw)
+        encoded = to_base58(prefixed)
+        multibase = to_multibase(prefixed)
+        jwk = public_key_to_jwk(raw, codec)
+        label = codec.name.lower()
+        yield "codec to_base58 " + label, partial(to_base58, prefixed)
+        yield "codec from_base58 " + label, partial(from_base58, encoded)
+        yield "codec to_multibase " + label, partial(to_multibase, prefixed)
+        yield "codec from_multibase " + label, partial(from_multibase, multibase)
+        yield "codec encode_multicodec " + label, partial(codec.encode_multicodec, raw)
+        yield "codec from_multicodec " + label, partial(from_multicodec, prefixed)
+        yield "codec public_key_to_jwk " + label, partial(public_key_to_jwk, raw, codec)
+        yield "codec jwk_to_public_key " + label, partial(_jwk_to_public_key, jwk)
+
+
+def _jwk_to_public_key(jwk: dict):
+    # jwk_to_public_key consumes the dict it is given
+    return jwk_to_public_key(dict(jwk))
+
+
+def service_cases() -> Iterator[Case]:
+    """Service encoding and decoding."""
+    for label, count in SERVICES[1:]:
+        value = service(count)
+        encoded = encode_service(value)[2:]
+        yield "service encode " + label, partial(encode_service, value)
+        yield "service decode " + label, partial(decode_service, encoded)
+
+
+def create_cases() -> Iterator[Case]:
+    """Peer DID creation."""
+    inception_key = signing_keys(1)[0]
+    yield "create numalgo 0", partial(create_peer_did_numalgo_0, inception_key)
+    for count in KEY_COUNTS:
+        for label, service_count in SERVICES:
+            enc, sig, svc = (
+                encryption_keys(count),
+                signing_keys(count),
+                service(service_count),
+            )
+            yield "create numalgo 2 keys={}x2 service={}".format(count, label), partial(
+                create_peer_did_numalgo_2, enc, sig, svc
+            )
+
+
+def resolve_cases() -> Iterator[Case]:
+    """Peer DID resolution, in every key format."""
+    dids = [("numalgo 0", create_peer_did_numalgo_0(signing_keys(1)[0]))]
+    for count in KEY_COUNTS:
+        for label, service_count in SERVICES:
+            dids.append(
+                (
+                    "numalgo 2 keys={}x2 service={}".format(count, label),
+                    create_peer_did_numalgo_2(
+                        encryption_keys(count),
+                        signing_keys(count),
+                        service(service_count),
+                    ),
+                )
+            )
+    for format in KeyFormat:
+        for label, peer_did in dids:
+            yield "resolve {} {}".format(format.name.lower(), label), partial(
+                resolve_peer_did, peer_did, format
+            )
+
+
+def ec_jwk_cases() -> Iterator[Case]:
+    """JWK-format resolution of EC keys, with cold and warm point caches.
+
+    EC keys are held compressed, so JWK output decompresses them; cold cases
+    empty the cache of decompressed points before each resolution.
+    """
+    for key_type in (P256VerificationKey, Secp256k1VerificationKey):
+        for count in KEY_COUNTS:
+            keys = [
+                key_type(codec_public_key(key_type.codec, "ec{}".format(i)))
+                for i in range(count)
+            ]
+            peer_did = create_peer_did_numalgo_2(encryption_keys(1), keys, None)
+            label = "{} keys={}".format(key_type.codec.name.lower(), count)
+            yield "resolve jwk cold " + label, partial(_resolve_cold, peer_did)
+            yield "resolve jwk warm " + label, partial(
+                resolve_peer_did, peer_did, KeyFormat.JWK
+            )
+
+
+def _resolve_cold(peer_did: str):
+    clear_point_cache()
+    return resolve_peer_did(peer_did, KeyFormat.JWK)
+
+
+def format_cases() -> Iterator[Case]:
+    """Resolution in every key format, decoding the Peer DID once or per format."""
+    for count in KEY_COUNTS:
+        peer_did = create_peer_did_numalgo_2(
+            encryption_keys(count), signing_keys(count), service(1)
+        )
+        label = "keys={}x2 service=small".format(count)
+        yield "resolve formats separately " + label, partial(
+            _resolve_formats_separately, resolve_peer_did, peer_did
+        )
+        yield "resolve formats decoded once " + label, partial(
+            _resolve_formats_once, "document", peer_did
+        )
+        yield "resolve_json formats separately " + label, partial(
+            _resolve_formats_separately, resolve_peer_did_json, peer_did
+        )
+        yield "resolve_json formats decoded once " + label, partial(
+            _resolve_formats_once, "document_json", peer_did
+        )
+
+
+def _resolve_formats_separately(resolve: Callable, peer_did: str):
+    return [resolve(peer_did, format) for format in KeyFormat]
+
+
+def _resolve_formats_once(render: str, peer_did: str):
+    resolved = resolve_peer_did_formats(peer_did)
+    return [getattr(resolved, render)(format) for format in KeyFormat]
+
+
+def peek_cases() -> Iterator[Case]:
+    """Service endpoint lookup, against the full resolution it replaces for routing."""
+    for count in KEY_COUNTS:
+        for label, service_count in SERVICES[1:]:
+            peer_did = create_peer_did_numalgo_2(
+                encryption_keys(count), signing_keys(count), service(service_count)
+            )
+            label = "numalgo 2 keys={}x2 service={}".format(count, label)
+            yield "peek_services cold " + label, partial(_peek_cold, peer_did)
+            yield "peek_services warm " + label, partial(peek_services, peer_did)
+            yield "peek resolve_peer_did " + label, partial(resolve_peer_did, peer_did)
+
+
+def _peek_cold(peer_did: str):
+    clear_service_caches()
+    return peek_services(peer_did)
+
+
+def extract_cases() -> Iterator[Case]:
+    """Raw key extraction, against the full resolution it replaces for crypto."""
+    for count in KEY_COUNTS:
+        peer_did = create_peer_did_numalgo_2(
+            encryption_keys(count), signing_keys(count), service(1)
+        )
+        label = "numalgo 2 keys={}x2".format(count)
+        yield "extract_keys " + label, partial(extract_keys, peer_did)
+        yield "extract resolve_peer_did " + label, partial(resolve_peer_did, peer_did)
+    peer_dids = [
+        create_peer_did_numalgo_2(
+            [X25519KeyAgreementKey(public_key("batch-enc{}".format(i)))],
+            [Ed25519VerificationKey(public_key("batch-sig{}".format(i)))],
+            service(1),
+        )
+        for i in range(100)
+    ]
+    yield "extract_keys_batch 100 dids", partial(
+        extract_keys_batch, peer_dids, KeyRelationshipType.KEY_AGREEMENT
+    )
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return
+    yield "extract_keys_batch 100 dids array", partial(
+        extract_keys_batch, peer_dids, KeyRelationshipType.KEY_AGREEMENT, as_array=True
+    )
+
+
+def run(
+    selected: Sequence[Case], repeat: int, baseline: dict, max_regression: float
+) -> Tuple[List[BenchResult], List[str]]:
+    """Run benchmark cases, reporting each against the baseline if present."""
+    results = []
+    regressions = []
+    for name, func in selected:
+        result = bench(name, func, repeat=repeat)
+        previous = baseline.get(name)
+        report(result, previous)
+        results.append(result)
+        if (
+            previous
+            and max_regression is not None
+            and result.best_us > previous.best_us * (1 + max_regression)
+        ):
+            regressions.append(name)
+    return results, regressions
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the peerdid benchmark suite."
+    )
+    parser.add_argument("--json", metavar="FILE", help="write results to a JSON file")
+    parser.add_argument(
+        "--baseline", metavar="FILE", help="compare with results saved by --json"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        metavar="RATIO",
+        help="exit with status 1 if a case is slower than the baseline by more "
+        "than this ratio, e.g. 0.1 for 10%%",
+    )
+    parser.add_argument(
+        "-k",
+        "--filter",
+        metavar="REGEX",
+        help="only run cases whose name matches this regular expression",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of timing repetitions"
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="list the cases without running them"
+    )
+    args = parser.parse_args(argv)
+
+    selected = list(cases())
+    if args.filter:
+        pattern = re.compile(args.filter)
+        selected = [case for case in selected if pattern.search(case[0])]
+    if args.list:
+        for name, _ in selected:
+            print(name)
+        return 0
+
+    baseline = load_results(args.baseline) if args.baseline else {}
+    results, regressions = run(selected, args.repeat, baseline, args.max_regression)
+    if args.json:
+        save_results(args.json, results)
+    if regressions:
+        print("\n{} case(s) regressed:".format(len(regressions)))
+        for name in regressions:
+            print("  " + name)
+        return 1
+    return 0
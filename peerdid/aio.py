@@ -0,0 +1,99 @@
+"""Asynchronous Peer DID resolution."""
+
+import asyncio
+import pickle
+
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, Optional, Tuple, Union
+
+from pydid import DID, DIDDocument
+
+from .cache import ResolutionCache
+from .dids import resolve_peer_did
+from .keys import KeyFormat
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncPeerDIDResolver:
+    """
+    Resolve Peer DIDs without blocking the event loop.
+
+    Resolution runs on an executor (the event loop's default executor unless one
+    is provided). Concurrent requests for the same Peer DID and key format share
+    a single resolution, and at most `max_concurrency` resolutions are submitted
+    to the executor at a time. An instance is meant to be used from a single
+    event loop.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[ResolutionCache] = None,
+    ):
+        """Initializer.
+
+        :param executor: the executor to run resolution on
+        :param max_concurrency: the maximum number of resolutions in progress
+        :param cache: a resolution cache to consult, when using a thread executor
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.resolved = 0
+        self.coalesced = 0
+        self._pending: Dict[Tuple[str, KeyFormat], asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def in_flight(self) -> int:
+        """The number of distinct resolutions currently in progress."""
+        return len(self._pending)
+
+    async def resolve(
+        self,
+        peer_did: Union[str, DID],
+        format: KeyFormat = KeyFormat.MULTIBASE,
+    ) -> DIDDocument:
+        """
+        Resolve a DID Document from a Peer DID.
+
+        :param peer_did: Peer DID to resolve
+        :param format: the format of public keys in the DID Document
+        :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        :return: resolved DID Document
+        """
+        key = (str(peer_did), format)
+        task = self._pending.get(key)
+        if task is not None:
+            self.coalesced += 1
+            did_doc = await asyncio.shield(task)
+            # every caller must receive an independent document
+            return pickle.loads(pickle.dumps(did_doc, pickle.HIGHEST_PROTOCOL))
+
+        task = asyncio.ensure_future(self._resolve(*key))
+        self._pending[key] = task
+        task.add_done_callback(partial(self._done, key))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Tuple[str, KeyFormat], task: asyncio.Future):
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            # mark the exception retrieved, in case every caller was cancelled
+            task.exception()
+
+    async def _resolve(self, peer_did: str, format: KeyFormat) -> DIDDocument:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        resolve = self.cache.resolve if self.cache else resolve_peer_did
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            did_doc = await loop.run_in_executor(
+                self.executor, partial(resolve, peer_did, format)
+            )
+        self.resolved += 1
+        return did_doc
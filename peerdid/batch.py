@@ -0,0 +1,296 @@
+"""Bulk Peer DID resolution."""
+
+import os
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    wait,
+)
+from functools import partial
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from pydid import DID, DIDDocument
+
+from .core.multicodec import AnyCodec
+from .dids import PeerDIDLimits, extract_keys, resolve_peer_did
+from .keys import KeyFormat, KeyRelationshipType
+from .store import ShortFormStore
+
+DEFAULT_CHUNK_SIZE = 256
+
+BatchResult = NamedTuple(
+    "BatchResult",
+    [
+        ("index", int),
+        ("peer_did", str),
+        ("document", Optional[DIDDocument]),
+        ("error", Optional[Exception]),
+    ],
+)
+
+KeyBatch = NamedTuple(
+    "KeyBatch",
+    [
+        # a bytearray, a NumPy array or the buffer given
+        ("keys", Any),
+        ("offsets", List[int]),
+        ("codecs", List[AnyCodec]),
+        ("errors", List[Optional[Exception]]),
+    ],
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_peer_dids(
+    peer_dids: Iterable[Union[str, DID]],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[BatchResult]:
+    """
+    Resolve many Peer DIDs, yielding results as they become available.
+
+    The input is consumed lazily in chunks of `chunk_size`, and at most
+    `max_pending` chunks are in flight at once, so memory use is bounded
+    regardless of the size of the input. A Peer DID which fails to resolve
+    produces a result carrying the error instead of interrupting the batch.
+
+    :param peer_dids: Peer DIDs to resolve
+    :param format: the format of public keys in the DID Documents
+    :param workers: the number of worker processes, defaults to the CPU count;
+        0 or 1 resolves serially in the calling thread
+    :param chunk_size: the number of Peer DIDs sent to a worker at once
+    :param ordered: yield results in input order, otherwise in completion order
+    :param max_pending: the maximum number of chunks in flight, defaults to twice
+        the number of workers
+    :param executor: an existing executor to use instead of a new process pool
+    :return: an iterator of BatchResult entries
+    """
+    numbered = ((index, str(peer_did)) for index, peer_did in enumerate(peer_dids))
+    yield from map_chunked(
+        partial(_resolve_chunk, format),
+        numbered,
+        workers=workers,
+        chunk_size=chunk_size,
+        ordered=ordered,
+        max_pending=max_pending,
+        executor=executor,
+    )
+
+
+def extract_keys_batch(
+    peer_dids: Sequence[Union[str, DID]],
+    relationship: KeyRelationshipType,
+    key_length: int = 32,
+    out=None,
+    as_array: bool = False,
+    limits: PeerDIDLimits = None,
+    store: ShortFormStore = None,
+) -> KeyBatch:
+    """
+    Extract the raw public keys of a relationship from many Peer DIDs into one buffer.
+
+    The keys of all Peer DIDs are laid out contiguously, one row of `key_length`
+    bytes per key: the rows of `peer_dids[i]` are `offsets[i]` to `offsets[i + 1]`.
+    A Peer DID which fails to extract, or holds a key of another length, has no
+    rows and its error is reported instead of interrupting the batch.
+
+    :param peer_dids: Peer DIDs to extract the keys of
+    :param relationship: the relationship of the keys to extract
+    :param key_length: the length of the keys, such as 32 for Ed25519 and X25519
+    :param out: a writable, C-contiguous buffer to fill, such as a bytearray or a
+        NumPy array, instead of a new one
+    :param as_array: return a new (N, key_length) uint8 NumPy array instead of
+        a bytearray, when no buffer is given
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :param store: the store of long forms of short-form Peer DIDs, defaults to
+        get_default_store()
+    :raises ValueError: if `out` is too small for the keys extracted
+    :raises ImportError: if as_array is set and NumPy is not installed
+    :return: the buffer filled (`out` if given), the row offsets of each Peer DID,
+        the codec of each row and the error of each Peer DID
+    """
+    rows = []
+    offsets = [0]
+    codecs = []
+    errors = []
+    for peer_did in peer_dids:
+        try:
+            keys = [
+                key
+                for key in extract_keys(peer_did, limits, store)
+                if key.relationship == relationship
+            ]
+            for key in keys:
+                if len(key.public_key) != key_length:
+                    raise ValueError(
+                        "Invalid public key, expected {} bytes".format(key_length)
+                    )
+        except Exception as e:
+            keys = ()
+            errors.append(e)
+        else:
+            errors.append(None)
+        rows.extend(key.public_key for key in keys)
+        codecs.extend(key.codec for key in keys)
+        offsets.append(len(rows))
+
+    size = len(rows) * key_length
+    if out is not None:
+        keys = out
+        view = memoryview(out)
+        if view.nbytes and (view.ndim != 1 or view.format != "B"):
+            view = view.cast("B")
+        if view.nbytes < size:
+            raise ValueError(
+                "Buffer too small: {} keys need {} bytes".format(len(rows), size)
+            )
+    elif as_array:
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("extract_keys_batch requires numpy") from None
+        flat = np.empty(size, np.uint8)
+        view = memoryview(flat)
+        keys = flat.reshape(len(rows), key_length)
+    else:
+        keys = view = bytearray(size)
+    # each key is copied once, into its row
+    for start, public_key in zip(range(0, size, key_length), rows):
+        view[start : start + key_length] = public_key
+    return KeyBatch(keys, offsets, codecs, errors)
+
+
+def map_chunked(
+    func: Callable[[List[T]], Iterable[R]],
+    items: Iterable[T],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[R]:
+    """
+    Apply a function to chunks of items on a pool of worker processes.
+
+    This is the pipeline behind `resolve_peer_dids`. `func` receives a list of
+    up to `chunk_size` items and returns the results for that chunk; it must be
+    picklable when a process pool is used. Results are yielded as chunks
+    complete, with at most `max_pending` chunks in flight.
+
+    :param func: the function applied to each chunk
+    :param items: the items to process
+    :param workers: the number of worker processes, defaults to the CPU count;
+        0 or 1 processes serially in the calling thread
+    :param chunk_size: the number of items sent to a worker at once
+    :param ordered: yield results in input order, otherwise in completion order
+    :param max_pending: the maximum number of chunks in flight, defaults to twice
+        the number of workers
+    :param executor: an existing executor to use instead of a new process pool
+    :return: an iterator of the results of every chunk
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    chunks = _chunked(items, chunk_size)
+
+    if executor is not None:
+        yield from _map_pooled(
+            executor, func, chunks, ordered, max_pending or 2 * (workers or 1)
+        )
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (ImportError, NotImplementedError, OSError):
+        # multiprocessing is unavailable on this platform
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+    with pool:
+        yield from _map_pooled(pool, func, chunks, ordered, max_pending or 2 * workers)
+
+
+def _chunked(items: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _resolve_chunk(
+    format: KeyFormat, chunk: List[Tuple[int, str]]
+) -> List[BatchResult]:
+    results = []
+    for index, peer_did in chunk:
+        try:
+            results.append(
+                BatchResult(index, peer_did, resolve_peer_did(peer_did, format), None)
+            )
+        except Exception as e:
+            results.append(BatchResult(index, peer_did, None, e))
+    return results
+
+
+def _map_pooled(
+    executor: Executor,
+    func: Callable[[List[T]], Iterable[R]],
+    chunks: Iterator[List[T]],
+    ordered: bool,
+    max_pending: int,
+) -> Iterator[R]:
+    pending = deque()
+
+    def submit() -> bool:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        pending.append(executor.submit(func, chunk))
+        return True
+
+    try:
+        while len(pending) < max_pending and submit():
+            pass
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [fut for fut in pending if fut in finished]
+                for fut in done:
+                    pending.remove(fut)
+            for fut in done:
+                submit()
+                yield from fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
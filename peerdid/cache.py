@@ -0,0 +1,99 @@
+"""Peer DID resolution caching."""
+
+import pickle
+
+from typing import Optional, Union
+
+from pydid import DID, DIDDocument
+
+from .core.lru import CacheStats, LRUCache
+from .dids import resolve_peer_did
+from .errors import MalformedPeerDIDError
+from .keys import KeyFormat
+
+
+class ResolutionCache:
+    """
+    Bounded, thread-safe cache of resolved DID Documents.
+
+    Peer DIDs are immutable, so a document resolved once for a given key format
+    can be served again without repeating the decoding. Documents are stored
+    pickled: each hit returns a fresh copy, so callers cannot alter the cached
+    entry by mutating the result.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        cache_errors: bool = False,
+        max_errors: Optional[int] = None,
+    ):
+        """Initializer.
+
+        :param max_entries: maximum number of cached documents
+        :param max_bytes: maximum total size of the cached (pickled) documents
+        :param cache_errors: also remember peer DIDs which failed to resolve
+        :param max_errors: maximum number of remembered failures, defaults to max_entries
+        """
+        self._documents = LRUCache(max_entries, max_bytes)
+        self._errors = LRUCache(max_errors or max_entries) if cache_errors else None
+
+    def resolve(
+        self,
+        peer_did: Union[str, DID],
+        format: KeyFormat = KeyFormat.MULTIBASE,
+    ) -> DIDDocument:
+        """
+        Resolve a DID Document from a Peer DID, using the cache where possible.
+
+        :param peer_did: Peer DID to resolve
+        :param format: the format of public keys in the DID Document
+        :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        :return: resolved DID Document
+        """
+        key = (str(peer_did), format)
+        cached = self._documents.get(key)
+        if cached is not None:
+            return pickle.loads(cached)
+        if self._errors is not None:
+            error = self._errors.get(key)
+            if error is not None:
+                # a fresh instance per hit: concurrent callers must not share
+                # one exception and its accumulated traceback
+                error_type, args = error
+                raise error_type(*args)
+
+        try:
+            did_doc = resolve_peer_did(peer_did, format)
+        except MalformedPeerDIDError as e:
+            if self._errors is not None:
+                self._errors.put(key, e.__reduce__())
+            raise
+        cached = pickle.dumps(did_doc, pickle.HIGHEST_PROTOCOL)
+        self._documents.put(key, cached, len(cached))
+        return did_doc
+
+    def invalidate(self, peer_did: Union[str, DID]):
+        """Drop any cached entries for a Peer DID."""
+        for format in KeyFormat:
+            key = (str(peer_did), format)
+            self._documents.discard(key)
+            if self._errors is not None:
+                self._errors.discard(key)
+
+    def clear(self):
+        """Drop all cached entries and reset the counters."""
+        self._documents.clear()
+        if self._errors is not None:
+            self._errors.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Counters for the document cache."""
+        return self._documents.stats()
+
+    @property
+    def error_stats(self) -> Optional[CacheStats]:
+        """Counters for the negative cache, if enabled."""
+        return self._errors.stats() if self._errors is not None else None
@@ -0,0 +1,265 @@
+"""Command-line tool for bulk Peer DID processing.
+
+Input is read line by line from files or stdin. A line is either a bare value
+(a Peer DID for `validate` and `resolve`, a multibase inception key for
+`create`) or a JSON object. One JSON object is written per input line::
+
+    peerdid validate dids.txt > report.ndjson
+    peerdid resolve --format base58 --workers 8 < dids.ndjson > docs.ndjson
+    peerdid create keys.ndjson -o dids.ndjson
+
+`create` accepts `{"inception_key": key}` for numalgo 0, and
+`{"encryption_keys": [...], "signing_keys": [...], "service": ...}` for
+numalgo 2, where keys are multibase strings or JWK objects.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from collections import Counter
+from functools import partial
+from typing import IO, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .batch import DEFAULT_CHUNK_SIZE, map_chunked
+from .core import json_backend
+from .dids import (
+    create_peer_did_numalgo_0,
+    create_peer_did_numalgo_2,
+    parse_peer_did,
+    resolve_peer_did_json,
+)
+from .keys import BaseKey, KeyFormat
+
+LineResult = NamedTuple(
+    "LineResult",
+    [("record", str), ("error", Optional[str])],
+)
+
+_KEY_FORMATS = {
+    "multibase": KeyFormat.MULTIBASE,
+    "base58": KeyFormat.BASE58,
+    "jwk": KeyFormat.JWK,
+}
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Run the `peerdid` command.
+
+    :param argv: command-line arguments, defaults to `sys.argv[1:]`
+    :return: the exit status
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    process = partial(
+        _process_chunk, args.command, _KEY_FORMATS[getattr(args, "format", "multibase")]
+    )
+    inputs: List[IO[str]] = []
+    try:
+        for path in args.inputs:
+            inputs.append(sys.stdin if path == "-" else open(path, encoding="utf-8"))
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    except OSError as e:
+        _close(inputs)
+        parser.error(str(e))
+    total = 0
+    errors = Counter()
+    started = time.perf_counter()
+    try:
+        for result in map_chunked(
+            process,
+            _read_lines(inputs),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            ordered=not args.unordered,
+            max_pending=args.max_pending,
+        ):
+            total += 1
+            if result.error:
+                errors[result.error] += 1
+            output.write(result.record)
+            output.write("\n")
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        _close(inputs)
+        if output is not sys.stdout:
+            output.close()
+        else:
+            output.flush()
+    if not args.quiet:
+        _print_summary(total, errors, time.perf_counter() - started)
+    return 1 if errors and args.fail_on_error else 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        metavar="FILE",
+        help="input files, '-' or none for stdin",
+    )
+    common.add_argument("-o", "--output", help="output file, defaults to stdout")
+    common.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes, defaults to the CPU count",
+    )
+    common.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="number of lines sent to a worker at once",
+    )
+    common.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="maximum number of chunks in flight",
+    )
+    common.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write results in completion order rather than input order",
+    )
+    common.add_argument(
+        "--fail-on-error",
+        action="store_true",
+        help="exit with status 1 if any line failed",
+    )
+    common.add_argument(
+        "-q", "--quiet", action="store_true", help="do not print a summary"
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="peerdid", description="Bulk Peer DID processing."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    commands.add_parser(
+        "validate", parents=[common], help="check that each line is a valid Peer DID"
+    )
+    resolve = commands.add_parser(
+        "resolve", parents=[common], help="resolve each Peer DID to a DID Document"
+    )
+    resolve.add_argument(
+        "--format",
+        choices=sorted(_KEY_FORMATS),
+        default="multibase",
+        help="the format of public keys in the DID Documents",
+    )
+    commands.add_parser(
+        "create", parents=[common], help="create a Peer DID from each key set"
+    )
+    return parser
+
+
+def _read_lines(streams: Sequence[IO[str]]) -> Iterator[Tuple[int, str]]:
+    line_no = 0
+    for stream in streams:
+        for line in stream:
+            line_no += 1
+            line = line.strip()
+            if line:
+                yield line_no, line
+
+
+def _close(streams: Sequence[IO[str]]):
+    for stream in streams:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _process_chunk(
+    command: str, format: KeyFormat, chunk: List[Tuple[int, str]]
+) -> List[LineResult]:
+    handler = _HANDLERS[command]
+    results = []
+    for line_no, line in chunk:
+        record = {"line": line_no}
+        error = None
+        try:
+            value = json_backend.loads(line) if line.startswith("{") else line
+            record.update(handler(value, format))
+        except Exception as e:
+            error = type(e).__name__
+            record["input"] = line
+            if command == "validate":
+                record["valid"] = False
+            record["error"] = str(e)
+        if command == "resolve" and "document" in record:
+            # the document is already serialized, splice it in unparsed
+            document = record.pop("document")
+            text = json.dumps(record)[:-1] + ', "document": ' + document + "}"
+        else:
+            text = json.dumps(record)
+        results.append(LineResult(text, error))
+    return results
+
+
+def _validate(value, format: KeyFormat) -> dict:
+    peer_did = _peer_did(value)
+    parse_peer_did(peer_did)
+    return {"did": peer_did, "valid": True}
+
+
+def _resolve(value, format: KeyFormat) -> dict:
+    peer_did = _peer_did(value)
+    return {"did": peer_did, "document": resolve_peer_did_json(peer_did, format)}
+
+
+def _create(value, format: KeyFormat) -> dict:
+    if isinstance(value, str):
+        value = {"inception_key": value}
+    if not isinstance(value, dict):
+        raise ValueError("Expected a JSON object")
+    if "inception_key" in value:
+        return {"did": create_peer_did_numalgo_0(_load_key(value["inception_key"]))}
+    return {
+        "did": create_peer_did_numalgo_2(
+            encryption_keys=[_load_key(k) for k in value.get("encryption_keys", ())],
+            signing_keys=[_load_key(k) for k in value.get("signing_keys", ())],
+            service=value.get("service"),
+        )
+    }
+
+
+def _peer_did(value) -> str:
+    if isinstance(value, dict):
+        value = value.get("did")
+    if not isinstance(value, str):
+        raise ValueError("Expected a Peer DID or a JSON object with a 'did' property")
+    return value
+
+
+def _load_key(value) -> BaseKey:
+    if isinstance(value, dict):
+        return BaseKey.from_jwk(value)
+    if isinstance(value, str):
+        return BaseKey.from_multibase(value)
+    raise ValueError("Expected a multibase string or a JWK object")
+
+
+_HANDLERS = {"validate": _validate, "resolve": _resolve, "create": _create}
+
+
+def _print_summary(total: int, errors: Counter, elapsed: float):
+    rate = total / elapsed if elapsed > 0 else 0.0
+    failed = sum(errors.values())
+    print(
+        "{} lines, {} ok, {} failed in {:.2f}s ({:.0f} lines/s)".format(
+            total, total - failed, failed, elapsed, rate
+        ),
+        file=sys.stderr,
+    )
+    for name, count in errors.most_common():
+        print("  {:>10}  {}".format(count, name), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Structural checks of Ed25519 and X25519 public keys."""
+
+# the field of both curves
+P = 2**255 - 19
+# the Ed25519 curve constant, -121665/121666
+D = -121665 * pow(121666, P - 2, P) % P
+SQRT_M1 = pow(2, (P - 1) // 4, P)
+
+# u-coordinates of the X25519 points of order 1, 2, 4 and 8
+X25519_SMALL_ORDER = frozenset(
+    (
+        0,
+        1,
+        P - 1,
+        0x00B8495F16056286FDB1329CEB8D09DA6AC49FF1FAE35616AEB8413B7C7AEBE0,
+        0x57119FD0DD4E22D8868E1C58C45C44045BEF839C55B1D0B1248C50A3BC959C5F,
+    )
+)
+
+_Y_MASK = (1 << 255) - 1
+
+
+def check_ed25519_public_key(public_key: bytes):
+    """
+    Check that an Ed25519 public key is a canonical point of the curve.
+
+    Points of small order, which verify signatures regardless of the message
+    for some implementations, are rejected as well.
+
+    :param public_key: the 32-byte encoded point
+    :raises ValueError: if the public key is not a valid point
+    """
+    if len(public_key) != 32:
+        raise ValueError("Invalid Ed25519 public key, expected 32 bytes")
+    encoded = int.from_bytes(public_key, "little")
+    sign = encoded >> 255
+    y = encoded & _Y_MASK
+    if y >= P:
+        raise ValueError("Invalid Ed25519 public key: non-canonical encoding")
+
+    # recover x from x^2 = (y^2 - 1) / (d y^2 + 1), per RFC 8032 section 5.1.3
+    yy = y * y % P
+    u = (yy - 1) % P
+    v = (D * yy + 1) % P
+    v3 = v * v * v % P
+    x = u * v3 * pow(u * v3 * v3 * v, (P - 5) // 8, P) % P
+    vxx = v * x * x % P
+    if vxx == (P - u) % P:
+        x = x * SQRT_M1 % P
+    elif vxx != u:
+        raise ValueError("Invalid Ed25519 public key: not on curve")
+    if x == 0 and sign:
+        raise ValueError("Invalid Ed25519 public key: non-canonical encoding")
+
+    if _has_small_order(x, y):
+        raise ValueError("Invalid Ed25519 public key: small order point")
+
+
+def check_x25519_public_key(public_key: bytes):
+    """
+    Check that an X25519 public key is not a point of small order.
+
+    Key agreement with such a point yields a shared secret known in advance.
+
+    :param public_key: the 32-byte u-coordinate
+    :raises ValueError: if the public key is a point of small order
+    """
+    if len(public_key) != 32:
+        raise ValueError("Invalid X25519 public key, expected 32 bytes")
+    # the top bit is ignored and non-canonical values are reduced, per RFC 7748
+    u = (int.from_bytes(public_key, "little") & _Y_MASK) % P
+    if u in X25519_SMALL_ORDER:
+        raise ValueError("Invalid X25519 public key: small order point")
+
+
+def _has_small_order(x: int, y: int) -> bool:
+    """Check whether 8 times the point is the neutral element."""
+    # doublings in extended coordinates, with a = -1
+    X, Y, Z = x, y, 1
+    for _ in range(3):
+        A = X * X % P
+        B = Y * Y % P
+        C = 2 * Z * Z % P
+        E = ((X + Y) * (X + Y) - A - B) % P
+        G = (B - A) % P
+        F = (G - C) % P
+        H = (-A - B) % P
+        X, Y, Z = E * F % P, G * H % P, F * G % P
+    return X == 0 and Y == Z
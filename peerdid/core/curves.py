@@ -0,0 +1,113 @@
+"""Point compression for the short Weierstrass curves of EC keys."""
+
+from typing import NamedTuple, Tuple
+
+from .lru import CacheStats, LRUCache
+
+# y^2 = x^3 + ax + b over the prime field of order p
+Curve = NamedTuple(
+    "Curve",
+    [
+        ("name", str),
+        ("p", int),
+        ("a", int),
+        ("b", int),
+    ],
+)
+
+P256 = Curve(
+    name="P-256",
+    p=0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+    a=0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFC,
+    b=0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+)
+SECP256K1 = Curve(
+    name="secp256k1",
+    p=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+    a=0,
+    b=7,
+)
+CURVES = {curve.name: curve for curve in (P256, SECP256K1)}
+
+# coordinates of both curves are 32 bytes; compressed points add a parity byte
+COORDINATE_LENGTH = 32
+COMPRESSED_LENGTH = COORDINATE_LENGTH + 1
+
+# bound of the decompressed point cache
+POINT_CACHE_ENTRIES = 4096
+
+
+def compress_point(curve: Curve, x: bytes, y: bytes) -> bytes:
+    """
+    Compress an uncompressed point.
+
+    :param curve: the curve of the point
+    :param x: the big-endian x coordinate
+    :param y: the big-endian y coordinate
+    :raises ValueError: if the point is not on the curve
+    :return: the compressed point
+    """
+    if len(x) != COORDINATE_LENGTH or len(y) != COORDINATE_LENGTH:
+        raise ValueError(
+            "Invalid point: expected {}-byte coordinates".format(COORDINATE_LENGTH)
+        )
+    x_int = int.from_bytes(x, "big")
+    y_int = int.from_bytes(y, "big")
+    p = curve.p
+    if x_int >= p or y_int >= p or (y_int * y_int - _curve_rhs(curve, x_int)) % p != 0:
+        raise ValueError("Invalid point: not on curve {}".format(curve.name))
+    return bytes((2 | (y_int & 1),)) + x
+
+
+def decompress_point(curve: Curve, compressed: bytes) -> Tuple[bytes, bytes]:
+    """
+    Decompress a compressed point.
+
+    Decompression takes a modular exponentiation, so results are cached.
+
+    :param curve: the curve of the point
+    :param compressed: the compressed point, a parity byte followed by x
+    :raises ValueError: if the point is not valid or not on the curve
+    :return: the big-endian x and y coordinates
+    """
+    cache_key = (curve.name, compressed)
+    point = _POINT_CACHE.get(cache_key)
+    if point is None:
+        point = _decompress_point(curve, compressed)
+        _POINT_CACHE.put(cache_key, point)
+    return point
+
+
+def clear_point_cache():
+    """Empty the cache of decompressed points."""
+    _POINT_CACHE.clear()
+
+
+def point_cache_stats() -> CacheStats:
+    """Get the statistics of the decompressed point cache."""
+    return _POINT_CACHE.stats()
+
+
+def _curve_rhs(curve: Curve, x: int) -> int:
+    return (pow(x, 3, curve.p) + curve.a * x + curve.b) % curve.p
+
+
+def _decompress_point(curve: Curve, compressed: bytes) -> Tuple[bytes, bytes]:
+    if len(compressed) != COMPRESSED_LENGTH or compressed[0] not in (2, 3):
+        raise ValueError("Invalid compressed point")
+    x = compressed[1:]
+    x_int = int.from_bytes(x, "big")
+    p = curve.p
+    if x_int >= p:
+        raise ValueError("Invalid point: not on curve {}".format(curve.name))
+    rhs = _curve_rhs(curve, x_int)
+    # both curves have p = 3 mod 4, where this is the square root if there is one
+    y_int = pow(rhs, (p + 1) // 4, p)
+    if y_int * y_int % p != rhs:
+        raise ValueError("Invalid point: not on curve {}".format(curve.name))
+    if y_int & 1 != compressed[0] & 1:
+        y_int = p - y_int
+    return bytes(x), y_int.to_bytes(COORDINATE_LENGTH, "big")
+
+
+_POINT_CACHE = LRUCache(max_entries=POINT_CACHE_ENTRIES)
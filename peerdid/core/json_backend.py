@@ -0,0 +1,157 @@
+"""JSON codec used by the library, backed by orjson when it is installed.
+
+Every backend must give the same results as the standard library: Peer DIDs
+embed compact JSON, so any difference in the output would change the DIDs
+generated. The orjson backend falls back to the standard library for inputs
+it would treat differently.
+"""
+
+import json
+
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson parses integers beyond 64 bits as floats, the standard library does
+# not: documents with a run of 19 digits are left to the standard library
+_DIGITS = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+_LONG_NUMBER = b"0" * 19
+
+
+class JSONBackend:
+    """JSON codec built on the standard library `json` module."""
+
+    name = "json"
+
+    def loads(self, value: Union[str, bytes, memoryview]) -> Any:
+        """Deserialize a JSON document, given as text or UTF-8.
+
+        :raises ValueError: if the document is not valid JSON or UTF-8
+        """
+        if not isinstance(value, str):
+            value = str(value, "utf-8")
+        return json.loads(value)
+
+    def dumps_compact(self, value: Any) -> str:
+        """Serialize a value without whitespace, escaping non-ASCII characters."""
+        return json.dumps(value, separators=(",", ":"))
+
+
+class OrjsonBackend(JSONBackend):
+    """JSON codec using orjson where its results match the standard library."""
+
+    name = "orjson"
+
+    def __init__(self):
+        """Initializer."""
+        if orjson is None:
+            raise ImportError("OrjsonBackend requires orjson")
+
+    def loads(self, value: Union[str, bytes, memoryview]) -> Any:
+        """Deserialize a JSON document, given as text or UTF-8.
+
+        :raises ValueError: if the document is not valid JSON or UTF-8
+        """
+        try:
+            data = value.encode("utf-8") if isinstance(value, str) else value
+        except UnicodeEncodeError:
+            # lone surrogates
+            return super().loads(value)
+        scanned = data
+        if isinstance(data, memoryview):
+            # scan the viewed buffer rather than copying the view: digits
+            # outside of it can only send the document to the standard library
+            obj = data.obj
+            scanned = obj if isinstance(obj, (bytes, bytearray)) else bytes(data)
+        if _LONG_NUMBER not in scanned.translate(_DIGITS):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # NaN, invalid UTF-8 and the like, or an actual error
+                pass
+        return super().loads(value)
+
+    def dumps_compact(self, value: Any) -> str:
+        """Serialize a value without whitespace, escaping non-ASCII characters."""
+        if _is_plain(value):
+            try:
+                encoded = orjson.dumps(value)
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # orjson writes non-ASCII characters and DEL unescaped
+                if encoded.isascii() and b"\x7f" not in encoded:
+                    return encoded.decode("ascii")
+        return json.dumps(value, separators=(",", ":"))
+
+
+# types serialized identically by orjson and the standard library; floats are
+# formatted differently
+_PLAIN_SCALARS = frozenset((str, int, bool, type(None)))
+_PLAIN_CONTAINERS = frozenset((dict, list, tuple))
+
+
+def _is_plain(value: Any) -> bool:
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type in _PLAIN_SCALARS or isinstance(value, str):
+            continue
+        if value_type is dict:
+            stack.extend(value.values())
+        elif value_type in _PLAIN_CONTAINERS:
+            stack.extend(value)
+        else:
+            return False
+    return True
+
+
+def default_backend() -> JSONBackend:
+    """Create the fastest available backend."""
+    if orjson is not None:
+        return OrjsonBackend()
+    return JSONBackend()
+
+
+_backend = default_backend()
+
+
+def get_backend() -> JSONBackend:
+    """Get the backend in use."""
+    return _backend
+
+
+def set_backend(backend: Union[JSONBackend, str, None]):
+    """Select the backend to use.
+
+    :param backend: a backend instance, the name of a built-in backend ("json" or
+        "orjson"), or None for the fastest available
+    :raises ImportError: if the requested backend is not installed
+    """
+    global _backend
+    if backend is None:
+        backend = default_backend()
+    elif backend == JSONBackend.name:
+        backend = JSONBackend()
+    elif backend == OrjsonBackend.name:
+        backend = OrjsonBackend()
+    elif not isinstance(backend, JSONBackend):
+        raise ValueError("Unknown JSON backend: {}".format(backend))
+    _backend = backend
+
+
+def loads(value: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document, given as text or UTF-8, with the current backend.
+
+    :raises ValueError: if the document is not valid JSON or UTF-8
+    """
+    return _backend.loads(value)
+
+
+def dumps_compact(value: Any) -> str:
+    """Serialize a value to compact JSON with the current backend."""
+    return _backend.dumps_compact(value)
@@ -4,32 +4,41 @@ import json
 
 from typing import Tuple, Union
 
-from .multicodec import Codec
+from . import json_backend
+from .curves import CURVES, compress_point, decompress_point
+from .multicodec import AnyCodec, codec_info, codec_info_for_crv
 from .utils import urlsafe_b64encode, urlsafe_b64decode
 
 
-def public_key_to_jwk(public_key: bytes, codec: Codec) -> dict:
-    x = urlsafe_b64encode(public_key).decode("utf-8")
-
-    if codec == Codec.ED25519:
-        crv = "Ed25519"
-    elif codec == Codec.X25519:
-        crv = "X25519"
-    else:
-        raise ValueError("Unsupported JWK codec: {}".format(codec))
+def public_key_to_jwk(public_key: bytes, codec: AnyCodec) -> dict:
+    try:
+        info = codec_info(codec)
+    except ValueError:
+        info = None
 
-    return {
-        "kty": "OKP",
-        "crv": crv,
-        "x": x,
-    }
+    if info and info.kty == "OKP":
+        return {
+            "kty": "OKP",
+            "crv": info.crv,
+            "x": urlsafe_b64encode(public_key).decode("utf-8"),
+        }
+    if info and info.kty == "EC" and info.crv in CURVES:
+        # EC keys are held compressed, JWKs carry both coordinates
+        x, y = decompress_point(CURVES[info.crv], public_key)
+        return {
+            "kty": "EC",
+            "crv": info.crv,
+            "x": urlsafe_b64encode(x).decode("utf-8"),
+            "y": urlsafe_b64encode(y).decode("utf-8"),
+        }
+    raise ValueError("Unsupported JWK codec: {}".format(codec))
 
 
-def jwk_to_public_key(jwk: Union[str, dict]) -> Tuple[bytes, Codec]:
+def jwk_to_public_key(jwk: Union[str, dict]) -> Tuple[bytes, AnyCodec]:
     parts = {}
     try:
         if isinstance(jwk, str):
-            parts = json.loads(jwk)
+            parts = json_backend.loads(jwk)
         elif isinstance(jwk, dict):
             parts = jwk
     except json.JSONDecodeError:
@@ -53,11 +62,16 @@ def jwk_to_public_key(jwk: Union[str, dict]) -> Tuple[bytes, Codec]:
     except ValueError as e:
         raise ValueError("Invalid JWK: {}".format(jwk)) from e
 
-    if crv == "Ed25519":
-        codec = Codec.ED25519
-    elif crv == "X25519":
-        codec = Codec.X25519
-    else:
-        raise ValueError("Unsupported JWK codec: {}".format(crv))
+    info = codec_info_for_crv(crv)
+    if info.kty != kty:
+        raise ValueError("Invalid JWK: {}".format(jwk))
+    if kty == "EC":
+        y = parts.pop("y", None)
+        try:
+            if not (isinstance(y, str) and crv in CURVES):
+                raise ValueError("Missing y coordinate")
+            public_key = compress_point(CURVES[crv], public_key, urlsafe_b64decode(y))
+        except ValueError as e:
+            raise ValueError("Invalid JWK: {}".format(jwk)) from e
 
-    return public_key, codec
+    return public_key, info.codec
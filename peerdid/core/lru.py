@@ -0,0 +1,100 @@
+"""Bounded LRU cache utilities."""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, NamedTuple, Optional
+
+CacheStats = NamedTuple(
+    "CacheStats",
+    [
+        ("hits", int),
+        ("misses", int),
+        ("evictions", int),
+        ("entries", int),
+        ("size", int),
+    ],
+)
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by entry count and total size."""
+
+    def __init__(self, max_entries: int = 1024, max_size: Optional[int] = None):
+        """Initializer.
+
+        :param max_entries: maximum number of entries retained
+        :param max_size: maximum sum of the entry sizes, or None for no limit
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Fetch a value, marking it as most recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int = 0):
+        """Store a value, evicting the least recently used entries as needed.
+
+        Values larger than `max_size` on their own are not stored.
+        """
+        if self.max_size is not None and size > self.max_size:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._data[key] = (value, size)
+            self._size += size
+            while len(self._data) > self.max_entries or (
+                self.max_size is not None and self._size > self.max_size
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+
+    def discard(self, key: Hashable):
+        """Remove a value if present."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._size -= entry[1]
+
+    def clear(self):
+        """Remove all values and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Get a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, len(self._data), self._size
+            )
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check for a key without updating the counters or recency."""
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        """Get the number of stored entries."""
+        return len(self._data)
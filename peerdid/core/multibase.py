@@ -1,9 +1,22 @@
 """Multibase utility methods."""
 
 from enum import Enum
-from typing import Tuple
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
 
-import base58
+if TYPE_CHECKING:
+    import numpy
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# maps an ASCII character to its base58 digit value, or 0xFF if not in the alphabet
+_BASE58_DIGITS = bytes(
+    BASE58_ALPHABET.index(chr(c)) if chr(c) in BASE58_ALPHABET else 0xFF
+    for c in range(256)
+)
+# two base58 characters for every value below 58 ** 2
+_BASE58_PAIRS = [a + b for a in BASE58_ALPHABET for b in BASE58_ALPHABET]
+# past this many four-digit groups, groups are merged pairwise rather than folded
+_BASE58_FOLD_GROUPS = 16
 
 
 class MultibaseFormat(Enum):
@@ -15,16 +28,58 @@ class MultibaseFormat(Enum):
 def from_base58(base58encoded: str) -> bytes:
     """Convert from base58 to bytes."""
     try:
-        return base58.b58decode(base58encoded)
+        encoded = base58encoded.rstrip()
+        if isinstance(encoded, str):
+            encoded = encoded.encode("ascii")
+        digits = encoded.translate(_BASE58_DIGITS)
+        if 0xFF in digits:
+            raise ValueError("Invalid character")
     except ValueError:
         raise ValueError(
-            "Invalid key: Invalid base58 encoding: " + base58encoded
+            "Invalid key: Invalid base58 encoding: " + str(base58encoded)
         ) from None
 
+    zeros = len(digits) - len(digits.lstrip(b"\0"))
+    acc = _base58_value(digits)
+    return bytes(zeros) + acc.to_bytes((acc.bit_length() + 7) // 8, "big")
+
+
+def _base58_value(digits: bytes) -> int:
+    """Compute the integer value of a sequence of base58 digit values."""
+    # four digits at a time, the arithmetic stays on machine-sized ints
+    groups = iter(bytes(-len(digits) % 4) + digits)
+    values = [
+        ((a * 58 + b) * 58 + c) * 58 + d
+        for a, b, c, d in zip(groups, groups, groups, groups)
+    ]
+    base = 58**4
+    # merging neighbours halves the count of big integer products per round,
+    # which keeps long values (numalgo 4 documents) from costing O(n^2)
+    while len(values) > _BASE58_FOLD_GROUPS:
+        if len(values) % 2:
+            values.insert(0, 0)
+        pairs = iter(values)
+        values = [high * base + low for high, low in zip(pairs, pairs)]
+        base *= base
+    acc = 0
+    for value in values:
+        acc = acc * base + value
+    return acc
+
 
 def to_base58(value: bytes) -> str:
     """Convert a bytes value to base58 encoding."""
-    return base58.b58encode(value).decode("utf-8")
+    zeros = len(value) - len(value.lstrip(b"\0"))
+    acc = int.from_bytes(value, "big")
+    pairs = []
+    # peel off four digits per big integer division
+    while acc:
+        acc, rem = divmod(acc, 58**4)
+        high, low = divmod(rem, 58**2)
+        pairs.append(_BASE58_PAIRS[low])
+        pairs.append(_BASE58_PAIRS[high])
+    pairs.reverse()
+    return "1" * zeros + "".join(pairs).lstrip("1")
 
 
 def from_multibase(multibase: str) -> Tuple[str, bytes]:
@@ -41,6 +96,89 @@ def from_multibase(multibase: str) -> Tuple[str, bytes]:
     return encnumbasis, decoded
 
 
+def decode_multibase_batch(
+    multibases: Sequence[str], length: Optional[int] = None
+) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """
+    Decode many base58 multibase values of the same length at once.
+
+    Requires NumPy. Every value is expected to have the same number of characters
+    as the first one, and to decode to `length` bytes (by default, the decoded
+    length of the first valid value). Values which do not, or which are not
+    valid base58 multibase, are flagged as failed and left zero-filled.
+
+    :param multibases: multibase-encoded values to decode
+    :param length: the expected decoded length in bytes
+    :raises ImportError: if NumPy is not installed
+    :return: a tuple of the decoded values as an (N, length) uint8 array, and
+        a boolean array flagging the values which failed to decode
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("decode_multibase_batch requires numpy") from None
+
+    count = len(multibases)
+    if length is None:
+        length = 0
+        for multibase in multibases:
+            try:
+                length = len(from_multibase(multibase)[1])
+                break
+            except ValueError:
+                pass
+    if not count:
+        return np.zeros((0, length), np.uint8), np.zeros(0, bool)
+    width = len(multibases[0])
+    if width < 2:
+        return np.zeros((count, length), np.uint8), np.ones(count, bool)
+
+    # non-ASCII characters become "?", which is not a base58 digit
+    placeholder = b"\0" * width
+    raw = b"".join(
+        value.encode("ascii", "replace") if len(value) == width else placeholder
+        for value in multibases
+    )
+    chars = np.frombuffer(raw, np.uint8).reshape(count, width)
+    failed = chars[:, 0] != ord(MultibaseFormat.BASE58.value)
+    digits = np.frombuffer(_BASE58_DIGITS, np.uint8)[chars[:, 1:]]
+    failed |= (digits == 0xFF).any(axis=1)
+    digits[failed] = 0
+
+    # accumulate into 32-bit limbs (least significant first), five digits at a time
+    limbs = np.zeros((count, (length + 3) // 4), np.uint64)
+    ndigits = width - 1
+    for start in range(0, ndigits, 5):
+        group = digits[:, start : start + 5].astype(np.uint64)
+        carry = group[:, 0].copy()
+        for col in range(1, group.shape[1]):
+            carry = carry * 58 + group[:, col]
+        scale = np.uint64(58 ** group.shape[1])
+        for limb in range(limbs.shape[1]):
+            total = limbs[:, limb] * scale + carry
+            limbs[:, limb] = total & np.uint64(0xFFFFFFFF)
+            carry = total >> np.uint64(32)
+        failed |= carry != 0
+
+    decoded = limbs[:, ::-1].astype(">u4").view(np.uint8)
+    excess = decoded.shape[1] - length
+    failed |= decoded[:, :excess].any(axis=1)
+    decoded = np.ascontiguousarray(decoded[:, excess:])
+
+    # the leading "1" digits must account for exactly the leading zero bytes
+    nonzero_digits = digits != 0
+    leading_digits = np.where(
+        nonzero_digits.any(axis=1), nonzero_digits.argmax(axis=1), ndigits
+    )
+    nonzero_bytes = decoded != 0
+    leading_bytes = np.where(
+        nonzero_bytes.any(axis=1), nonzero_bytes.argmax(axis=1), length
+    )
+    failed |= leading_digits != leading_bytes
+    decoded[failed] = 0
+    return decoded, failed
+
+
 def to_multibase(value: bytes, format: MultibaseFormat = None) -> str:
     """Convert to base58-encoded multibase."""
     if not format or format == MultibaseFormat.BASE58:
@@ -1,7 +1,8 @@
 """Multicodec utility methods."""
 
 from enum import Enum
-from typing import Tuple, Union
+from threading import Lock
+from typing import Dict, NamedTuple, Optional, Tuple, Union
 
 import varint
 
@@ -11,32 +12,159 @@ class Codec(Enum):
 
     X25519 = 0xEC
     ED25519 = 0xED
+    SECP256K1 = 0xE7
+    P256 = 0x1200
+
+    @property
+    def prefix(self) -> bytes:
+        """The varint-encoded multicodec prefix."""
+        return _BY_CODEC[self].prefix
+
+    def encode_multicodec(self, value: bytes) -> bytes:
+        """Encode a value with this codec."""
+        return _BY_CODEC[self].prefix + value
+
+
+class ExtensionCodec(NamedTuple("ExtensionCodec", [("name", str), ("value", int)])):
+    """A codec outside of `Codec`, usable wherever a `Codec` member is once registered."""
+
+    @property
+    def prefix(self) -> bytes:
+        """The varint-encoded multicodec prefix."""
+        return varint.encode(self.value)
 
     def encode_multicodec(self, value: bytes) -> bytes:
         """Encode a value with this codec."""
-        prefix = varint.encode(self.value)
-        return prefix + value
+        return self.prefix + value
+
 
+AnyCodec = Union[Codec, ExtensionCodec]
 
-def from_multicodec(value: Union[str, bytes]) -> Tuple[bytes, Codec]:
-    """Decode a multicodec value."""
+CodecInfo = NamedTuple(
+    "CodecInfo",
+    [
+        ("codec", AnyCodec),
+        ("prefix", bytes),
+        ("kty", Optional[str]),
+        ("crv", Optional[str]),
+        ("key_type", Optional[type]),
+    ],
+)
+
+# multicodec code of JSON documents, embedded in numalgo 4 Peer DIDs
+MULTICODEC_JSON = 0x0200
+JSON_PREFIX = varint.encode(MULTICODEC_JSON)
+
+# the codec registry: entries are replaced, never mutated, so lookups need no lock
+_BY_CODEC: Dict[AnyCodec, CodecInfo] = {}
+_BY_PREFIX: Dict[bytes, CodecInfo] = {}
+_BY_CRV: Dict[str, CodecInfo] = {}
+_PREFIX_LENGTHS: Tuple[int, ...] = ()
+_registry_lock = Lock()
+
+
+def register_codec(
+    codec: AnyCodec,
+    kty: str = None,
+    crv: str = None,
+    key_type: type = None,
+) -> CodecInfo:
+    """
+    Register a codec, or update its registration.
+
+    Arguments left as None keep their registered value.
+
+    :param codec: the codec, a `Codec` member or an `ExtensionCodec`
+    :param kty: the JWK key type of the codec's keys
+    :param crv: the JWK curve of the codec's keys
+    :param key_type: the BaseKey subclass loading the codec's keys
+    :raises ValueError: if the prefix or the curve is registered to another codec
+    :return: the registration
+    """
+    global _PREFIX_LENGTHS
+    with _registry_lock:
+        previous = _BY_CODEC.get(codec)
+        if previous:
+            kty = kty or previous.kty
+            crv = crv or previous.crv
+            key_type = key_type or previous.key_type
+        info = CodecInfo(codec, varint.encode(codec.value), kty, crv, key_type)
+        other = _BY_PREFIX.get(info.prefix)
+        if other and other.codec != codec:
+            raise ValueError(
+                "Multicodec prefix {} already registered to {}".format(
+                    codec.value, other.codec
+                )
+            )
+        other = _BY_CRV.get(crv) if crv else None
+        if other and other.codec != codec:
+            raise ValueError(
+                "JWK curve {} already registered to {}".format(crv, other.codec)
+            )
+        if previous and previous.crv and previous.crv != crv:
+            del _BY_CRV[previous.crv]
+        _BY_CODEC[codec] = info
+        _BY_PREFIX[info.prefix] = info
+        if crv:
+            _BY_CRV[crv] = info
+        _PREFIX_LENGTHS = tuple(sorted({len(prefix) for prefix in _BY_PREFIX}))
+    return info
+
+
+def codec_info(codec: AnyCodec) -> CodecInfo:
+    """
+    Get the registration of a codec.
+
+    :raises ValueError: if the codec is not registered
+    """
+    info = _BY_CODEC.get(codec)
+    if info is None:
+        raise ValueError("Unsupported codec: {}".format(codec))
+    return info
+
+
+def codec_info_for_crv(crv: str) -> CodecInfo:
+    """
+    Get the registration of the codec of a JWK curve.
+
+    :raises ValueError: if no codec is registered for the curve
+    """
+    info = _BY_CRV.get(crv)
+    if info is None:
+        raise ValueError("Unsupported JWK codec: {}".format(crv))
+    return info
+
+
+def from_multicodec(value: Union[str, bytes, memoryview]) -> Tuple[bytes, AnyCodec]:
+    """Decode a multicodec value.
+
+    The codec is found by looking up the leading bytes in the registry of
+    prefixes; the remaining value is copied out exactly once.
+    """
     if isinstance(value, str):
         value = value.encode("utf-8")
+    view = memoryview(value)
+    for prefix_len in _PREFIX_LENGTHS:
+        info = _BY_PREFIX.get(view[:prefix_len].tobytes())
+        if info is not None:
+            return view[prefix_len:].tobytes(), info.codec
+
+    # not a supported codec: decode the prefix for the error message
+    value = view.tobytes()
     try:
         prefix_int = varint.decode_bytes(value)
     except Exception:
         raise ValueError(
             "Invalid key: Invalid multicodec prefix in {}".format(str(value))
         )
-
-    try:
-        codec = Codec(prefix_int)
-    except ValueError:
-        raise ValueError(
-            "Invalid key: Unknown multicodec prefix {} in {}".format(
-                str(prefix_int), str(value)
-            )
+    raise ValueError(
+        "Invalid key: Unknown multicodec prefix {} in {}".format(
+            str(prefix_int), str(value)
         )
+    )
+
 
-    prefix = varint.encode(prefix_int)
-    return value[len(prefix) :], codec
+register_codec(Codec.X25519, kty="OKP", crv="X25519")
+register_codec(Codec.ED25519, kty="OKP", crv="Ed25519")
+register_codec(Codec.SECP256K1, kty="EC", crv="secp256k1")
+register_codec(Codec.P256, kty="EC", crv="P-256")
@@ -0,0 +1,26 @@
+"""Multihash utility methods."""
+
+import hashlib
+
+from typing import Union
+
+# multihash code and digest length of SHA2-256
+SHA2_256 = 0x12
+SHA2_256_LENGTH = 32
+SHA2_256_PREFIX = bytes((SHA2_256, SHA2_256_LENGTH))
+
+
+def sha256_multihash(data: bytes) -> bytes:
+    """Hash data with SHA2-256, in multihash format."""
+    return SHA2_256_PREFIX + hashlib.sha256(data).digest()
+
+
+def verify_sha256_multihash(data: Union[bytes, memoryview], multihash: bytes) -> bool:
+    """Check that a multihash is the SHA2-256 hash of data.
+
+    The data is hashed in place, so a memoryview over a larger buffer is not copied.
+    """
+    return (
+        multihash[:2] == SHA2_256_PREFIX
+        and hashlib.sha256(data).digest() == multihash[2:]
+    )
@@ -1,15 +1,21 @@
 """Peer DID helper methods."""
 
 import json
+import pickle
 
 from enum import Enum
-from typing import List, Optional, Union
+from typing import List, NamedTuple, Optional, Tuple, Union
 
 from pydid import Service
 
+from ..core import json_backend
+from ..core.lru import CacheStats, LRUCache
+from ..core.jwk_okp import jwk_to_public_key
+from ..core.multibase import from_base58, from_multibase, to_multibase
+from ..core.multicodec import JSON_PREFIX, AnyCodec, Codec, from_multicodec
 from ..core.utils import urlsafe_b64encode, urlsafe_b64decode
 from ..errors import MalformedPeerDIDError
-from ..keys import KeyFormat, BaseKey
+from ..keys import KeyFormat, KeyRelationshipType, BaseKey
 
 SERVICE_ID = "id"
 SERVICE_TYPE = "type"
@@ -17,9 +23,25 @@ SERVICE_ENDPOINT = "serviceEndpoint"
 SERVICE_DIDCOMM_MESSAGING = "DIDCommMessaging"
 SERVICE_ROUTING_KEYS = "routingKeys"
 SERVICE_ACCEPT = "accept"
+SERVICE_URI = "uri"
 
 ServiceJson = Union[str, dict, list]
 
+ServiceEndpoint = NamedTuple(
+    "ServiceEndpoint",
+    [
+        ("id", str),
+        ("type", str),
+        ("uri", Optional[str]),
+        ("routing_keys", Tuple[str, ...]),
+        ("accept", Tuple[str, ...]),
+    ],
+)
+
+# bounds of the encoded and decoded service caches
+SERVICE_CACHE_ENTRIES = 256
+SERVICE_CACHE_BYTES = 4 * 1024 * 1024
+
 
 class Numalgo2Prefix(Enum):
     """Numalgo prefix values."""
@@ -29,6 +51,19 @@ class Numalgo2Prefix(Enum):
     SERVICE = "S"
 
 
+# the relationships of the keys of each numalgo 2 purpose code
+PURPOSE_RELATIONSHIPS = {
+    Numalgo2Prefix.AUTHENTICATION.value: KeyRelationshipType.AUTHENTICATION,
+    Numalgo2Prefix.KEY_AGREEMENT.value: KeyRelationshipType.KEY_AGREEMENT,
+}
+
+# verification method types whose base58 public keys have a known codec
+_BASE58_METHOD_CODECS = {
+    "Ed25519VerificationKey2018": Codec.ED25519,
+    "X25519KeyAgreementKey2019": Codec.X25519,
+}
+
+
 class ServicePrefix(Enum):
     """Service short forms."""
 
@@ -52,9 +87,22 @@ def encode_service(service: ServiceJson) -> str:
     if service is None or service == "" or service == []:
         return ""
 
+    if isinstance(service, str):
+        cache_key = (False, service)
+    else:
+        # compact JSON keeps the property order, which the encoding depends on
+        cache_key = (True, json_backend.dumps_compact(service))
+    encoded = _ENCODE_CACHE.get(cache_key)
+    if encoded is None:
+        encoded = _encode_service(service)
+        _ENCODE_CACHE.put(cache_key, encoded, size=len(cache_key[1]) + len(encoded))
+    return encoded
+
+
+def _encode_service(service: ServiceJson) -> str:
     if isinstance(service, str):
         try:
-            service = json.loads(service)
+            service = json_backend.loads(service)
         except json.JSONDecodeError:
             pass
 
@@ -68,7 +116,7 @@ def encode_service(service: ServiceJson) -> str:
     return (
         "."
         + Numalgo2Prefix.SERVICE.value
-        + urlsafe_b64encode(json.dumps(service, separators=(",", ":"))).decode("utf-8")
+        + urlsafe_b64encode(json_backend.dumps_compact(service)).decode("utf-8")
     )
 
 
@@ -102,11 +150,139 @@ def decode_service(service: str) -> Optional[List[Service]]:
     :raises ValueError: if peer_did parameter is not valid
     :return: decoded service (list of dict)
     """
+    if not service:
+        return None
+    return _decoded_service(service).services()
+
+
+def decode_service_dicts(service: str) -> Optional[List[dict]]:
+    """
+    Decode service according to Peer DID spec, without building Service models.
+
+    The result matches the serialization of the services returned by `decode_service`.
+
+    :param service: service to decode
+    :raises MalformedPeerDIDError: if the service is not valid
+    :return: decoded services, serialized
+    """
+    if not service:
+        return None
+    return _decoded_service(service).dicts()
+
+
+def decode_service_endpoints(service: str) -> Tuple[ServiceEndpoint, ...]:
+    """
+    Decode the endpoints of an encoded service, without building Service models.
+
+    :param service: service to decode
+    :raises MalformedPeerDIDError: if the service is not valid
+    :return: the endpoint of each service entry
+    """
+    if not service:
+        return ()
+    return _decoded_service(service).endpoints()
+
+
+def service_endpoint(service: dict) -> ServiceEndpoint:
+    """
+    Get the endpoint of a serialized service entry.
+
+    The routing keys and accepted profiles are read from the entry, or from its
+    service endpoint when given as a DIDComm endpoint object.
+
+    :param service: the service entry, as in a DID Document
+    :return: the endpoint, with no URI if the service endpoint is not a URI
+    """
+    endpoint = service.get(SERVICE_ENDPOINT)
+    routing_keys = service.get(SERVICE_ROUTING_KEYS)
+    accept = service.get(SERVICE_ACCEPT)
+    if isinstance(endpoint, dict):
+        routing_keys = endpoint.get(SERVICE_ROUTING_KEYS, routing_keys)
+        accept = endpoint.get(SERVICE_ACCEPT, accept)
+        endpoint = endpoint.get(SERVICE_URI)
+    return ServiceEndpoint(
+        str(service.get(SERVICE_ID)),
+        service.get(SERVICE_TYPE),
+        endpoint if isinstance(endpoint, str) else None,
+        _strings(routing_keys),
+        _strings(accept),
+    )
+
+
+def _strings(value) -> Tuple[str, ...]:
+    if not isinstance(value, list):
+        return ()
+    return tuple(item for item in value if isinstance(item, str))
+
+
+def clear_service_caches():
+    """Empty the caches of encoded and decoded services."""
+    _ENCODE_CACHE.clear()
+    _DECODE_CACHE.clear()
+
+
+def service_cache_stats() -> Tuple[CacheStats, CacheStats]:
+    """Get the statistics of the encoded and decoded service caches."""
+    return _ENCODE_CACHE.stats(), _DECODE_CACHE.stats()
+
+
+class _DecodedService:
+    """Decoded service segment, shared by callers through pickled snapshots.
+
+    Each caller unpickles its own copy, which is cheaper than rebuilding the
+    Service models and leaves the cached state untouched.
+    """
+
+    __slots__ = ("entries", "_dicts", "_services", "_endpoints")
+
+    def __init__(self, entries: List[dict]):
+        self.entries = entries
+        self._dicts = None
+        self._services = None
+        self._endpoints = None
+
+    def dicts(self) -> List[dict]:
+        if self._dicts is None:
+            self._dicts = pickle.dumps(
+                [_serialize_service_entry(entry) for entry in self.entries],
+                pickle.HIGHEST_PROTOCOL,
+            )
+        return pickle.loads(self._dicts)
+
+    def services(self) -> List[Service]:
+        if self._services is None:
+            self._services = pickle.dumps(
+                [Service.make(**entry) for entry in self.entries],
+                pickle.HIGHEST_PROTOCOL,
+            )
+        return pickle.loads(self._services)
+
+    def endpoints(self) -> Tuple[ServiceEndpoint, ...]:
+        # immutable, so shared as is
+        if self._endpoints is None:
+            self._endpoints = tuple(
+                service_endpoint(_serialize_service_entry(entry))
+                for entry in self.entries
+            )
+        return self._endpoints
+
+
+def _decoded_service(service: str) -> _DecodedService:
+    decoded = _DECODE_CACHE.get(service)
+    if decoded is None:
+        decoded = _DecodedService(_decode_service_entries(service))
+        # the decoded form is proportional to the encoded segment
+        _DECODE_CACHE.put(service, decoded, size=4 * len(service))
+    return decoded
+
+
+def _decode_service_entries(service: str) -> Optional[List[dict]]:
+    """Decode service to a list of Service.make keyword arguments."""
     if not service:
         return None
     try:
         decoded_service = urlsafe_b64decode(service.encode())
-        list_of_service_dict = json.loads(decoded_service.decode("utf-8"))
+        list_of_service_dict = json_backend.loads(decoded_service)
     except (ValueError, json.JSONDecodeError) as e:
         raise MalformedPeerDIDError("Invalid service") from e
 
@@ -117,28 +293,58 @@ def decode_service(service: str) -> Optional[List[Service]]:
     for i, svc_def in enumerate(list_of_service_dict):
         if not isinstance(svc_def, dict):
             raise MalformedPeerDIDError("Service entry is not an object")
-        service_type = svc_def.pop(ServicePrefix.SERVICE_TYPE.value, "").replace(
+        service_type = svc_def.get(ServicePrefix.SERVICE_TYPE.value, "").replace(
             ServicePrefix.SERVICE_DIDCOMM_MESSAGING.value, SERVICE_DIDCOMM_MESSAGING
         )
         if not service_type:
             raise MalformedPeerDIDError("Service doesn't contain a type")
         ident = "#" + service_type.lower() + "-" + str(i)
-        endpoint = svc_def.pop(ServicePrefix.SERVICE_ENDPOINT.value, None)
-        extra = {}
+        endpoint = svc_def.get(ServicePrefix.SERVICE_ENDPOINT.value)
+        entry = {"id": ident, "type": service_type, "service_endpoint": endpoint}
         for k, v in svc_def.items():
+            if k in _ABBREVIATED_TYPE_AND_ENDPOINT:
+                continue
             if k == ServicePrefix.SERVICE_ACCEPT.value:
                 k = SERVICE_ACCEPT
             elif k == ServicePrefix.SERVICE_ROUTING_KEYS.value:
                 k = SERVICE_ROUTING_KEYS
-            extra[k] = v
-        service = Service.make(
-            id=ident, type=service_type, service_endpoint=endpoint, **extra
-        )
-        result.append(service)
+            if k in _SERVICE_FIELDS:
+                raise MalformedPeerDIDError("Duplicate service property: " + k)
+            entry[k] = v
+        result.append(entry)
 
     return result
 
 
+_ABBREVIATED_TYPE_AND_ENDPOINT = (
+    ServicePrefix.SERVICE_TYPE.value,
+    ServicePrefix.SERVICE_ENDPOINT.value,
+)
+
+# Service model fields as (name, alias)
+_SERVICE_FIELDS = {"id": "id", "type": "type", "service_endpoint": SERVICE_ENDPOINT}
+
+
+def _serialize_service_entry(entry: dict) -> dict:
+    """Serialize Service.make keyword arguments the way the Service model does."""
+    result = {}
+    names_used = set()
+    for name, alias in _SERVICE_FIELDS.items():
+        if alias in entry:
+            result[alias] = entry[alias]
+            names_used.add(alias)
+        elif name in entry:
+            result[alias] = entry[name]
+            names_used.add(name)
+    if not isinstance(result[SERVICE_ENDPOINT], (str, list, dict)):
+        raise MalformedPeerDIDError("Invalid service endpoint")
+    # extra properties follow the (set) iteration order used by the model
+    for k in entry.keys() - names_used:
+        if entry[k] is not None:
+            result[k] = entry[k]
+    return result
+
+
 def decode_multibase_numbasis(
     multibase: str,
     key_format: KeyFormat,
@@ -154,3 +360,67 @@ def decode_multibase_numbasis(
         return BaseKey.from_multibase(multibase, format=key_format)
     except (ValueError, TypeError) as e:
         raise MalformedPeerDIDError("Invalid key: {}".format(multibase)) from e
+
+
+def decode_verification_method_key(
+    method: dict,
+) -> Tuple[bytes, Optional[AnyCodec]]:
+    """
+    Decode the public key of a serialized verification method.
+
+    :param method: the verification method, as in a DID Document
+    :raises ValueError: if the method has no public key in multibase, base58 or
+        JWK format, or the key cannot be decoded
+    :return: the raw public key and its codec, None for base58 keys of a
+        method type of unknown codec
+    """
+    multibase = method.get("publicKeyMultibase")
+    if isinstance(multibase, str):
+        return from_multicodec(from_multibase(multibase)[1])
+    base58 = method.get("publicKeyBase58")
+    if isinstance(base58, str):
+        return from_base58(base58), _BASE58_METHOD_CODECS.get(method.get("type"))
+    jwk = method.get("publicKeyJwk")
+    if isinstance(jwk, dict):
+        # jwk_to_public_key consumes the dict it is given
+        return jwk_to_public_key(dict(jwk))
+    raise ValueError("No supported public key in verification method")
+
+
+def encode_document(document: dict) -> str:
+    """
+    Encode a numalgo 4 input document as multibase-encoded JSON multicodec.
+
+    :param document: the input document
+    :raises ValueError: if the document cannot be serialized to JSON
+    :return: the encoded document
+    """
+    return to_multibase(JSON_PREFIX + json_backend.dumps_compact(document).encode())
+
+
+def decode_document(encoded: str) -> dict:
+    """
+    Decode a numalgo 4 input document encoded by `encode_document`.
+
+    :param encoded: the encoded document
+    :raises MalformedPeerDIDError: if the document is not valid
+    :return: the input document
+    """
+    try:
+        _, decoded = from_multibase(encoded)
+        if not decoded.startswith(JSON_PREFIX):
+            raise ValueError("Not a JSON multicodec value")
+        document = json_backend.loads(memoryview(decoded)[len(JSON_PREFIX) :])
+    except ValueError as e:
+        raise MalformedPeerDIDError("Invalid document") from e
+    if not isinstance(document, dict):
+        raise MalformedPeerDIDError("Invalid document")
+    return document
+
+
+_ENCODE_CACHE = LRUCache(
+    max_entries=SERVICE_CACHE_ENTRIES, max_size=SERVICE_CACHE_BYTES
+)
+_DECODE_CACHE = LRUCache(
+    max_entries=SERVICE_CACHE_ENTRIES, max_size=SERVICE_CACHE_BYTES
+)
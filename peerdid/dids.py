@@ -1,39 +1,265 @@
 """Peer DID document generation and resolution."""
 
+import json
+import pickle
 import re
 
-from typing import Optional, Sequence, Union
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
 
-from pydid import DID, DIDDocument, DIDDocumentBuilder, DIDUrl, InvalidDIDError
+from pydid import DID, DIDDocument, DIDDocumentBuilder, DIDUrl, InvalidDIDError, Service
 
+from . import instrumentation
 from .core.peer_did_helper import (
+    PURPOSE_RELATIONSHIPS,
     Numalgo2Prefix,
+    ServiceEndpoint,
     ServiceJson,
+    decode_document,
+    encode_document,
     encode_service,
     decode_multibase_numbasis,
     decode_service,
+    decode_service_dicts,
+    decode_service_endpoints,
+    decode_verification_method_key,
+    service_endpoint,
 )
-from .errors import MalformedPeerDIDError
+from .core.lru import LRUCache
+from .core.multibase import from_base58, to_multibase
+from .core.multicodec import AnyCodec
+from .core.multihash import sha256_multihash, verify_sha256_multihash
+from .errors import MalformedPeerDIDError, UnknownPeerDIDError
 from .keys import KeyFormat, KeyRelationshipType, BaseKey
+from .store import ShortFormStore, get_default_store
+
+DID_CONTEXT = "https://www.w3.org/ns/did/v1"
 
 PEER_DID_PATTERN = re.compile(
     r"^did:peer:(([0](z)([1-9a-km-zA-HJ-NP-Z]+))|(2((\.[AEVID](z)([1-9a-km-zA-HJ-NP-Z]+))+"
-    r"(\.(S)[0-9a-zA-Z]*)?)))$"
+    r"(\.(S)[0-9a-zA-Z]*)?))|(3zQm[1-9a-km-zA-HJ-NP-Z]{44})"
+    r"|(4zQm[1-9a-km-zA-HJ-NP-Z]{44}(:z[1-9a-km-zA-HJ-NP-Z]+)?))$"
+)
+
+PEER_DID_PREFIX = "did:peer:"
+_NUMALGO_2_PREFIX = PEER_DID_PREFIX + "2."
+
+# numalgo 2 key purpose codes accepted by the Peer DID syntax
+_KEY_PURPOSES = "AEVID"
+_SERVICE_PREFIX = Numalgo2Prefix.SERVICE.value
+# single character-class patterns, which match in linear time
+_MULTIBASE_KEY = re.compile(r"z[1-9a-km-zA-HJ-NP-Z]+").fullmatch
+_ENCODED_SERVICE = re.compile(r"[0-9a-zA-Z]*").fullmatch
+# multibase base58btc SHA2-256 multihash
+_SHA256_HASH = re.compile(r"zQm[1-9a-km-zA-HJ-NP-Z]{44}").fullmatch
+# "did:peer:4" followed by the hash
+_NUMALGO_4_SHORT_LENGTH = 57
+
+_DOCUMENT_RELATIONSHIPS = (
+    ("authentication", KeyRelationshipType.AUTHENTICATION),
+    ("keyAgreement", KeyRelationshipType.KEY_AGREEMENT),
+)
+_VERIFICATION_RELATIONSHIPS = (
+    "authentication",
+    "assertionMethod",
+    "keyAgreement",
+    "capabilityInvocation",
+    "capabilityDelegation",
+)
+# resolved numalgo 4 documents, by long or short form
+NUMALGO_4_CACHE_ENTRIES = 256
+NUMALGO_4_CACHE_BYTES = 4 * 1024 * 1024
+_NUMALGO_4_DOCUMENTS = LRUCache(
+    max_entries=NUMALGO_4_CACHE_ENTRIES, max_size=NUMALGO_4_CACHE_BYTES
 )
 
+# size limits checked before a Peer DID is decoded; None disables a limit
+PeerDIDLimits = NamedTuple(
+    "PeerDIDLimits",
+    [
+        ("max_length", Optional[int]),
+        ("max_keys", Optional[int]),
+        ("max_service_length", Optional[int]),
+    ],
+)
+DEFAULT_PEER_DID_LIMITS = PeerDIDLimits(
+    max_length=4096, max_keys=64, max_service_length=2048
+)
+
+ExtractedKey = NamedTuple(
+    "ExtractedKey",
+    [
+        ("public_key", bytes),
+        ("codec", AnyCodec),
+        ("relationship", KeyRelationshipType),
+    ],
+)
+
+KeySegment = NamedTuple(
+    "KeySegment",
+    [
+        ("purpose", Optional[str]),
+        ("value", str),
+        ("span", Tuple[int, int]),
+    ],
+)
+
+
+class ParsedPeerDID:
+    """
+    The components of a syntactically valid Peer DID.
+
+    Key segments keep their order of appearance. Each carries the numalgo 2
+    purpose code (None for numalgo 0), the multibase-encoded key, and the
+    span of that key within the DID. Short-form (numalgo 3 and 4) Peer DIDs
+    have neither keys nor service: those are held by their long form. Long-form
+    numalgo 4 Peer DIDs carry their still encoded input document instead.
+    """
+
+    __slots__ = ("did", "numalgo", "keys", "service", "service_span", "document")
+
+    def __init__(
+        self,
+        did: str,
+        numalgo: int,
+        keys: Tuple[KeySegment, ...],
+        service: Optional[str] = None,
+        service_span: Optional[Tuple[int, int]] = None,
+        document: Optional[str] = None,
+    ):
+        """Initializer."""
+        self.did = did
+        self.numalgo = numalgo
+        self.keys = keys
+        self.service = service
+        self.service_span = service_span
+        self.document = document
+
+    def __eq__(self, other: object) -> bool:
+        """Compare to another parsed Peer DID for equality."""
+        if not isinstance(other, ParsedPeerDID):
+            return False
+        return self.did == other.did
+
+    def __hash__(self) -> int:
+        """Hash consistently with equality."""
+        return hash(self.did)
+
+    def __repr__(self) -> str:
+        """Parsed Peer DID representation."""
+        return "<ParsedPeerDID numalgo={} keys={} service={}>".format(
+            self.numalgo,
+            "".join(key.purpose or "" for key in self.keys) or len(self.keys),
+            self.service_span,
+        )
+
 
-def is_peer_did(peer_did: Union[str, DID]) -> bool:
+def parse_peer_did(
+    peer_did: Union[str, DID], limits: PeerDIDLimits = None
+) -> ParsedPeerDID:
+    """
+    Split a Peer DID into its key and service segments.
+
+    The DID is scanned once, in linear time, validating it against the Peer
+    DID syntax and the size limits. Keys and services are not decoded.
+
+    Reference: <https://identity.foundation/peer-did-method-spec/index.html#matching-regex>
+
+    :param peer_did: Peer DID to parse
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        or exceeds the limits
+    :return: the parsed Peer DID
+    """
+    if not isinstance(peer_did, str) or not peer_did.startswith(PEER_DID_PREFIX):
+        raise MalformedPeerDIDError("Does not match peer DID regexp")
+    max_length, max_keys, max_service_length = limits or DEFAULT_PEER_DID_LIMITS
+    if max_length is not None and len(peer_did) > max_length:
+        raise MalformedPeerDIDError(
+            "Exceeds the maximum length of {} characters".format(max_length)
+        )
+    peer_did = str(peer_did)
+    numalgo = peer_did[9:10]
+
+    if numalgo == "0" and _MULTIBASE_KEY(peer_did, 10):
+        key = KeySegment(None, peer_did[10:], (10, len(peer_did)))
+        return ParsedPeerDID(peer_did, 0, (key,))
+
+    if numalgo == "3" and _SHA256_HASH(peer_did, 10):
+        return ParsedPeerDID(peer_did, 3, ())
+
+    if numalgo == "4" and _SHA256_HASH(peer_did, 10, _NUMALGO_4_SHORT_LENGTH):
+        if len(peer_did) == _NUMALGO_4_SHORT_LENGTH:
+            return ParsedPeerDID(peer_did, 4, ())
+        if peer_did[_NUMALGO_4_SHORT_LENGTH] == ":" and _MULTIBASE_KEY(
+            peer_did, _NUMALGO_4_SHORT_LENGTH + 1
+        ):
+            return ParsedPeerDID(
+                peer_did, 4, (), document=peer_did[_NUMALGO_4_SHORT_LENGTH + 1 :]
+            )
+
+    if numalgo == "2" and peer_did[10:11] == ".":
+        # bound the work on the split, allowing for one service element
+        if max_keys is not None and peer_did.count(".", 10) > max_keys + 1:
+            raise MalformedPeerDIDError(
+                "Exceeds the maximum of {} keys".format(max_keys)
+            )
+        keys = []
+        service = service_span = None
+        start = 11
+        for element in peer_did[11:].split("."):
+            end = start + len(element)
+            purpose = element[:1]
+            if service is not None:
+                # the service must be the last element
+                break
+            elif purpose and purpose in _KEY_PURPOSES:
+                if not _MULTIBASE_KEY(element, 1):
+                    break
+                keys.append(KeySegment(purpose, element[1:], (start + 1, end)))
+            elif purpose == _SERVICE_PREFIX and keys:
+                if (
+                    max_service_length is not None
+                    and end - start > max_service_length + 1
+                ):
+                    raise MalformedPeerDIDError(
+                        "Service exceeds the maximum length of {} characters".format(
+                            max_service_length
+                        )
+                    )
+                if not _ENCODED_SERVICE(element, 1):
+                    break
+                service = element[1:]
+                service_span = (start + 1, end)
+            else:
+                break
+            start = end + 1
+        else:
+            if max_keys is not None and len(keys) > max_keys:
+                raise MalformedPeerDIDError(
+                    "Exceeds the maximum of {} keys".format(max_keys)
+                )
+            return ParsedPeerDID(peer_did, 2, tuple(keys), service, service_span)
+
+    raise MalformedPeerDIDError("Does not match peer DID regexp")
+
+
+def is_peer_did(peer_did: Union[str, DID], limits: PeerDIDLimits = None) -> bool:
     """
     Check if peer_did parameter matches the Peer DID spec.
 
     Reference: <https://identity.foundation/peer-did-method-spec/index.html#matching-regex>
 
     :param peer_did: peer_did to check
-    :return: True if peer_did matches spec, otherwise False
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :return: True if peer_did matches spec and the limits, otherwise False
     """
     if peer_did is None:
         return False
-    return bool(PEER_DID_PATTERN.match(peer_did))
+    try:
+        parse_peer_did(peer_did, limits)
+    except MalformedPeerDIDError:
+        return False
+    return True
 
 
 def create_peer_did_numalgo_0(
@@ -53,7 +279,11 @@ def create_peer_did_numalgo_0(
         raise ValueError(
             "Authentication not supported for key: {}.".format(inception_key)
         )
-    return "did:peer:0" + inception_key.to_multibase()
+    with instrumentation.span("create_peer_did_numalgo_0") as span:
+        # a single stage, timed by the span itself
+        peer_did = "did:peer:0" + inception_key.to_multibase()
+        span.set_did(peer_did)
+        return peer_did
 
 
 def create_peer_did_numalgo_2(
@@ -84,6 +314,19 @@ def create_peer_did_numalgo_2(
         if KeyRelationshipType.AUTHENTICATION not in k.relationships:
             raise ValueError("Authentication not supported for key: {}.".format(k))
 
+    with instrumentation.span("create_peer_did_numalgo_2") as span:
+        keys_str = span.stage(
+            "encode_keys", _encode_numalgo_2_keys, encryption_keys, signing_keys
+        )
+        service_str = span.stage("encode_service", encode_service, service)
+        peer_did = DID("did:peer:2" + keys_str + service_str)
+        span.set_did(peer_did)
+        return peer_did
+
+
+def _encode_numalgo_2_keys(
+    encryption_keys: Sequence[BaseKey], signing_keys: Sequence[BaseKey]
+) -> str:
     enc_sep = "." + Numalgo2Prefix.KEY_AGREEMENT.value
     auth_sep = "." + Numalgo2Prefix.AUTHENTICATION.value
     encryption_keys_str = (
@@ -96,94 +339,708 @@ def create_peer_did_numalgo_2(
         if signing_keys
         else ""
     )
-    service_str = encode_service(service)
+    return encryption_keys_str + auth_keys_str
+
+
+def create_peer_did_numalgo_3(
+    peer_did_numalgo_2: Union[str, DID], store: ShortFormStore = None
+) -> DID:
+    """
+    Generate the short form of a Peer DID created with the second algorithm.
+
+    The short form hashes the numalgo 2 Peer DID with SHA-256. Its long form is
+    recorded in the store, where resolve_peer_did looks it up.
+
+    :param peer_did_numalgo_2: the numalgo 2 Peer DID to shorten
+    :param store: the store recording the long form, defaults to get_default_store()
+    :raises MalformedPeerDIDError: if peer_did_numalgo_2 is not a numalgo 2 Peer DID
+    :return: generated Peer DID
+    """
+    parsed = parse_peer_did(peer_did_numalgo_2)
+    if parsed.numalgo != 2:
+        raise MalformedPeerDIDError("Not a numalgo 2 peer DID")
+    with instrumentation.span("create_peer_did_numalgo_3") as span:
+        peer_did = _numalgo_3_short_form(parsed.did)
+        span.set_did(peer_did)
+    if store is None:
+        store = get_default_store()
+    store.set_long_form(peer_did, parsed.did)
+    return peer_did
+
+
+def _numalgo_3_short_form(peer_did_numalgo_2: str) -> DID:
+    digest = sha256_multihash(peer_did_numalgo_2[len(PEER_DID_PREFIX) + 1 :].encode())
+    return DID("did:peer:3" + to_multibase(digest))
 
-    peer_did = DID("did:peer:2" + encryption_keys_str + auth_keys_str + service_str)
+
+def create_peer_did_numalgo_4(
+    input_document: dict, store: ShortFormStore = None
+) -> DID:
+    """
+    Generate a long-form Peer DID according to the fourth algorithm.
+
+    The long form embeds the encoded input document after the SHA-256 hash of
+    the encoding, which alone makes up the short form. The long form is
+    recorded in the store, where resolve_peer_did looks it up.
+
+    :param input_document: the DID Document to embed, without an `id`. Its
+        verification methods and services are identified relative to the DID,
+        as in "#key-1".
+    :param store: the store recording the long form, defaults to get_default_store()
+    :raises ValueError: if the input document is not a JSON object without an `id`
+    :return: generated long-form Peer DID
+    """
+    if not isinstance(input_document, dict) or "id" in input_document:
+        raise ValueError("Input document must be a JSON object without an id")
+    with instrumentation.span("create_peer_did_numalgo_4") as span:
+        encoded = span.stage("encode_document", encode_document, input_document)
+        short_form = "did:peer:4" + to_multibase(sha256_multihash(encoded.encode()))
+        peer_did = DID(short_form + ":" + encoded)
+        span.set_did(peer_did)
+    if store is None:
+        store = get_default_store()
+    store.set_long_form(short_form, peer_did)
     return peer_did
 
 
+def peer_did_numalgo_4_short_form(peer_did: Union[str, DID]) -> DID:
+    """
+    Get the short form of a numalgo 4 Peer DID.
+
+    :param peer_did: a long-form or short-form numalgo 4 Peer DID
+    :raises MalformedPeerDIDError: if peer_did is not a numalgo 4 Peer DID
+    :return: the short-form Peer DID
+    """
+    parsed = parse_peer_did(peer_did)
+    if parsed.numalgo != 4:
+        raise MalformedPeerDIDError("Not a numalgo 4 peer DID")
+    return DID(parsed.did[:_NUMALGO_4_SHORT_LENGTH])
+
+
+def peer_did_short_form(peer_did: Union[str, DID, ParsedPeerDID]) -> Optional[DID]:
+    """
+    Get the short form of a Peer DID, without recording it in any store.
+
+    The short form of a numalgo 2 Peer DID is its numalgo 3 form. Short forms
+    are their own short form.
+
+    :param peer_did: the Peer DID, or the result of parsing it
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :return: the short-form Peer DID, or None for numalgo 0 Peer DIDs
+    """
+    parsed = (
+        peer_did if isinstance(peer_did, ParsedPeerDID) else parse_peer_did(peer_did)
+    )
+    if parsed.numalgo == 2:
+        return _numalgo_3_short_form(parsed.did)
+    if parsed.numalgo == 3:
+        return DID(parsed.did)
+    if parsed.numalgo == 4:
+        return DID(parsed.did[:_NUMALGO_4_SHORT_LENGTH])
+    return None
+
+
 def resolve_peer_did(
     peer_did: Union[str, DID],
     format: KeyFormat = KeyFormat.MULTIBASE,
+    limits: PeerDIDLimits = None,
+    store: ShortFormStore = None,
 ) -> DIDDocument:
     """
     Resolve a DID Document from a Peer DID.
 
+    The document of a short-form (numalgo 3 or 4) Peer DID is that of its long
+    form, identified by the short form, with the long form in `alsoKnownAs`.
+    Numalgo 4 documents keep the key formats of their input document.
+
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :param store: the store of long forms of short-form Peer DIDs, defaults to
+        get_default_store()
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :raises UnknownPeerDIDError: if the long form of a short-form Peer DID is not known
+    :raises UnsupportedKeyFormatError: if a key of the Peer DID has no such format
+    :return: resolved DID Document as a JSON string
+    """
+    with instrumentation.span("resolve_peer_did", peer_did) as span:
+        parsed = span.stage("parse", parse_peer_did, peer_did, limits)
+        if parsed.numalgo == 4:
+            document = _numalgo_4_document(span, parsed, limits, store)
+            return span.stage("build", document.model)
+        long_form = None
+        if parsed.numalgo == 3:
+            long_form = span.stage("lookup", _lookup_long_form, parsed, limits, store)
+        source = long_form or parsed
+        keys = span.stage("key_decode", _decode_keys, source, format)
+        services = (
+            span.stage("service_decode", decode_service, source.service)
+            if source.service
+            else None
+        )
+        builder = span.stage(
+            "builder",
+            _did_document_builder,
+            parsed.did,
+            [long_form.did] if long_form else None,
+        )
+        span.stage("add_to_document", _add_to_document, builder, keys, services)
+        return span.stage("build", builder.build)
+
+
+def resolve_peer_did_json(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    limits: PeerDIDLimits = None,
+    store: ShortFormStore = None,
+) -> str:
+    """
+    Resolve a serialized DID Document from a Peer DID.
+
+    The document is built directly from the decoded keys and services, without
+    creating the pydid models. The output is identical to
+    `resolve_peer_did(peer_did, format).to_json()`.
+
     :param peer_did: Peer DID to resolve
     :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :param store: the store of long forms of short-form Peer DIDs, defaults to
+        get_default_store()
     :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :raises UnknownPeerDIDError: if the long form of a short-form Peer DID is not known
+    :raises UnsupportedKeyFormatError: if a key of the Peer DID has no such format
     :return: resolved DID Document as a JSON string
     """
-    if not is_peer_did(peer_did):
+    with instrumentation.span("resolve_peer_did_json", peer_did) as span:
+        parsed = span.stage("parse", parse_peer_did, peer_did, limits)
+        if parsed.numalgo == 4:
+            document = _numalgo_4_document(span, parsed, limits, store)
+            return span.stage("serialize", document.json)
+        long_form = None
+        if parsed.numalgo == 3:
+            long_form = span.stage("lookup", _lookup_long_form, parsed, limits, store)
+        source = long_form or parsed
+        keys = span.stage("key_decode", _decode_keys, source, format)
+        services = span.stage("service_decode", decode_service_dicts, source.service)
+        return span.stage(
+            "serialize",
+            _did_document_json,
+            parsed.did,
+            keys,
+            services,
+            [long_form.did] if long_form else None,
+        )
+
+
+def resolve_peer_did_formats(
+    peer_did: Union[str, DID],
+    limits: PeerDIDLimits = None,
+    store: ShortFormStore = None,
+) -> "ResolvedPeerDID":
+    """
+    Decode a Peer DID once, to render its DID Document in several key formats.
+
+    :param peer_did: Peer DID to resolve
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :param store: the store of long forms of short-form Peer DIDs, defaults to
+        get_default_store()
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :raises UnknownPeerDIDError: if the long form of a short-form Peer DID is not known
+    :return: the resolved Peer DID, rendering DID Documents on demand
+    """
+    with instrumentation.span("resolve_peer_did_formats", peer_did) as span:
+        parsed = span.stage("parse", parse_peer_did, peer_did, limits)
+        if parsed.numalgo == 4:
+            document = _numalgo_4_document(span, parsed, limits, store)
+            return ResolvedPeerDID(parsed.did, numalgo_4_document=document)
+        long_form = None
+        if parsed.numalgo == 3:
+            long_form = span.stage("lookup", _lookup_long_form, parsed, limits, store)
+        source = long_form or parsed
+        keys = span.stage("key_decode", _decode_keys, source, KeyFormat.MULTIBASE)
+        return ResolvedPeerDID(
+            parsed.did,
+            also_known_as=[long_form.did] if long_form else None,
+            keys=keys,
+            service=source.service,
+        )
+
+
+class ResolvedPeerDID:
+    """
+    A Peer DID decoded once, rendering its DID Document in any key format.
+
+    Keys and services are decoded up front, along with the verification
+    relationships of the keys, which are shared by every rendering. Each
+    format is rendered on first request and cached, documents as pickled
+    snapshots so that callers get independent copies. Numalgo 4 documents keep
+    the key formats of their input document, so every format renders the same.
+
+    Concurrent first requests for a format may render it more than once.
+    """
+
+    __slots__ = (
+        "did",
+        "also_known_as",
+        "keys",
+        "_service",
+        "_services",
+        "_service_dicts",
+        "_wiring",
+        "_numalgo_4_document",
+        "_models",
+        "_json",
+    )
+
+    def __init__(
+        self,
+        did: str,
+        also_known_as: Optional[List[str]] = None,
+        keys: Sequence[BaseKey] = (),
+        service: Optional[str] = None,
+        numalgo_4_document: "_Numalgo4Document" = None,
+    ):
+        """Initializer, see `resolve_peer_did_formats`."""
+        self.did = did
+        self.also_known_as = also_known_as
+        self.keys = tuple(keys)
+        self._service = service
+        self._services = None
+        self._service_dicts = None
+        self._wiring = _wire_keys(self.keys)
+        self._numalgo_4_document = numalgo_4_document
+        self._models = {}
+        self._json = {}
+
+    def document(self, format: KeyFormat = KeyFormat.MULTIBASE) -> DIDDocument:
+        """
+        Render the DID Document with public keys in a format.
+
+        :param format: the format of public keys in the DID Document
+        :raises UnsupportedKeyFormatError: if a key has no such format
+        :return: the DID Document, as returned by `resolve_peer_did`
+        """
+        if self._numalgo_4_document is not None:
+            return self._numalgo_4_document.model()
+        model = self._models.get(format)
+        if model is None:
+            builder = _did_document_builder(self.did, self.also_known_as)
+            _add_to_document(
+                builder, self.keys, self._decoded_services(), format, self._wiring
+            )
+            document = builder.build()
+            # the snapshot is taken before the caller can alter the document
+            self._models[format] = pickle.dumps(document, pickle.HIGHEST_PROTOCOL)
+            return document
+        return pickle.loads(model)
+
+    def document_json(self, format: KeyFormat = KeyFormat.MULTIBASE) -> str:
+        """
+        Render the serialized DID Document with public keys in a format.
+
+        :param format: the format of public keys in the DID Document
+        :raises UnsupportedKeyFormatError: if a key has no such format
+        :return: the serialized DID Document, as returned by `resolve_peer_did_json`
+        """
+        if self._numalgo_4_document is not None:
+            return self._numalgo_4_document.json()
+        document = self._json.get(format)
+        if document is None:
+            if self._service_dicts is None and self._service:
+                self._service_dicts = decode_service_dicts(self._service)
+            document = _did_document_json(
+                self.did,
+                self.keys,
+                self._service_dicts,
+                self.also_known_as,
+                format,
+                self._wiring,
+            )
+            self._json[format] = document
+        return document
+
+    def _decoded_services(self) -> Optional[List[Service]]:
+        if self._services is None and self._service:
+            self._services = decode_service(self._service)
+        return self._services
+
+
+def peek_services(
+    peer_did: Union[str, DID],
+    limits: PeerDIDLimits = None,
+    store: ShortFormStore = None,
+) -> Tuple[ServiceEndpoint, ...]:
+    """
+    Decode the service endpoints of a Peer DID, such as to route a message to it.
+
+    The service segment of a numalgo 2 Peer DID is located and decoded without
+    looking at its key segments, so a Peer DID may have its services peeked
+    and still fail to resolve. The long form of a numalgo 3 Peer DID is looked
+    up in the store, and numalgo 4 services are read from the input document.
+
+    :param peer_did: Peer DID to peek
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :param store: the store of long forms of short-form Peer DIDs, defaults to
+        get_default_store()
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        or its services are not valid
+    :raises UnknownPeerDIDError: if the long form of a short-form Peer DID is not known
+    :return: the endpoint of each service, in order
+    """
+    with instrumentation.span("peek_services", peer_did) as span:
+        if isinstance(peer_did, str) and peer_did.startswith(_NUMALGO_2_PREFIX):
+            service = span.stage("locate", _locate_service, peer_did, limits)
+            return span.stage("service_decode", decode_service_endpoints, service)
+        parsed = span.stage("parse", parse_peer_did, peer_did, limits)
+        if parsed.numalgo == 3:
+            long_form = span.stage("lookup", _lookup_long_form, parsed, limits, store)
+            return span.stage(
+                "service_decode", decode_service_endpoints, long_form.service
+            )
+        if parsed.numalgo == 4:
+            document = _numalgo_4_document(span, parsed, limits, store)
+            return span.stage("service_decode", _document_endpoints, document.document)
+        return ()
+
+
+def extract_keys(
+    peer_did: Union[str, DID],
+    limits: PeerDIDLimits = None,
+    store: ShortFormStore = None,
+) -> Tuple[ExtractedKey, ...]:
+    """
+    Extract the raw public keys of a Peer DID, with their codec and relationship.
+
+    Keys are decoded and validated as for resolution, without building the
+    verification methods. A key serving several relationships, such as the key
+    of a numalgo 0 Peer DID, is extracted once per relationship. Numalgo 4 keys
+    are read from the verification methods of the input document, which must
+    hold keys of a supported type in multibase, base58 or JWK format.
+
+    :param peer_did: Peer DID to extract the keys of
+    :param limits: the size limits to enforce, defaults to DEFAULT_PEER_DID_LIMITS
+    :param store: the store of long forms of short-form Peer DIDs, defaults to
+        get_default_store()
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :raises UnknownPeerDIDError: if the long form of a short-form Peer DID is not known
+    :return: the extracted keys, in order of appearance
+    """
+    with instrumentation.span("extract_keys", peer_did) as span:
+        parsed = span.stage("parse", parse_peer_did, peer_did, limits)
+        if parsed.numalgo == 4:
+            document = _numalgo_4_document(span, parsed, limits, store)
+            return span.stage("key_decode", _document_keys, document.document)
+        if parsed.numalgo == 3:
+            parsed = span.stage("lookup", _lookup_long_form, parsed, limits, store)
+        keys = span.stage("key_decode", _decode_keys, parsed, KeyFormat.MULTIBASE)
+        return tuple(
+            ExtractedKey(key.public_key, key.codec, relationship)
+            for segment, key in zip(parsed.keys, keys)
+            for relationship in (
+                (PURPOSE_RELATIONSHIPS[segment.purpose],)
+                if segment.purpose
+                else key.relationships
+            )
+        )
+
+
+def _document_keys(document: dict) -> Tuple[ExtractedKey, ...]:
+    """Extract and validate the keys of a numalgo 4 document, by relationship."""
+    methods = {}
+    for method in document.get("verificationMethod") or ():
+        if isinstance(method, dict):
+            methods[_fragment(method.get("id"))] = method
+    keys = []
+    for name, relationship in _DOCUMENT_RELATIONSHIPS:
+        items = document.get(name)
+        for item in items if isinstance(items, list) else ():
+            method = item if isinstance(item, dict) else methods.get(_fragment(item))
+            key = _document_key(method, item)
+            keys.append(ExtractedKey(key.public_key, key.codec, relationship))
+    return tuple(keys)
+
+
+def _fragment(ident) -> Optional[str]:
+    if not isinstance(ident, str):
+        return None
+    return ident[ident.find("#") :] if "#" in ident else ident
+
+
+def _document_key(method: Optional[dict], reference) -> BaseKey:
+    """Load the key of a verification method, validated as when resolving keys."""
+    if method is None:
+        raise MalformedPeerDIDError("Unknown verification method: {}".format(reference))
+    try:
+        public_key, codec = decode_verification_method_key(method)
+        if codec is None:
+            raise ValueError("Unknown key type: {}".format(method.get("type")))
+        return BaseKey.for_codec(codec)(public_key, ident=method.get("id"))
+    except (ValueError, KeyError) as e:
+        raise MalformedPeerDIDError(
+            "Invalid key in verification method: {}".format(method.get("id"))
+        ) from e
+
+
+def _locate_service(peer_did: str, limits: Optional[PeerDIDLimits]) -> Optional[str]:
+    """Find the encoded service of a numalgo 2 Peer DID, the last element if any."""
+    max_length, _, max_service_length = limits or DEFAULT_PEER_DID_LIMITS
+    if max_length is not None and len(peer_did) > max_length:
+        raise MalformedPeerDIDError(
+            "Exceeds the maximum length of {} characters".format(max_length)
+        )
+    # multibase keys hold no dots: the last one starts the last element
+    start = peer_did.rfind(".") + 1
+    if peer_did[start : start + 1] != _SERVICE_PREFIX:
+        return None
+    if start == len(_NUMALGO_2_PREFIX) or not _ENCODED_SERVICE(peer_did, start + 1):
         raise MalformedPeerDIDError("Does not match peer DID regexp")
-    if peer_did[9] == "0":
-        did_doc = _build_did_doc_numalgo_0(peer_did, format)
+    if (
+        max_service_length is not None
+        and len(peer_did) - start > max_service_length + 1
+    ):
+        raise MalformedPeerDIDError(
+            "Service exceeds the maximum length of {} characters".format(
+                max_service_length
+            )
+        )
+    return peer_did[start + 1 :]
+
+
+def _document_endpoints(document: dict) -> Tuple[ServiceEndpoint, ...]:
+    services = document.get("service") or ()
+    if isinstance(services, dict):
+        services = [services]
+    if not isinstance(services, list) or not all(
+        isinstance(service, dict) for service in services
+    ):
+        raise MalformedPeerDIDError("Service entry is not an object")
+    return tuple(service_endpoint(service) for service in services)
+
+
+def _lookup_long_form(
+    parsed: ParsedPeerDID, limits: Optional[PeerDIDLimits], store: ShortFormStore
+) -> ParsedPeerDID:
+    if store is None:
+        store = get_default_store()
+    long_form = store.get_long_form(parsed.did)
+    if long_form is None:
+        raise UnknownPeerDIDError(parsed.did)
+    long_form = parse_peer_did(long_form, limits)
+    if parsed.numalgo == 3:
+        if long_form.numalgo != 2:
+            raise MalformedPeerDIDError("Long form is not a numalgo 2 peer DID")
+        if _numalgo_3_short_form(long_form.did) != parsed.did:
+            raise MalformedPeerDIDError("Long form does not match the short form")
+    elif long_form.document is None or not long_form.did.startswith(parsed.did):
+        raise MalformedPeerDIDError("Long form does not match the short form")
+    return long_form
+
+
+def _numalgo_4_document(
+    span: instrumentation.Span,
+    parsed: ParsedPeerDID,
+    limits: Optional[PeerDIDLimits],
+    store: Optional[ShortFormStore],
+) -> "_Numalgo4Document":
+    """Resolve the document of a long-form or short-form numalgo 4 Peer DID."""
+    if parsed.document is None:
+        long_form = span.stage("lookup", _lookup_long_form, parsed, limits, store)
+        other_form = long_form.did
     else:
-        did_doc = _build_did_doc_numalgo_2(peer_did, format)
-    return did_doc
+        long_form = parsed
+        other_form = parsed.did[:_NUMALGO_4_SHORT_LENGTH]
+    resolved = _NUMALGO_4_DOCUMENTS.get(parsed.did)
+    if resolved is None:
+        document = span.stage("document_decode", _decode_numalgo_4_document, long_form)
+        resolved = _Numalgo4Document(
+            _contextualize_document(document, parsed.did, other_form)
+        )
+        # the document and its serializations are proportional to the long form
+        _NUMALGO_4_DOCUMENTS.put(parsed.did, resolved, size=4 * len(long_form.did))
+    if parsed is long_form:
+        # bind the short form, now that the long form is verified
+        span.stage("bind", _bind_short_form, store, other_form, parsed.did)
+    return resolved
+
+
+def _bind_short_form(store: Optional[ShortFormStore], short_form: str, long_form: str):
+    if store is None:
+        store = get_default_store()
+    if store.get_long_form(short_form) != long_form:
+        store.set_long_form(short_form, long_form)
+
+
+def _decode_numalgo_4_document(long_form: ParsedPeerDID) -> dict:
+    """Decode the input document of a long form, verifying its hash."""
+    multihash = from_base58(long_form.did[11:_NUMALGO_4_SHORT_LENGTH])
+    if not verify_sha256_multihash(long_form.document.encode("ascii"), multihash):
+        raise MalformedPeerDIDError("Hash does not match the encoded document")
+    return decode_document(long_form.document)
+
+
+def _contextualize_document(document: dict, peer_did: str, other_form: str) -> dict:
+    if "id" in document:
+        raise MalformedPeerDIDError("Invalid document: input document has an id")
+    document["id"] = peer_did
+    document["alsoKnownAs"] = [other_form]
+    methods = []
+    for name in ("verificationMethod",) + _VERIFICATION_RELATIONSHIPS:
+        value = document.get(name)
+        if isinstance(value, list):
+            methods.extend(value)
+    for method in methods:
+        if isinstance(method, dict) and "controller" not in method:
+            method["controller"] = peer_did
+    return document
+
+
+class _Numalgo4Document:
+    """Resolved numalgo 4 document, shared by callers through pickled snapshots.
+
+    Building the DIDDocument model is by far the costliest step of resolving a
+    numalgo 4 Peer DID, so it is done once per DID.
+    """
+
+    __slots__ = ("document", "_model", "_json")
+
+    def __init__(self, document: dict):
+        self.document = document
+        self._model = None
+        self._json = None
+
+    def model(self) -> DIDDocument:
+        if self._model is None:
+            try:
+                model = DIDDocument.deserialize(self.document)
+            except ValueError as e:
+                raise MalformedPeerDIDError("Invalid document") from e
+            self._model = pickle.dumps(model, pickle.HIGHEST_PROTOCOL)
+        return pickle.loads(self._model)
+
+    def json(self) -> str:
+        if self._json is None:
+            self._json = self.model().to_json()
+        return self._json
 
 
-def _did_document_builder(peer_did: Union[str, DID]) -> DIDDocumentBuilder:
+# the verification relationships of decoded keys, the same in every key format
+_KeyWiring = NamedTuple(
+    "_KeyWiring",
+    [
+        ("authentication", Tuple[DIDUrl, ...]),
+        ("key_agreement", Tuple[DIDUrl, ...]),
+    ],
+)
+
+
+def _wire_keys(keys: Sequence[BaseKey]) -> _KeyWiring:
+    authentication = []
+    key_agreement = []
+    for key in keys:
+        ident = DIDUrl.parse(str(key.ident))
+        if KeyRelationshipType.AUTHENTICATION in key.relationships:
+            authentication.append(ident)
+        if KeyRelationshipType.KEY_AGREEMENT in key.relationships:
+            key_agreement.append(ident)
+    return _KeyWiring(tuple(authentication), tuple(key_agreement))
+
+
+def _did_document_json(
+    peer_did: str,
+    keys: Sequence[BaseKey],
+    services: Optional[List[dict]],
+    also_known_as: Optional[List[str]] = None,
+    format: KeyFormat = None,
+    wiring: _KeyWiring = None,
+) -> str:
+
+    context = [DID_CONTEXT]
+    methods = []
+    for key in keys:
+        method_context, method = key.verification_method_dict(peer_did, format)
+        if method_context and method_context not in context:
+            context.append(method_context)
+        methods.append(method)
+    if wiring is None:
+        wiring = _wire_keys(keys)
+    auth = [str(ident) for ident in wiring.authentication]
+    agreement = [str(ident) for ident in wiring.key_agreement]
+
+    # keep the field order of the DIDDocument model
+    did_doc = {"@context": context, "id": peer_did}
+    if also_known_as:
+        did_doc["alsoKnownAs"] = also_known_as
+    if methods:
+        did_doc["verificationMethod"] = methods
+    if auth:
+        did_doc["authentication"] = auth
+        did_doc["assertionMethod"] = auth
+    if agreement:
+        did_doc["keyAgreement"] = agreement
+    if auth:
+        did_doc["capabilityInvocation"] = auth
+        did_doc["capabilityDelegation"] = auth
+    if services:
+        did_doc["service"] = services
+    return json.dumps(did_doc)
+
+
+def _did_document_builder(
+    peer_did: Union[str, DID], also_known_as: Optional[List[str]] = None
+) -> DIDDocumentBuilder:
     try:
-        return DIDDocumentBuilder(peer_did)
+        return DIDDocumentBuilder(peer_did, also_known_as=also_known_as)
     except InvalidDIDError as e:
         raise MalformedPeerDIDError("Invalid peer DID") from e
 
 
-def _add_key_to_document(builder: DIDDocumentBuilder, key: BaseKey):
-    ver_method_result = key.verification_method(builder.id)
+def _add_to_document(
+    builder: DIDDocumentBuilder,
+    keys: Sequence[BaseKey],
+    services: Optional[List[Service]],
+    format: KeyFormat = None,
+    wiring: _KeyWiring = None,
+):
+    for key in keys:
+        _add_key_to_document(builder, key, format)
+    if wiring is None:
+        wiring = _wire_keys(keys)
+    for ident in wiring.authentication:
+        builder.authentication.reference(ident)
+        builder.assertion_method.reference(ident)
+        builder.capability_delegation.reference(ident)
+        builder.capability_invocation.reference(ident)
+    for ident in wiring.key_agreement:
+        builder.key_agreement.reference(ident)
+    if services:
+        builder.service.services.extend(services)
+
+
+def _add_key_to_document(
+    builder: DIDDocumentBuilder, key: BaseKey, format: KeyFormat = None
+):
+    ver_method_result = key.verification_method(builder.id, format)
     builder.verification_method.methods.append(ver_method_result.method)
-    ver_ident = DIDUrl.parse(ver_method_result.method.id)
     if ver_method_result.context and ver_method_result.context not in builder.context:
         builder.context.append(ver_method_result.context)
-    for rel in key.relationships:
-        if rel == KeyRelationshipType.AUTHENTICATION:
-            builder.authentication.reference(ver_ident)
-            builder.assertion_method.reference(ver_ident)
-            builder.capability_delegation.reference(ver_ident)
-            builder.capability_invocation.reference(ver_ident)
-        elif rel == KeyRelationshipType.KEY_AGREEMENT:
-            builder.key_agreement.reference(ver_ident)
-
-
-def _build_did_doc_numalgo_0(
-    peer_did: Union[str, DID], format: KeyFormat
-) -> DIDDocument:
-    decoded_key = decode_multibase_numbasis(peer_did[10:], format)
-    builder = _did_document_builder(peer_did)
-    _add_key_to_document(builder, decoded_key)
-    return builder.build()
-
 
-def _build_did_doc_numalgo_2(
-    peer_did: Union[str, DID], format: KeyFormat
-) -> DIDDocument:
-    keys = peer_did[11:]
-    keys = keys.split(".")
-    builder = _did_document_builder(peer_did)
 
-    for key in keys:
-        if not key:
-            raise MalformedPeerDIDError("Blank key entry")
-        prefix = key[0]
-        if prefix == Numalgo2Prefix.SERVICE.value:
-            for svc in decode_service(key[1:]):
-                builder.service.services.append(svc)
-        elif prefix == Numalgo2Prefix.AUTHENTICATION.value:
-            decoded_key = decode_multibase_numbasis(key[1:], format)
-            if KeyRelationshipType.AUTHENTICATION not in decoded_key.relationships:
-                raise MalformedPeerDIDError(
-                    "Authentication not supported for key: {}.".format(key)
-                )
-            _add_key_to_document(builder, decoded_key)
-        elif prefix == Numalgo2Prefix.KEY_AGREEMENT.value:
-            decoded_key = decode_multibase_numbasis(key[1:], format)
-            if KeyRelationshipType.KEY_AGREEMENT not in decoded_key.relationships:
-                raise MalformedPeerDIDError(
-                    "Key agreement not supported for key: {}.".format(key)
-                )
-            _add_key_to_document(builder, decoded_key)
+def _decode_keys(parsed: ParsedPeerDID, format: KeyFormat) -> List[BaseKey]:
+    """Decode the keys of a parsed Peer DID, checking their purpose."""
+    keys = []
+    for purpose, value, _ in parsed.keys:
+        if purpose == Numalgo2Prefix.AUTHENTICATION.value:
+            required = KeyRelationshipType.AUTHENTICATION
+            error = "Authentication not supported for key: {}{}."
+        elif purpose == Numalgo2Prefix.KEY_AGREEMENT.value:
+            required = KeyRelationshipType.KEY_AGREEMENT
+            error = "Key agreement not supported for key: {}{}."
+        elif purpose is None:
+            required = None
         else:
-            raise MalformedPeerDIDError("Unknown prefix: {}.".format(prefix))
-
-    return builder.build()
+            raise MalformedPeerDIDError("Unknown prefix: {}.".format(purpose))
+        decoded_key = decode_multibase_numbasis(value, format)
+        if required and required not in decoded_key.relationships:
+            raise MalformedPeerDIDError(error.format(purpose, value))
+        keys.append(decoded_key)
+    return keys
@@ -11,3 +11,39 @@ class MalformedPeerDIDError(PeerDIDError):
     def __init__(self, msg: str) -> None:
         """Initializer."""
         super().__init__("Invalid peer DID provided. {}.".format(msg))
+        self.msg = msg
+
+    def __reduce__(self):
+        """Support pickling, such as when passed between processes."""
+        return (self.__class__, (self.msg,))
+
+
+class UnknownPeerDIDError(PeerDIDError):
+    """The long form of a short-form peer DID is not known."""
+
+    def __init__(self, did: str) -> None:
+        """Initializer."""
+        super().__init__("Unknown short-form peer DID: {}".format(did))
+        self.did = did
+
+    def __reduce__(self):
+        """Support pickling, such as when passed between processes."""
+        return (self.__class__, (self.did,))
+
+
+class UnsupportedKeyFormatError(PeerDIDError, ValueError):
+    """A key cannot be exported in the requested format."""
+
+    def __init__(self, key_type: str, format: str) -> None:
+        """Initializer."""
+        super().__init__(
+            "Unsupported key format for export: {} keys have no {} format".format(
+                key_type, format
+            )
+        )
+        self.key_type = key_type
+        self.format = format
+
+    def __reduce__(self):
+        """Support pickling, such as when passed between processes."""
+        return (self.__class__, (self.key_type, self.format))
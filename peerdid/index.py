@@ -0,0 +1,214 @@
+"""Reverse index from key material to the Peer DIDs holding it."""
+
+from threading import Lock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from pydid import DID, DIDDocument, DIDUrl, VerificationMethod
+
+from .core.peer_did_helper import (
+    PURPOSE_RELATIONSHIPS,
+    decode_multibase_numbasis,
+    decode_verification_method_key,
+)
+from .dids import parse_peer_did, resolve_peer_did
+from .errors import MalformedPeerDIDError
+from .keys import KeyFormat, KeyRelationshipType
+
+IndexedKey = NamedTuple(
+    "IndexedKey",
+    [
+        ("did", str),
+        ("ident", str),
+        ("public_key", bytes),
+        ("relationships", Tuple[KeyRelationshipType, ...]),
+    ],
+)
+
+
+class KeyIndex:
+    """
+    Thread-safe in-memory index of the keys of Peer DIDs.
+
+    Finds the Peer DIDs holding a raw public key, or a key identifier such as
+    the `kid` of an inbound message, with dictionary lookups. Entries are
+    added and removed one Peer DID at a time.
+    """
+
+    def __init__(self):
+        """Initializer."""
+        self._by_did: Dict[str, Tuple[IndexedKey, ...]] = {}
+        # entries by DID and identifier, so that adding and removing a DID is
+        # independent of the number of DIDs sharing a key or identifier
+        self._by_public_key: Dict[bytes, Dict[Tuple[str, str], IndexedKey]] = {}
+        self._by_ident: Dict[str, Dict[Tuple[str, str], IndexedKey]] = {}
+        self._lock = Lock()
+
+    def add(self, peer_did: Union[str, DID]) -> Tuple[IndexedKey, ...]:
+        """
+        Index the keys of a Peer DID, replacing any previous entries for it.
+
+        Numalgo 0 and 2 Peer DIDs are indexed without resolving their document.
+
+        :param peer_did: the Peer DID, such as returned by create_peer_did_numalgo_2
+        :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        :return: the entries added
+        """
+        parsed = parse_peer_did(peer_did)
+        if parsed.numalgo not in (0, 2):
+            return self.add_document(resolve_peer_did(parsed.did))
+        keys: Dict[str, List] = {}
+        for purpose, value, _ in parsed.keys:
+            key = decode_multibase_numbasis(value, KeyFormat.MULTIBASE)
+            if purpose is None:
+                relationships = key.relationships
+            else:
+                relationship = PURPOSE_RELATIONSHIPS.get(purpose)
+                if relationship not in key.relationships:
+                    raise MalformedPeerDIDError(
+                        "Unsupported purpose {} for key: {}".format(purpose, value)
+                    )
+                relationships = (relationship,)
+            _merge(keys, key.ident, key.public_key, relationships)
+        return self._replace(parsed.did, keys)
+
+    def add_document(self, did_doc: DIDDocument) -> Tuple[IndexedKey, ...]:
+        """
+        Index the keys of a DID Document, replacing any previous entries for its DID.
+
+        Verification methods are indexed if their public key is given in multibase,
+        base58 or JWK format, under the relationships referencing them.
+
+        :param did_doc: the DID Document, such as returned by resolve_peer_did
+        :return: the entries added
+        """
+        references: Dict[str, List[KeyRelationshipType]] = {}
+        methods = list(did_doc.verification_method or ())
+        for relationship, items in (
+            (KeyRelationshipType.AUTHENTICATION, did_doc.authentication),
+            (KeyRelationshipType.KEY_AGREEMENT, did_doc.key_agreement),
+        ):
+            for item in items or ():
+                if isinstance(item, VerificationMethod):
+                    methods.append(item)
+                    item = item.id
+                references.setdefault(str(item), []).append(relationship)
+        keys: Dict[str, List] = {}
+        for method in methods:
+            public_key = _method_public_key(method)
+            if public_key is not None:
+                ident = _relative_ident(method.id)
+                relationships = references.get(str(method.id), ())
+                _merge(keys, ident, public_key, relationships)
+        return self._replace(str(did_doc.id), keys)
+
+    def remove(self, peer_did: Union[str, DID]):
+        """Remove the entries of a Peer DID, if indexed."""
+        with self._lock:
+            self._remove(str(peer_did))
+
+    def lookup_key(self, public_key: bytes) -> Tuple[IndexedKey, ...]:
+        """
+        Find the entries of a raw public key.
+
+        :param public_key: the raw public key, without multicodec prefix
+        :return: the entries of the Peer DIDs holding the key
+        """
+        with self._lock:
+            return tuple(self._by_public_key.get(bytes(public_key), {}).values())
+
+    def lookup_kid(self, kid: str) -> Tuple[IndexedKey, ...]:
+        """
+        Find the entries of a key identifier.
+
+        :param kid: a relative key identifier such as "#6LSbysY2", or an absolute
+            one prefixed with the Peer DID as indexed
+        :return: the matching entries
+        """
+        did, _, fragment = kid.partition("#")
+        if not did:
+            with self._lock:
+                return tuple(self._by_ident.get(kid, {}).values())
+        ident = "#" + fragment
+        return tuple(
+            entry for entry in self._by_did.get(did, ()) if entry.ident == ident
+        )
+
+    def get(self, peer_did: Union[str, DID]) -> Tuple[IndexedKey, ...]:
+        """Get the entries of a Peer DID."""
+        return self._by_did.get(str(peer_did), ())
+
+    def __contains__(self, peer_did: Union[str, DID]) -> bool:
+        """Check whether a Peer DID is indexed."""
+        return str(peer_did) in self._by_did
+
+    def __len__(self) -> int:
+        """The number of Peer DIDs indexed."""
+        return len(self._by_did)
+
+    def _replace(self, did: str, keys: Dict[str, List]) -> Tuple[IndexedKey, ...]:
+        entries = tuple(
+            IndexedKey(did, ident, public_key, tuple(relationships))
+            for ident, (public_key, relationships) in keys.items()
+        )
+        with self._lock:
+            self._remove(did)
+            if not entries:
+                return entries
+            self._by_did[did] = entries
+            for entry in entries:
+                _append(self._by_public_key, entry.public_key, entry)
+                _append(self._by_ident, entry.ident, entry)
+        return entries
+
+    def _remove(self, did: str):
+        for entry in self._by_did.pop(did, ()):
+            _discard(self._by_public_key, entry.public_key, entry)
+            _discard(self._by_ident, entry.ident, entry)
+
+
+def _merge(
+    keys: Dict[str, List],
+    ident: str,
+    public_key: bytes,
+    relationships: Iterable[KeyRelationshipType],
+):
+    """Add a key to the keys of a DID, merging the relationships of repeated keys."""
+    entry = keys.setdefault(ident, [public_key, []])
+    for relationship in relationships:
+        if relationship not in entry[1]:
+            entry[1].append(relationship)
+
+
+def _append(index: dict, key, entry: IndexedKey):
+    entries = index.get(key)
+    if entries is None:
+        entries = index[key] = {}
+    entries[entry.did, entry.ident] = entry
+
+
+def _discard(index: dict, key, entry: IndexedKey):
+    entries = index.get(key)
+    if entries is not None:
+        entries.pop((entry.did, entry.ident), None)
+        if not entries:
+            del index[key]
+
+
+def _relative_ident(method_id: Union[str, DIDUrl]) -> str:
+    method_id = str(method_id)
+    return method_id[method_id.index("#") :] if "#" in method_id else method_id
+
+
+def _method_public_key(method: VerificationMethod) -> Optional[bytes]:
+    """Get the raw public key of a verification method, if in a supported format."""
+    try:
+        return decode_verification_method_key(
+            {
+                "type": method.type,
+                "publicKeyMultibase": method.public_key_multibase,
+                "publicKeyBase58": method.public_key_base58,
+                "publicKeyJwk": method.public_key_jwk,
+            }
+        )[0]
+    except (ValueError, KeyError):
+        return None
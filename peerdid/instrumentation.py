@@ -0,0 +1,287 @@
+"""Opt-in timing instrumentation for Peer DID creation and resolution.
+
+Instrumentation is disabled by default. While disabled, each instrumented call
+costs a global lookup and a pass-through call per stage. Once enabled, the
+duration of every call and of each of its stages is recorded into a sink::
+
+    from peerdid import instrumentation
+
+    registry = instrumentation.enable(slow_threshold=0.01, on_slow=print)
+    resolve_peer_did(peer_did)
+    registry.snapshot()["resolve_peer_did.parse"].count
+
+Measurements are named `<operation>` for the whole call and
+`<operation>.<stage>` for its stages. Failed calls are recorded as
+`<operation>.failed`.
+"""
+
+import bisect
+import logging
+import time
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# histogram bucket upper bounds in seconds: 1us doubling up to ~16s
+BUCKET_BOUNDS = tuple(1e-6 * 2**i for i in range(25))
+
+HistogramSnapshot = NamedTuple(
+    "HistogramSnapshot",
+    [
+        ("count", int),
+        ("total", float),
+        ("min", float),
+        ("max", float),
+        ("buckets", Tuple[int, ...]),
+    ],
+)
+
+SlowCall = NamedTuple(
+    "SlowCall",
+    [
+        ("operation", str),
+        ("peer_did", Optional[str]),
+        ("duration", float),
+        ("stages", Dict[str, float]),
+    ],
+)
+
+
+def histogram_percentile(snapshot: HistogramSnapshot, q: float) -> float:
+    """Estimate a percentile from a histogram snapshot.
+
+    :param snapshot: the histogram snapshot
+    :param q: the percentile, between 0 and 100
+    :return: the upper bound of the bucket containing the percentile, in seconds
+    """
+    if not snapshot.count:
+        return 0.0
+    rank = q / 100 * snapshot.count
+    seen = 0
+    for bound, count in zip(BUCKET_BOUNDS, snapshot.buckets):
+        seen += count
+        if seen >= rank:
+            return min(bound, snapshot.max)
+    return snapshot.max
+
+
+class MetricsSink(ABC):
+    """Receiver of timing measurements."""
+
+    @abstractmethod
+    def record(self, name: str, seconds: float):
+        """Record a single measurement."""
+
+
+class Histogram:
+    """Count, sum, extremes and log-scale bucket counts of measurements."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        """Initializer."""
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        # the final bucket collects everything above the last bound
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds: float):
+        """Add a measurement."""
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Fetch the current state of the histogram."""
+        return HistogramSnapshot(
+            self.count,
+            self.total,
+            self.min if self.count else 0.0,
+            self.max,
+            tuple(self.buckets),
+        )
+
+
+class HistogramRegistry(MetricsSink):
+    """Thread-safe in-memory sink keeping a histogram per measurement name."""
+
+    def __init__(self):
+        """Initializer."""
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = Lock()
+
+    def record(self, name: str, seconds: float):
+        """Record a single measurement."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def snapshot(self) -> Dict[str, HistogramSnapshot]:
+        """Fetch the state of every histogram."""
+        with self._lock:
+            return {name: h.snapshot() for name, h in self._histograms.items()}
+
+    def clear(self):
+        """Remove all measurements."""
+        with self._lock:
+            self._histograms.clear()
+
+
+class Span:
+    """Timing of a single instrumented call and its stages."""
+
+    __slots__ = ("_config", "operation", "peer_did", "stages", "_started")
+
+    def __init__(self, config: "_Config", operation: str, peer_did: Optional[str]):
+        """Initializer."""
+        self._config = config
+        self.operation = operation
+        self.peer_did = peer_did
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def stage(self, name: str, func: Callable, *args):
+        """Call a function, recording its duration as a stage of this call."""
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def set_did(self, peer_did: str):
+        """Set the Peer DID reported for this call, once it is known."""
+        self.peer_did = str(peer_did)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        config = self._config
+        sink = config.sink
+        prefix = self.operation + "."
+        # a failing sink or callback must not fail the instrumented call
+        try:
+            for name, seconds in self.stages.items():
+                sink.record(prefix + name, seconds)
+            sink.record(
+                self.operation if exc_type is None else prefix + "failed", duration
+            )
+        except Exception:
+            LOGGER.exception("Metrics sink failed to record %s", self.operation)
+        if (
+            config.on_slow is not None
+            and config.slow_threshold is not None
+            and duration >= config.slow_threshold
+        ):
+            try:
+                config.on_slow(
+                    SlowCall(self.operation, self.peer_did, duration, dict(self.stages))
+                )
+            except Exception:
+                LOGGER.exception("Slow call callback failed for %s", self.operation)
+
+
+class _NullSpan:
+    """Stand-in for Span while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def stage(self, name: str, func: Callable, *args):
+        return func(*args)
+
+    def set_did(self, peer_did: str):
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_Config = NamedTuple(
+    "_Config",
+    [
+        ("sink", MetricsSink),
+        ("slow_threshold", Optional[float]),
+        ("on_slow", Optional[Callable[[SlowCall], None]]),
+    ],
+)
+
+_NULL_SPAN = _NullSpan()
+_config: Optional[_Config] = None
+
+
+def enable(
+    sink: MetricsSink = None,
+    slow_threshold: float = None,
+    on_slow: Callable[[SlowCall], None] = None,
+) -> MetricsSink:
+    """Enable instrumentation, replacing any previous configuration.
+
+    :param sink: the sink receiving measurements, defaults to a new HistogramRegistry
+    :param slow_threshold: the duration in seconds from which a call is slow
+    :param on_slow: called with a SlowCall for each slow call
+    :return: the sink in use
+    """
+    global _config
+    if sink is None:
+        sink = HistogramRegistry()
+    _config = _Config(sink, slow_threshold, on_slow)
+    return sink
+
+
+def disable():
+    """Disable instrumentation."""
+    global _config
+    _config = None
+
+
+def is_enabled() -> bool:
+    """Check whether instrumentation is enabled."""
+    return _config is not None
+
+
+@contextmanager
+def instrumented(
+    sink: MetricsSink = None,
+    slow_threshold: float = None,
+    on_slow: Callable[[SlowCall], None] = None,
+) -> Iterator[MetricsSink]:
+    """Enable instrumentation for the duration of a `with` block.
+
+    The previous configuration is restored on exit.
+    """
+    global _config
+    previous = _config
+    try:
+        yield enable(sink, slow_threshold, on_slow)
+    finally:
+        _config = previous
+
+
+def span(operation: str, peer_did: str = None):
+    """Start timing an instrumented call.
+
+    :param operation: the name of the operation
+    :param peer_did: the Peer DID concerned, if already known
+    :return: a context manager timing the call and its stages
+    """
+    config = _config
+    if config is None:
+        return _NULL_SPAN
+    return Span(config, operation, None if peer_did is None else str(peer_did))
@@ -2,7 +2,17 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Optional, NamedTuple, Type, Union
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import uuid4
 
 from pydid import DID, DIDUrl, VerificationMethod
@@ -10,25 +20,47 @@ from pydid.verification_method import (
     Ed25519VerificationKey2018,
     Ed25519VerificationKey2020,
     JsonWebKey2020,
+    Multikey,
     X25519KeyAgreementKey2019,
     X25519KeyAgreementKey2020,
 )
 
+from .core.curve25519 import check_ed25519_public_key, check_x25519_public_key
+from .core.curves import COMPRESSED_LENGTH, CURVES, decompress_point
+from .core.lru import CacheStats, LRUCache
 from .core.jwk_okp import jwk_to_public_key, public_key_to_jwk
 from .core.multibase import (
     MultibaseFormat,
+    decode_multibase_batch,
     from_base58,
     from_multibase,
     to_base58,
     to_multibase,
 )
-from .core.multicodec import Codec, from_multicodec
+from .core.multicodec import (
+    AnyCodec,
+    Codec,
+    codec_info,
+    from_multicodec,
+    register_codec,
+)
+from .errors import UnsupportedKeyFormatError
 
 ED25519_KEY_LENGTH = 32
 ED25519_2020_CONTEXT = "https://w3id.org/security/suites/ed25519-2020/v1"
 X25519_KEY_LENGTH = 32
 X25519_2020_CONTEXT = "https://w3id.org/security/suites/x25519-2020/v1"
 JWS_2020_CONTEXT = "https://w3id.org/security/suites/jws-2020/v1"
+MULTIKEY_CONTEXT = "https://w3id.org/security/multikey/v1"
+
+# minimum number of keys for which vectorized decoding is attempted
+BATCH_DECODE_THRESHOLD = 16
+
+DEFAULT_INTERN_POOL_SIZE = 4096
+DEFAULT_STRICT_RESULTS_SIZE = 4096
+
+_intern_pool: Optional[LRUCache] = None
+_strict_results: Optional[LRUCache] = None
 
 
 class KeyFormat(Enum):
@@ -54,19 +86,35 @@ VerificationMethodResult = NamedTuple(
     ],
 )
 
+MethodType = NamedTuple(
+    "MethodType",
+    [
+        ("context", Optional[str]),
+        ("type", str),
+    ],
+)
+
 
 class BaseKey(ABC):
-    """Base class for key types."""
+    """Base class for key types.
+
+    Keys are immutable and hashable; equality and hashing consider the key type
+    and public key only. Encodings of the public key are computed on first use
+    and cached.
+    """
+
+    __slots__ = ("public_key", "ident", "format", "_multibase", "_base58", "_jwk")
 
-    codec: Codec
+    codec: AnyCodec
     format: KeyFormat
-    ident: Optional[Union[str, DIDUrl]] = None
+    ident: Union[str, DIDUrl]
     key_length: Optional[int] = None
+    method_types: Dict[KeyFormat, MethodType] = {}
     public_key: bytes
     relationships: List[KeyRelationshipType]
 
     @classmethod
-    def for_codec(cls, codec: Codec) -> Type["BaseKey"]:
+    def for_codec(cls, codec: AnyCodec) -> Type["BaseKey"]:
         """Get the BaseKey subclass for a specific codec and key format."""
         cls_codec = getattr(cls, "codec", None)
         if cls_codec:
@@ -76,17 +124,16 @@ class BaseKey(ABC):
                 )
             return cls
 
-        if codec == Codec.ED25519:
-            return Ed25519VerificationKey
-        elif codec == Codec.X25519:
-            return X25519KeyAgreementKey
-        raise ValueError("Unsupported codec")
+        key_type = codec_info(codec).key_type
+        if key_type is None:
+            raise ValueError("Unsupported codec: {}".format(codec))
+        return key_type
 
     @classmethod
     def from_base58(
         cls,
         enc_key: str,
-        codec: Codec = None,
+        codec: AnyCodec = None,
         ident: Union[str, DIDUrl] = None,
         format: KeyFormat = None,
     ) -> "BaseKey":
@@ -102,14 +149,65 @@ class BaseKey(ABC):
     def from_multibase(
         cls, multibase: str, ident: Union[str, DIDUrl] = None, format: KeyFormat = None
     ) -> "BaseKey":
-        """Load a multibase, multicodec-encoded key."""
-        encnumbasis, multicodec = from_multibase(multibase)
-        ident = ident or "#" + encnumbasis[:8]
+        """Load a multibase, multicodec-encoded key.
+
+        While key interning is enabled, repeated loads of the same key with the
+        same identifier and format return the same object.
+        """
+        ident = ident or "#" + multibase[1:9]
+        format = format or KeyFormat.MULTIBASE
+        pool = _intern_pool
+        if pool is not None:
+            intern_key = (multibase, ident, format)
+            key = pool.get(intern_key)
+            if key is not None and isinstance(key, cls):
+                return key
+        _, multicodec = from_multibase(multibase)
         public_key, codec = from_multicodec(multicodec)
         key_type_cls = cls.for_codec(codec)
-        return key_type_cls(
-            public_key, ident=ident, format=format or KeyFormat.MULTIBASE
-        )
+        key = key_type_cls(public_key, ident=ident, format=format)
+        if not multibase[-1].isspace():
+            # the input is the canonical encoding of the key
+            object.__setattr__(key, "_multibase", multibase)
+        if pool is not None:
+            pool.put(intern_key, key)
+        return key
+
+    @classmethod
+    def from_multibase_batch(
+        cls, multibases: Sequence[str], format: KeyFormat = None
+    ) -> List["BaseKey"]:
+        """Load many multibase, multicodec-encoded keys.
+
+        When NumPy is installed and enough keys are given, the base58 decoding
+        is vectorized across keys of the same encoded length. While key interning
+        is enabled, keys are loaded one by one through the intern pool instead.
+        """
+        decoded = failed = None
+        if len(multibases) >= BATCH_DECODE_THRESHOLD and _intern_pool is None:
+            try:
+                decoded, failed = decode_multibase_batch(multibases)
+            except ImportError:
+                pass
+        if decoded is None:
+            return [cls.from_multibase(mb, format=format) for mb in multibases]
+
+        result = []
+        for multibase, row, row_failed in zip(multibases, decoded, failed):
+            if row_failed:
+                # other lengths, or invalid (raising the usual error)
+                result.append(cls.from_multibase(multibase, format=format))
+                continue
+            public_key, codec = from_multicodec(row)
+            key_type_cls = cls.for_codec(codec)
+            key = key_type_cls(
+                public_key,
+                ident="#" + multibase[1:9],
+                format=format or KeyFormat.MULTIBASE,
+            )
+            object.__setattr__(key, "_multibase", multibase)
+            result.append(key)
+        return result
 
     @classmethod
     def from_jwk(
@@ -130,20 +228,51 @@ class BaseKey(ABC):
         format: KeyFormat = None,
     ):
         """Initializer."""
-        self.public_key = public_key
-        self.ident = ident or "#" + str(uuid4)
-        self.format = format or KeyFormat.MULTIBASE
+        init = object.__setattr__
+        init(self, "public_key", public_key)
+        init(self, "ident", ident or "#" + str(uuid4))
+        init(self, "format", format or KeyFormat.MULTIBASE)
+        init(self, "_multibase", None)
+        init(self, "_base58", None)
+        init(self, "_jwk", None)
         self.validate()
 
+    def __setattr__(self, name: str, value):
+        """Keys are immutable."""
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __delattr__(self, name: str):
+        """Keys are immutable."""
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __reduce__(self):
+        """Pickle support, bypassing the immutability check."""
+        return (self.__class__, (self.public_key, self.ident, self.format))
+
     def validate(self):
         """Validate the key.
 
+        While strict validation is enabled, `validate_strict` runs as well.
+
         :raises ValueError: if the public key is invalid
         """
         if self.key_length and len(self.public_key) != self.key_length:
             raise ValueError(
                 "Invalid public key, expected {} bytes".format(self.key_length)
             )
+        results = _strict_results
+        if results is not None:
+            error = _strict_validation_error(self, results)
+            if error:
+                raise ValueError(error)
+
+    def validate_strict(self):
+        """Validate the public key as a point of the key's curve.
+
+        Key types without such checks accept any public key of the right length.
+
+        :raises ValueError: if the public key is invalid
+        """
 
     @abstractmethod
     def verification_method(
@@ -151,9 +280,58 @@ class BaseKey(ABC):
     ) -> VerificationMethodResult:
         """Generate a VerificationMethod entry for this key."""
 
+    def verification_method_dict(
+        self, controller: Union[str, DID], format: KeyFormat = None
+    ) -> Tuple[Optional[str], dict]:
+        """Generate a serialized VerificationMethod entry for this key.
+
+        The result matches the serialization of `verification_method`, without
+        building the model.
+
+        :return: a tuple of the context required by the method, and the method
+        """
+        format = format or self.format
+        method_type = self.method_types.get(format)
+        if not method_type:
+            raise UnsupportedKeyFormatError(type(self).__name__, format.name)
+        if format == KeyFormat.BASE58:
+            prop, value = "publicKeyBase58", self.to_base58()
+        elif format == KeyFormat.MULTIBASE:
+            prop, value = "publicKeyMultibase", self.to_multibase()
+        else:
+            prop, value = "publicKeyJwk", self.to_jwk()
+        return method_type.context, {
+            "id": str(self.ident),
+            "type": method_type.type,
+            "controller": str(controller),
+            prop: value,
+        }
+
     def to_multibase(self, format: MultibaseFormat = None) -> str:
         """Encode this key in multibase format."""
-        return to_multibase(self.codec.encode_multicodec(self.public_key), format)
+        if format and format != MultibaseFormat.BASE58:
+            return to_multibase(self.codec.encode_multicodec(self.public_key), format)
+        encoded = self._multibase
+        if encoded is None:
+            encoded = to_multibase(self.codec.encode_multicodec(self.public_key))
+            object.__setattr__(self, "_multibase", encoded)
+        return encoded
+
+    def to_base58(self) -> str:
+        """Encode the public key in base58, without a multicodec prefix."""
+        encoded = self._base58
+        if encoded is None:
+            encoded = to_base58(self.public_key)
+            object.__setattr__(self, "_base58", encoded)
+        return encoded
+
+    def to_jwk(self) -> dict:
+        """Encode the public key as a JWK."""
+        jwk = self._jwk
+        if jwk is None:
+            jwk = public_key_to_jwk(self.public_key, self.codec)
+            object.__setattr__(self, "_jwk", jwk)
+        return dict(jwk)
 
     def __eq__(self, other: object) -> bool:
         """Compare to another key for equality."""
@@ -161,6 +339,10 @@ class BaseKey(ABC):
             return False
         return self.public_key == other.public_key
 
+    def __hash__(self) -> int:
+        """Hash consistently with equality."""
+        return hash((self.__class__, self.public_key))
+
     def __repr__(self) -> str:
         """Key representation."""
         return "<{} {}>".format(self.__class__.__name__, self.to_multibase())
@@ -169,9 +351,25 @@ class BaseKey(ABC):
 class Ed25519VerificationKey(BaseKey):
     """Ed25519 verification key."""
 
+    __slots__ = ()
+
     codec = Codec.ED25519
     key_length = ED25519_KEY_LENGTH
     relationships = [KeyRelationshipType.AUTHENTICATION]
+    method_types = {
+        KeyFormat.BASE58: MethodType(None, "Ed25519VerificationKey2018"),
+        KeyFormat.MULTIBASE: MethodType(
+            ED25519_2020_CONTEXT, "Ed25519VerificationKey2020"
+        ),
+        KeyFormat.JWK: MethodType(JWS_2020_CONTEXT, "JsonWebKey2020"),
+    }
+
+    def validate_strict(self):
+        """Validate the public key as a canonical point of the curve.
+
+        :raises ValueError: if the public key is not on the curve or has small order
+        """
+        check_ed25519_public_key(self.public_key)
 
     def verification_method(
         self, controller: Union[str, DID], format: KeyFormat = None, **extra
@@ -185,7 +383,7 @@ class Ed25519VerificationKey(BaseKey):
             method = Ed25519VerificationKey2018.make(
                 id=self.ident,
                 controller=controller,
-                public_key_base58=to_base58(self.public_key),
+                public_key_base58=self.to_base58(),
                 **extra
             )
         elif format == KeyFormat.MULTIBASE:
@@ -193,29 +391,45 @@ class Ed25519VerificationKey(BaseKey):
             method = Ed25519VerificationKey2020.make(
                 id=self.ident,
                 controller=controller,
-                public_key_multibase=to_multibase(
-                    self.codec.encode_multicodec(self.public_key)
-                ),
+                public_key_multibase=self.to_multibase(),
                 **extra
             )
         elif format == KeyFormat.JWK:
             context = JWS_2020_CONTEXT
-            jwk = public_key_to_jwk(self.public_key, self.codec)
             method = JsonWebKey2020.make(
-                id=self.ident, controller=controller, public_key_jwk=jwk, **extra
+                id=self.ident,
+                controller=controller,
+                public_key_jwk=self.to_jwk(),
+                **extra
             )
 
         if not method:
-            raise ValueError("Unsupported key format for export")
+            raise UnsupportedKeyFormatError(type(self).__name__, format.name)
         return VerificationMethodResult(context, method)
 
 
 class X25519KeyAgreementKey(BaseKey):
     """X25519 public encryption key."""
 
+    __slots__ = ()
+
     codec = Codec.X25519
     key_length = X25519_KEY_LENGTH
     relationships = [KeyRelationshipType.KEY_AGREEMENT]
+    method_types = {
+        KeyFormat.BASE58: MethodType(None, "X25519KeyAgreementKey2019"),
+        KeyFormat.MULTIBASE: MethodType(
+            X25519_2020_CONTEXT, "X25519KeyAgreementKey2020"
+        ),
+        KeyFormat.JWK: MethodType(JWS_2020_CONTEXT, "JsonWebKey2020"),
+    }
+
+    def validate_strict(self):
+        """Validate the public key as a point of large order.
+
+        :raises ValueError: if the public key is a point of small order
+        """
+        check_x25519_public_key(self.public_key)
 
     def verification_method(
         self, controller: Union[str, DID], format: KeyFormat = None, **extra
@@ -229,7 +443,7 @@ class X25519KeyAgreementKey(BaseKey):
             method = X25519KeyAgreementKey2019.make(
                 id=self.ident,
                 controller=controller,
-                public_key_base58=to_base58(self.public_key),
+                public_key_base58=self.to_base58(),
                 **extra
             )
         elif format == KeyFormat.MULTIBASE:
@@ -237,18 +451,201 @@ class X25519KeyAgreementKey(BaseKey):
             method = X25519KeyAgreementKey2020.make(
                 id=self.ident,
                 controller=controller,
-                public_key_multibase=to_multibase(
-                    self.codec.encode_multicodec(self.public_key)
-                ),
+                public_key_multibase=self.to_multibase(),
                 **extra
             )
         elif format == KeyFormat.JWK:
             context = JWS_2020_CONTEXT
-            jwk = public_key_to_jwk(self.public_key, self.codec)
             method = JsonWebKey2020.make(
-                id=self.ident, controller=controller, public_key_jwk=jwk, **extra
+                id=self.ident,
+                controller=controller,
+                public_key_jwk=self.to_jwk(),
+                **extra
             )
 
         if not method:
-            raise ValueError("Unsupported key format for export")
+            raise UnsupportedKeyFormatError(type(self).__name__, format.name)
         return VerificationMethodResult(context, method)
+
+
+class ECVerificationKey(BaseKey):
+    """Base class for verification keys on short Weierstrass curves.
+
+    Public keys are held as compressed points, checked to be on the curve
+    when the key is loaded. Decompressed points are cached, so exporting the
+    key as a JWK reuses the decompression done by the check.
+    """
+
+    __slots__ = ()
+
+    key_length = COMPRESSED_LENGTH
+    relationships = [KeyRelationshipType.AUTHENTICATION]
+    method_types = {
+        KeyFormat.MULTIBASE: MethodType(MULTIKEY_CONTEXT, "Multikey"),
+        KeyFormat.JWK: MethodType(JWS_2020_CONTEXT, "JsonWebKey2020"),
+    }
+
+    def validate(self):
+        """Validate the key.
+
+        :raises ValueError: if the public key is not a compressed point of the curve
+        """
+        super().validate()
+        if self.public_key[0] not in (2, 3):
+            raise ValueError("Invalid public key, expected a compressed point")
+        decompress_point(CURVES[codec_info(self.codec).crv], self.public_key)
+
+    def verification_method(
+        self, controller: Union[str, DID], format: KeyFormat = None, **extra
+    ) -> VerificationMethodResult:
+        """Generate a VerificationMethod entry for this key."""
+        method = None
+        context = None
+
+        format = format or self.format
+        if format == KeyFormat.MULTIBASE:
+            context = MULTIKEY_CONTEXT
+            method = Multikey.make(
+                id=self.ident,
+                controller=controller,
+                public_key_multibase=self.to_multibase(),
+                **extra
+            )
+        elif format == KeyFormat.JWK:
+            context = JWS_2020_CONTEXT
+            method = JsonWebKey2020.make(
+                id=self.ident,
+                controller=controller,
+                public_key_jwk=self.to_jwk(),
+                **extra
+            )
+
+        if not method:
+            raise UnsupportedKeyFormatError(type(self).__name__, format.name)
+        return VerificationMethodResult(context, method)
+
+
+class P256VerificationKey(ECVerificationKey):
+    """P-256 (secp256r1) verification key."""
+
+    __slots__ = ()
+
+    codec = Codec.P256
+
+
+class Secp256k1VerificationKey(ECVerificationKey):
+    """secp256k1 verification key."""
+
+    __slots__ = ()
+
+    codec = Codec.SECP256K1
+
+
+def register_key_type(key_type: Type[BaseKey]) -> Type[BaseKey]:
+    """
+    Register the BaseKey subclass loading the keys of its codec.
+
+    The codec must be registered with `peerdid.core.multicodec.register_codec`
+    first. Usable as a class decorator.
+
+    :param key_type: the BaseKey subclass, with a `codec` attribute
+    :raises ValueError: if the codec is not registered
+    :return: the BaseKey subclass
+    """
+    codec_info(key_type.codec)
+    register_codec(key_type.codec, key_type=key_type)
+    return key_type
+
+
+register_key_type(Ed25519VerificationKey)
+register_key_type(X25519KeyAgreementKey)
+register_key_type(P256VerificationKey)
+register_key_type(Secp256k1VerificationKey)
+
+
+def enable_key_interning(max_entries: int = DEFAULT_INTERN_POOL_SIZE):
+    """Share key objects between `BaseKey.from_multibase` calls.
+
+    Keys are immutable, so the same object can be returned for every load of a
+    key string, such as a mediator key appearing in many Peer DIDs. Interned keys
+    are held in a bounded LRU pool, replacing any previous pool.
+
+    :param max_entries: the maximum number of keys retained
+    """
+    global _intern_pool
+    _intern_pool = LRUCache(max_entries=max_entries)
+
+
+def disable_key_interning():
+    """Stop interning keys and release the pool."""
+    global _intern_pool
+    _intern_pool = None
+
+
+def key_interning_stats() -> Optional[CacheStats]:
+    """Get the intern pool statistics, or None if interning is disabled."""
+    pool = _intern_pool
+    return pool.stats() if pool is not None else None
+
+
+def enable_strict_key_validation(max_entries: int = DEFAULT_STRICT_RESULTS_SIZE):
+    """Validate keys as points of their curve whenever they are loaded.
+
+    Besides their length, Ed25519 keys are checked to be canonical points of the
+    curve, not of small order, and X25519 keys not to be of small order (EC keys
+    are always checked to be points of their curve). Invalid keys then fail to load, so Peer DIDs
+    holding them fail to resolve.
+
+    Results are memoized per public key in a bounded LRU cache, replacing any
+    previous cache, so repeated loads of a key are checked once. Interned keys
+    are dropped, as they may have been loaded without the checks.
+
+    :param max_entries: the maximum number of results retained
+    """
+    global _strict_results
+    _strict_results = LRUCache(max_entries=max_entries)
+    if _intern_pool is not None:
+        _intern_pool.clear()
+
+
+def disable_strict_key_validation():
+    """Stop validating keys as points of their curve and release the results."""
+    global _strict_results
+    _strict_results = None
+
+
+def strict_key_validation_stats() -> Optional[CacheStats]:
+    """Get the memoized results statistics, or None if strict validation is disabled."""
+    results = _strict_results
+    return results.stats() if results is not None else None
+
+
+def validate_keys(keys: Iterable[BaseKey]) -> List[Optional[str]]:
+    """Validate many keys as points of their curve, as for bulk imports.
+
+    The checks of strict validation run whether or not it is enabled. Each
+    distinct public key is checked once, reusing the memoized results of strict
+    validation if enabled.
+
+    :param keys: the keys to validate
+    :return: for each key, the reason it is invalid, or None if it is valid
+    """
+    keys = list(keys)
+    results = _strict_results
+    if results is None:
+        results = LRUCache(max_entries=max(len(keys), 1))
+    return [_strict_validation_error(key, results) or None for key in keys]
+
+
+def _strict_validation_error(key: BaseKey, results: LRUCache) -> str:
+    """Run the strict checks of a key, memoized: an empty string if it is valid."""
+    memo_key = (key.codec, key.public_key)
+    error = results.get(memo_key)
+    if error is None:
+        try:
+            key.validate_strict()
+            error = ""
+        except ValueError as e:
+            error = str(e)
+        results.put(memo_key, error)
+    return error
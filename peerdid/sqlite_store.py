@@ -0,0 +1,300 @@
+"""Persistent store of resolved Peer DID documents, backed by SQLite."""
+
+import json
+import sqlite3
+
+from itertools import islice
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pydid import DID, DIDDocument
+
+from .dids import (
+    ParsedPeerDID,
+    parse_peer_did,
+    peer_did_short_form,
+    resolve_peer_did_json,
+)
+from .store import InMemoryShortFormStore, ShortFormStore
+
+# rows written per transaction by the bulk inserts
+DEFAULT_BATCH_SIZE = 10_000
+# host parameters per bulk lookup query, within the historical SQLite limit of 999
+_MAX_VARIABLES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS peer_dids (
+    did TEXT PRIMARY KEY,
+    short_form TEXT,
+    document TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS peer_dids_short_form ON peer_dids (short_form);
+CREATE TABLE IF NOT EXISTS peer_did_keys (
+    fingerprint TEXT NOT NULL,
+    did TEXT NOT NULL,
+    PRIMARY KEY (fingerprint, did)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS peer_did_keys_did ON peer_did_keys (did);
+"""
+
+
+class PeerDIDStore(ShortFormStore):
+    """
+    Resolved DID Documents persisted in SQLite, along with their source Peer DID.
+
+    Documents are indexed by Peer DID, by short form (the numalgo 3 form of
+    numalgo 2 Peer DIDs, the short form of numalgo 4 ones) and by the
+    fingerprints of their keys, the multibase-encoded public keys. As a
+    ShortFormStore, it resolves short-form Peer DIDs to the long forms stored.
+
+    A single connection is shared by all threads, serialized by a lock.
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Initializer.
+
+        :param path: the database file, or ":memory:" for a transient database
+        :param batch_size: the number of rows written per transaction by bulk inserts
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+
+    def add(self, peer_did: Union[str, DID], document: str = None):
+        """
+        Store the resolved DID Document of a Peer DID.
+
+        :param peer_did: the Peer DID, in long form
+        :param document: the serialized DID Document, resolved if not given
+        :raises MalformedPeerDIDError: if peer_did is not a valid Peer DID
+        :raises ValueError: if peer_did is a short form
+        """
+        self.add_many([(peer_did, document)])
+
+    def add_many(self, entries: Iterable[Union[str, Tuple[str, Optional[str]]]]):
+        """
+        Store the resolved DID Documents of many Peer DIDs.
+
+        Entries are written in transactions of `batch_size` rows. Documents
+        replace those already stored for the same Peer DIDs.
+
+        :param entries: Peer DIDs, or pairs of a Peer DID and its serialized DID
+            Document (None to resolve it)
+        :raises MalformedPeerDIDError: if an entry is not a valid Peer DID
+        :raises ValueError: if an entry is a short form
+        """
+        entries = iter(entries)
+        while True:
+            rows = []
+            keys = []
+            for entry in islice(entries, self.batch_size):
+                peer_did, document = (entry, None) if isinstance(entry, str) else entry
+                row, fingerprints = _row(parse_peer_did(peer_did), document)
+                rows.append(row)
+                keys.extend((fingerprint, row[0]) for fingerprint in fingerprints)
+            if not rows:
+                break
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "DELETE FROM peer_did_keys WHERE did = ?",
+                    ((row[0],) for row in rows),
+                )
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO peer_dids (did, short_form, document) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO peer_did_keys (fingerprint, did) "
+                    "VALUES (?, ?)",
+                    keys,
+                )
+
+    def get_document_json(self, peer_did: Union[str, DID]) -> Optional[str]:
+        """
+        Fetch the serialized DID Document of a Peer DID.
+
+        :param peer_did: the Peer DID, in long form
+        :return: the serialized DID Document, or None if it is not stored
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT document FROM peer_dids WHERE did = ?", (str(peer_did),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_document(self, peer_did: Union[str, DID]) -> Optional[DIDDocument]:
+        """
+        Fetch the DID Document of a Peer DID.
+
+        :param peer_did: the Peer DID, in long form
+        :return: the DID Document, or None if it is not stored
+        """
+        document = self.get_document_json(peer_did)
+        return DIDDocument.from_json(document) if document is not None else None
+
+    def get_documents_json(
+        self, peer_dids: Iterable[Union[str, DID]]
+    ) -> Dict[str, str]:
+        """
+        Fetch the serialized DID Documents of many Peer DIDs.
+
+        :param peer_dids: the Peer DIDs, in long form
+        :return: the serialized DID Documents stored, by Peer DID
+        """
+        return dict(
+            self._select_in(
+                "SELECT did, document FROM peer_dids WHERE did IN ({})",
+                [str(peer_did) for peer_did in peer_dids],
+            )
+        )
+
+    def find_by_key(self, fingerprint: str) -> List[str]:
+        """
+        Find the Peer DIDs whose document holds a key.
+
+        :param fingerprint: the multibase-encoded public key
+        :return: the Peer DIDs stored with that key
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT did FROM peer_did_keys WHERE fingerprint = ?", (fingerprint,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def find_by_keys(self, fingerprints: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Find the Peer DIDs whose document holds any of many keys.
+
+        :param fingerprints: the multibase-encoded public keys
+        :return: the Peer DIDs stored with each key found, by key
+        """
+        found: Dict[str, List[str]] = {}
+        for fingerprint, peer_did in self._select_in(
+            "SELECT fingerprint, did FROM peer_did_keys WHERE fingerprint IN ({})",
+            list(fingerprints),
+        ):
+            found.setdefault(fingerprint, []).append(peer_did)
+        return found
+
+    def get_long_form(self, short_form: str) -> Optional[str]:
+        """Look up the long form of a short-form Peer DID."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT did FROM peer_dids WHERE short_form = ?", (str(short_form),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_long_forms(self, short_forms: Iterable[str]) -> List[Optional[str]]:
+        """Look up the long forms of many short-form Peer DIDs."""
+        short_forms = [str(short_form) for short_form in short_forms]
+        long_forms = dict(
+            self._select_in(
+                "SELECT short_form, did FROM peer_dids WHERE short_form IN ({})",
+                short_forms,
+            )
+        )
+        return [long_forms.get(short_form) for short_form in short_forms]
+
+    def set_long_form(self, short_form: str, long_form: str):
+        """
+        Record the long form of a short-form Peer DID, storing its DID Document.
+
+        :raises ValueError: if short_form is not the short form of long_form
+        """
+        self.set_long_forms([(short_form, long_form)])
+
+    def set_long_forms(self, pairs: Iterable[Tuple[str, str]]):
+        """Record the long forms of many short-form Peer DIDs, storing their DID Documents.
+
+        :raises ValueError: if a short form does not match its long form
+        """
+        self.add_many(_checked_long_forms(pairs))
+
+    def remove(self, peer_did: Union[str, DID]):
+        """Remove the DID Document of a Peer DID, if stored."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM peer_did_keys WHERE did = ?", (str(peer_did),)
+            )
+            self._connection.execute(
+                "DELETE FROM peer_dids WHERE did = ?", (str(peer_did),)
+            )
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __contains__(self, peer_did: Union[str, DID]) -> bool:
+        """Check whether the DID Document of a Peer DID is stored."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM peer_dids WHERE did = ?", (str(peer_did),)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        """The number of DID Documents stored."""
+        with self._lock:
+            row = self._connection.execute("SELECT COUNT(*) FROM peer_dids").fetchone()
+        return row[0]
+
+    def __enter__(self) -> "PeerDIDStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _select_in(self, query: str, values: Sequence[str]) -> List[Tuple[str, str]]:
+        rows = []
+        with self._lock:
+            for start in range(0, len(values), _MAX_VARIABLES):
+                chunk = values[start : start + _MAX_VARIABLES]
+                rows.extend(
+                    self._connection.execute(
+                        query.format(",".join("?" * len(chunk))), chunk
+                    )
+                )
+        return rows
+
+
+def _row(
+    parsed: ParsedPeerDID, document: Optional[str]
+) -> Tuple[Tuple[str, Optional[str], str], List[str]]:
+    """Build the row of a Peer DID and the fingerprints of its keys."""
+    if parsed.numalgo == 3 or (parsed.numalgo == 4 and parsed.document is None):
+        raise ValueError("Short-form peer DIDs cannot be stored: {}".format(parsed.did))
+    if document is None:
+        # bind numalgo 4 short forms in a throwaway store: the row records them
+        document = resolve_peer_did_json(parsed.did, store=InMemoryShortFormStore())
+    if parsed.numalgo == 4:
+        fingerprints = _document_fingerprints(document)
+    else:
+        fingerprints = [key.value for key in parsed.keys]
+    return (parsed.did, peer_did_short_form(parsed), document), fingerprints
+
+
+def _document_fingerprints(document: str) -> List[str]:
+    methods = json.loads(document).get("verificationMethod") or ()
+    return [
+        method["publicKeyMultibase"]
+        for method in methods
+        if isinstance(method, dict)
+        and isinstance(method.get("publicKeyMultibase"), str)
+    ]
+
+
+def _checked_long_forms(pairs: Iterable[Tuple[str, str]]) -> Iterable[str]:
+    for short_form, long_form in pairs:
+        if peer_did_short_form(long_form) != short_form:
+            raise ValueError(
+                "{} is not the short form of {}".format(short_form, long_form)
+            )
+        yield long_form
@@ -0,0 +1,93 @@
+"""Local stores of the long forms of short-form Peer DIDs."""
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+from .core.lru import LRUCache
+
+# bound of the default store, which every process shares
+DEFAULT_STORE_ENTRIES = 10_000
+
+
+class ShortFormStore(ABC):
+    """Mapping of short-form Peer DIDs (numalgo 3 and 4) to their long forms.
+
+    Resolving a short-form Peer DID requires its long form, which only peers
+    that have seen the long form can know.
+    """
+
+    @abstractmethod
+    def get_long_form(self, short_form: str) -> Optional[str]:
+        """Look up the long form of a short-form Peer DID.
+
+        :param short_form: the short-form Peer DID
+        :return: the long-form Peer DID, or None if it is not known
+        """
+
+    @abstractmethod
+    def set_long_form(self, short_form: str, long_form: str):
+        """Record the long form of a short-form Peer DID.
+
+        :param short_form: the short-form Peer DID
+        :param long_form: the long-form Peer DID
+        """
+
+    def get_long_forms(self, short_forms: Iterable[str]) -> List[Optional[str]]:
+        """Look up the long forms of many short-form Peer DIDs."""
+        return [self.get_long_form(short_form) for short_form in short_forms]
+
+    def set_long_forms(self, pairs: Iterable[Tuple[str, str]]):
+        """Record the long forms of many short-form Peer DIDs."""
+        for short_form, long_form in pairs:
+            self.set_long_form(short_form, long_form)
+
+
+class InMemoryShortFormStore(ShortFormStore):
+    """Short-form store held in a dictionary, or in a bounded LRU cache."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """Initializer.
+
+        :param max_entries: the maximum number of short forms retained, the least
+            recently used being forgotten first; None for no limit
+        """
+        self._long_forms = LRUCache(max_entries) if max_entries is not None else {}
+
+    def get_long_form(self, short_form: str) -> Optional[str]:
+        """Look up the long form of a short-form Peer DID."""
+        return self._long_forms.get(short_form)
+
+    def set_long_form(self, short_form: str, long_form: str):
+        """Record the long form of a short-form Peer DID."""
+        if isinstance(self._long_forms, LRUCache):
+            self._long_forms.put(short_form, long_form)
+        else:
+            self._long_forms[short_form] = long_form
+
+    def __contains__(self, short_form: str) -> bool:
+        """Check whether the long form of a short-form Peer DID is known."""
+        return short_form in self._long_forms
+
+    def __len__(self) -> int:
+        """The number of short forms recorded."""
+        return len(self._long_forms)
+
+
+_default_store: ShortFormStore = InMemoryShortFormStore(DEFAULT_STORE_ENTRIES)
+
+
+def get_default_store() -> ShortFormStore:
+    """Get the store used when no store is passed explicitly.
+
+    Unless replaced, it is an InMemoryShortFormStore bounded to
+    DEFAULT_STORE_ENTRIES short forms, so that creating and resolving Peer DIDs
+    in a long-running process does not grow it without limit. Pass a store, or
+    set a persistent one, to keep every short form.
+    """
+    return _default_store
+
+
+def set_default_store(store: ShortFormStore):
+    """Replace the store used when no store is passed explicitly."""
+    global _default_store
+    _default_store = store
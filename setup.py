@@ -2,6 +2,9 @@ from setuptools import setup
 
 # TODO move remaining things
 setup(
-    install_requires=["base58~=2.1.0", "pydid~=0.3.9a0", "varint~=1.0.2"],
-    extras_require={"tests": ["pytest==6.2.5", "pytest-xdist==2.3.0"]},
+    install_requires=["pydid~=0.3.11", "varint~=1.0.2"],
+    extras_require={
+        "numpy": ["numpy"],
+        "tests": ["pytest==6.2.5", "pytest-xdist==2.3.0"],
+    },
 )
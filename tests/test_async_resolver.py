@@ -0,0 +1,57 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from peerdid import DIDDocument
+from peerdid.aio import AsyncPeerDIDResolver
+from peerdid.cache import ResolutionCache
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_JWK,
+    DID_DOC_NUMALGO_2_MULTIBASE,
+    PEER_DID_NUMALGO_2,
+)
+
+
+def test_async_resolve():
+    resolver = AsyncPeerDIDResolver()
+    did_doc = asyncio.run(resolver.resolve(PEER_DID_NUMALGO_2, KeyFormat.JWK))
+    assert did_doc == DIDDocument.from_json(DID_DOC_NUMALGO_2_JWK)
+    assert resolver.in_flight == 0
+
+
+def test_async_resolve_coalesced():
+    async def run(resolver):
+        return await asyncio.gather(
+            *(resolver.resolve(PEER_DID_NUMALGO_2) for _ in range(10))
+        )
+
+    with ThreadPoolExecutor(2) as executor:
+        resolver = AsyncPeerDIDResolver(executor, max_concurrency=1)
+        docs = asyncio.run(run(resolver))
+    expected = DIDDocument.from_json(DID_DOC_NUMALGO_2_MULTIBASE)
+    assert all(did_doc == expected for did_doc in docs)
+    assert len(set(map(id, docs))) == len(docs)
+    assert (resolver.resolved, resolver.coalesced) == (1, 9)
+
+
+def test_async_resolve_with_cache():
+    async def run(resolver):
+        await resolver.resolve(PEER_DID_NUMALGO_2)
+        return await resolver.resolve(PEER_DID_NUMALGO_2)
+
+    cache = ResolutionCache()
+    resolver = AsyncPeerDIDResolver(cache=cache)
+    did_doc = asyncio.run(run(resolver))
+    assert did_doc == DIDDocument.from_json(DID_DOC_NUMALGO_2_MULTIBASE)
+    assert cache.stats.hits == 1
+
+
+def test_async_resolve_malformed():
+    resolver = AsyncPeerDIDResolver()
+    with pytest.raises(MalformedPeerDIDError):
+        asyncio.run(resolver.resolve("did:peer:2.Vz6Mk"))
+    assert resolver.in_flight == 0
@@ -0,0 +1,67 @@
+import pickle
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from peerdid import DIDDocument
+from peerdid.batch import resolve_peer_dids
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_BASE58,
+    DID_DOC_NUMALGO_O_MULTIBASE,
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+)
+
+INPUT = [PEER_DID_NUMALGO_0, "did:peer:1z", PEER_DID_NUMALGO_0] * 5
+
+
+def _check(results):
+    assert [r.index for r in results] == list(range(len(INPUT)))
+    for result in results:
+        assert result.peer_did == INPUT[result.index]
+        if result.peer_did == PEER_DID_NUMALGO_0:
+            assert result.document == DIDDocument.from_json(DID_DOC_NUMALGO_O_MULTIBASE)
+            assert result.error is None
+        else:
+            assert result.document is None
+            assert isinstance(result.error, MalformedPeerDIDError)
+
+
+def test_resolve_peer_dids_serial():
+    _check(list(resolve_peer_dids(INPUT, workers=0, chunk_size=4)))
+
+
+def test_resolve_peer_dids_process_pool():
+    _check(list(resolve_peer_dids(iter(INPUT), workers=2, chunk_size=2)))
+
+
+def test_resolve_peer_dids_unordered():
+    results = list(
+        resolve_peer_dids(INPUT, workers=2, chunk_size=1, ordered=False, max_pending=3)
+    )
+    _check(sorted(results, key=lambda r: r.index))
+
+
+def test_resolve_peer_dids_executor():
+    with ThreadPoolExecutor(2) as executor:
+        results = list(
+            resolve_peer_dids(
+                [PEER_DID_NUMALGO_2],
+                format=KeyFormat.BASE58,
+                executor=executor,
+            )
+        )
+    assert results[0].document == DIDDocument.from_json(DID_DOC_NUMALGO_2_BASE58)
+
+
+def test_resolve_peer_dids_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        list(resolve_peer_dids(INPUT, chunk_size=0))
+
+
+def test_malformed_peer_did_error_pickle():
+    error = pickle.loads(pickle.dumps(MalformedPeerDIDError("Blank key entry")))
+    assert str(error) == "Invalid peer DID provided. Blank key entry."
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from peerdid.cli import main
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_BASE58,
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+ED25519_KEY = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+X25519_KEY = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+
+
+def _run(tmp_path, capsys, *args, lines):
+    path = tmp_path / "input.txt"
+    path.write_text("\n".join(lines) + "\n")
+    status = main([*args, str(path), "--workers", "0"])
+    captured = capsys.readouterr()
+    return (
+        status,
+        [json.loads(line) for line in captured.out.splitlines()],
+        captured.err,
+    )
+
+
+def test_cli_validate(tmp_path, capsys):
+    status, records, summary = _run(
+        tmp_path,
+        capsys,
+        "validate",
+        lines=[
+            PEER_DID_NUMALGO_0,
+            "",
+            "did:peer:1z",
+            json.dumps({"did": PEER_DID_NUMALGO_2}),
+        ],
+    )
+    assert status == 0
+    assert [(r["line"], r["valid"]) for r in records] == [
+        (1, True),
+        (3, False),
+        (4, True),
+    ]
+    assert "Does not match peer DID regexp" in records[1]["error"]
+    assert "3 lines, 2 ok, 1 failed" in summary
+    assert "MalformedPeerDIDError" in summary
+
+
+def test_cli_resolve(tmp_path, capsys):
+    status, records, _ = _run(
+        tmp_path, capsys, "resolve", "--format", "base58", lines=[PEER_DID_NUMALGO_2]
+    )
+    assert status == 0
+    assert records == [
+        {
+            "line": 1,
+            "did": PEER_DID_NUMALGO_2,
+            "document": json.loads(DID_DOC_NUMALGO_2_BASE58),
+        }
+    ]
+
+
+def test_cli_create(tmp_path, capsys):
+    numalgo_2 = {
+        "encryption_keys": [X25519_KEY],
+        "signing_keys": [ED25519_KEY],
+        "service": None,
+    }
+    status, records, _ = _run(
+        tmp_path,
+        capsys,
+        "create",
+        "--fail-on-error",
+        lines=[ED25519_KEY, json.dumps(numalgo_2), json.dumps({"signing_keys": [1]})],
+    )
+    assert status == 1
+    assert records[0]["did"] == "did:peer:0" + ED25519_KEY
+    assert records[1]["did"] == "did:peer:2.E{}.V{}".format(X25519_KEY, ED25519_KEY)
+    assert "error" in records[2]
+
+
+def test_cli_process_pool(tmp_path, capsys):
+    path = tmp_path / "input.txt"
+    path.write_text("\n".join([PEER_DID_NUMALGO_0] * 10))
+    output = tmp_path / "output.ndjson"
+    args = [
+        "validate",
+        str(path),
+        "-o",
+        str(output),
+        "-w",
+        "2",
+        "--chunk-size",
+        "3",
+        "-q",
+    ]
+    assert main(args) == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["line"] for r in records] == list(range(1, 11))
+    assert capsys.readouterr().err == ""
+
+
+def test_cli_process_pool_order(tmp_path, capsys):
+    dids = [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_2_NO_SERVICES]
+    lines = (dids + ["did:peer:2.Vz6Mk"]) * 5
+    path = tmp_path / "input.txt"
+    path.write_text("\n".join(lines) + "\n")
+    args = ["resolve", str(path), "--workers", "2", "--chunk-size", "1"]
+    assert main(args) == 0
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert [r["line"] for r in records] == list(range(1, 21))
+    for record, line in zip(records, lines):
+        if line in dids:
+            assert record["document"]["id"] == line
+        else:
+            assert "Invalid key" in record["error"]
+    assert "20 lines, 15 ok, 5 failed" in captured.err
+
+
+def test_cli_requires_command():
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_cli_missing_input(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        main(["validate", str(tmp_path / "missing.txt")])
+    assert exc_info.value.code == 2
+    err = capsys.readouterr().err
+    assert "No such file or directory" in err
+    assert "Traceback" not in err
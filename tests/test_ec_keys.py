@@ -0,0 +1,194 @@
+import pytest
+
+from peerdid.core.curves import (
+    P256,
+    SECP256K1,
+    clear_point_cache,
+    compress_point,
+    decompress_point,
+    point_cache_stats,
+)
+from peerdid.core.utils import urlsafe_b64decode
+from peerdid.core.multibase import to_multibase
+from peerdid.core.multicodec import Codec
+from peerdid.dids import (
+    create_peer_did_numalgo_0,
+    create_peer_did_numalgo_2,
+    resolve_peer_did,
+    resolve_peer_did_formats,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError, UnsupportedKeyFormatError
+from peerdid.keys import (
+    BaseKey,
+    KeyFormat,
+    P256VerificationKey,
+    Secp256k1VerificationKey,
+    X25519KeyAgreementKey,
+)
+
+# the generator points of the curves
+P256_X = bytes.fromhex(
+    "6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296"
+)
+P256_Y = bytes.fromhex(
+    "4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5"
+)
+SECP256K1_X = bytes.fromhex(
+    "79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798"
+)
+SECP256K1_Y = bytes.fromhex(
+    "483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8"
+)
+P256_KEY = b"\x03" + P256_X
+SECP256K1_KEY = b"\x02" + SECP256K1_X
+X25519_MULTIBASE = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+# x = 1 is not the x coordinate of a P-256 point
+P256_OFF_CURVE = b"\x02" + (1).to_bytes(32, "big")
+
+
+@pytest.mark.parametrize(
+    "curve, x, y, compressed",
+    [
+        (P256, P256_X, P256_Y, P256_KEY),
+        (SECP256K1, SECP256K1_X, SECP256K1_Y, SECP256K1_KEY),
+    ],
+)
+def test_point_compression(curve, x, y, compressed):
+    assert compress_point(curve, x, y) == compressed
+    assert decompress_point(curve, compressed) == (x, y)
+    # the other point with the same x coordinate
+    negated = bytes((compressed[0] ^ 1,)) + x
+    other_x, other_y = decompress_point(curve, negated)
+    assert other_x == x
+    assert int.from_bytes(other_y, "big") == curve.p - int.from_bytes(y, "big")
+    assert compress_point(curve, other_x, other_y) == negated
+
+
+@pytest.mark.parametrize(
+    "compressed",
+    [
+        b"\x04" + P256_X,
+        P256_KEY[:-1],
+        b"\x02" + bytes(31) + b"\x01",
+        b"\x02" + b"\xff" * 32,
+    ],
+)
+def test_decompress_invalid_point(compressed):
+    with pytest.raises(ValueError):
+        decompress_point(P256, compressed)
+
+
+def test_compress_point_not_on_curve():
+    with pytest.raises(ValueError, match="not on curve"):
+        compress_point(P256, P256_X, SECP256K1_Y)
+    with pytest.raises(ValueError):
+        compress_point(P256, P256_X, P256_Y[1:])
+
+
+def test_point_cache():
+    clear_point_cache()
+    decompress_point(P256, P256_KEY)
+    decompress_point(P256, P256_KEY)
+    decompress_point(SECP256K1, P256_KEY)
+    stats = point_cache_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+    clear_point_cache()
+    assert point_cache_stats().entries == 0
+
+
+@pytest.mark.parametrize(
+    "key_type, public_key, crv, x, y",
+    [
+        (P256VerificationKey, P256_KEY, "P-256", P256_X, P256_Y),
+        (
+            Secp256k1VerificationKey,
+            SECP256K1_KEY,
+            "secp256k1",
+            SECP256K1_X,
+            SECP256K1_Y,
+        ),
+    ],
+)
+def test_ec_key_jwk(key_type, public_key, crv, x, y):
+    key = key_type(public_key)
+    jwk = key.to_jwk()
+    assert (jwk["kty"], jwk["crv"]) == ("EC", crv)
+    assert urlsafe_b64decode(jwk["x"]) == x
+    assert urlsafe_b64decode(jwk["y"]) == y
+    assert BaseKey.from_jwk(jwk) == key
+    assert BaseKey.from_multibase(key.to_multibase()) == key
+
+
+def test_ec_key_multibase_prefixes():
+    assert P256VerificationKey(P256_KEY).to_multibase().startswith("zDn")
+    assert Secp256k1VerificationKey(SECP256K1_KEY).to_multibase().startswith("zQ3s")
+
+
+def test_ec_key_invalid():
+    with pytest.raises(ValueError):
+        P256VerificationKey(P256_X)
+    with pytest.raises(ValueError):
+        P256VerificationKey(b"\x04" + P256_X)
+    jwk = P256VerificationKey(P256_KEY).to_jwk()
+    del jwk["y"]
+    with pytest.raises(ValueError, match="Invalid JWK"):
+        BaseKey.from_jwk(jwk)
+    jwk = Secp256k1VerificationKey(SECP256K1_KEY).to_jwk()
+    jwk["crv"] = "P-256"
+    with pytest.raises(ValueError, match="Invalid JWK"):
+        BaseKey.from_jwk(jwk)
+
+
+def test_resolve_numalgo_0_ec_key():
+    peer_did = create_peer_did_numalgo_0(P256VerificationKey(P256_KEY))
+    doc = resolve_peer_did(peer_did)
+    method = doc.verification_method[0]
+    assert method.type == "Multikey"
+    assert method.public_key_multibase == peer_did[10:]
+    assert doc.authentication == [method.id]
+
+
+def test_resolve_numalgo_2_ec_keys():
+    peer_did = create_peer_did_numalgo_2(
+        [X25519KeyAgreementKey.from_multibase(X25519_MULTIBASE)],
+        [P256VerificationKey(P256_KEY), Secp256k1VerificationKey(SECP256K1_KEY)],
+        None,
+    )
+    doc = resolve_peer_did(peer_did, format=KeyFormat.JWK)
+    jwks = [method.public_key_jwk for method in doc.verification_method]
+    assert [jwk["crv"] for jwk in jwks] == ["X25519", "P-256", "secp256k1"]
+    assert urlsafe_b64decode(jwks[1]["y"]) == P256_Y
+    assert len(doc.authentication) == 2
+    assert resolve_peer_did_json(peer_did, format=KeyFormat.JWK) == doc.to_json()
+
+    doc = resolve_peer_did(peer_did, format=KeyFormat.MULTIBASE)
+    assert [method.type for method in doc.verification_method] == [
+        "X25519KeyAgreementKey2020",
+        "Multikey",
+        "Multikey",
+    ]
+    # EC keys have no base58 verification material
+    for resolve in (resolve_peer_did, resolve_peer_did_json):
+        with pytest.raises(UnsupportedKeyFormatError, match="P256VerificationKey"):
+            resolve(peer_did, format=KeyFormat.BASE58)
+
+
+def test_ec_key_off_curve():
+    with pytest.raises(ValueError, match="not on curve"):
+        P256VerificationKey(P256_OFF_CURVE)
+    with pytest.raises(ValueError):
+        BaseKey.from_multibase(
+            to_multibase(Codec.P256.encode_multicodec(P256_OFF_CURVE))
+        )
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+def test_resolve_off_curve_ec_key(format):
+    peer_did = "did:peer:0" + to_multibase(Codec.P256.encode_multicodec(P256_OFF_CURVE))
+    with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+        resolve_peer_did(peer_did, format)
+    with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+        resolve_peer_did_json(peer_did, format)
+    with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+        resolve_peer_did_formats(peer_did).document(format)
@@ -0,0 +1,198 @@
+import pytest
+
+from peerdid.batch import extract_keys_batch
+from peerdid.core.multicodec import Codec
+from peerdid.dids import (
+    ExtractedKey,
+    create_peer_did_numalgo_3,
+    create_peer_did_numalgo_4,
+    extract_keys,
+    resolve_peer_did,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.index import KeyIndex
+from peerdid.keys import (
+    BaseKey,
+    KeyRelationshipType,
+    disable_strict_key_validation,
+    enable_strict_key_validation,
+)
+from peerdid.store import InMemoryShortFormStore
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_4,
+)
+
+ED25519_MULTIBASE = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+AUTHENTICATION = KeyRelationshipType.AUTHENTICATION
+KEY_AGREEMENT = KeyRelationshipType.KEY_AGREEMENT
+
+
+def test_extract_keys_numalgo_0():
+    assert extract_keys(PEER_DID_NUMALGO_0) == (
+        ExtractedKey(
+            BaseKey.from_multibase(ED25519_MULTIBASE).public_key,
+            Codec.ED25519,
+            AUTHENTICATION,
+        ),
+    )
+
+
+@pytest.mark.parametrize("peer_did", [PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_4])
+def test_extract_keys_matches_resolution(peer_did):
+    keys = extract_keys(peer_did)
+    index = KeyIndex()
+    expected = [
+        (entry.public_key, relationship)
+        for entry in index.add_document(resolve_peer_did(peer_did))
+        for relationship in entry.relationships
+    ]
+    assert sorted((key.public_key, key.relationship.value) for key in keys) == sorted(
+        (public_key, relationship.value) for public_key, relationship in expected
+    )
+    assert all(len(key.public_key) == 32 for key in keys)
+    assert {key.codec for key in keys if key.relationship == KEY_AGREEMENT} == {
+        Codec.X25519
+    }
+
+
+def test_extract_keys_numalgo_2_order():
+    keys = extract_keys(PEER_DID_NUMALGO_2)
+    assert [key.relationship for key in keys] == [
+        KEY_AGREEMENT,
+        AUTHENTICATION,
+        AUTHENTICATION,
+    ]
+
+
+def test_extract_keys_short_form():
+    store = InMemoryShortFormStore()
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    assert extract_keys(short_form, store=store) == extract_keys(PEER_DID_NUMALGO_2)
+
+
+def test_extract_keys_invalid():
+    with pytest.raises(MalformedPeerDIDError):
+        extract_keys("did:peer:2.Ez6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V")
+    small_order = "did:peer:0z6Mkh59EgPEuBMugWwYWVMbZFQmHm8V1tcgLejJJTx6d8KB2"
+    assert extract_keys(small_order)
+    enable_strict_key_validation()
+    try:
+        with pytest.raises(MalformedPeerDIDError):
+            extract_keys(small_order)
+    finally:
+        disable_strict_key_validation()
+
+
+def test_extract_keys_batch():
+    peer_dids = [
+        PEER_DID_NUMALGO_0,
+        PEER_DID_NUMALGO_2,
+        "did:peer:2.Ez1",
+        PEER_DID_NUMALGO_4,
+    ]
+    batch = extract_keys_batch(peer_dids, AUTHENTICATION)
+    assert batch.offsets == [0, 1, 3, 3, 4]
+    assert isinstance(batch.keys, bytearray)
+    assert len(batch.keys) == 4 * 32
+    assert batch.codecs == [Codec.ED25519] * 4
+    assert [error is None for error in batch.errors] == [True, True, False, True]
+    assert isinstance(batch.errors[2], MalformedPeerDIDError)
+    rows = [bytes(batch.keys[i * 32 : (i + 1) * 32]) for i in range(4)]
+    assert rows[1:3] == [
+        key.public_key
+        for key in extract_keys(PEER_DID_NUMALGO_2)
+        if key.relationship == AUTHENTICATION
+    ]
+
+
+def test_extract_keys_batch_key_length():
+    batch = extract_keys_batch([PEER_DID_NUMALGO_2], KEY_AGREEMENT, key_length=33)
+    assert batch.offsets == [0, 0]
+    assert "expected 33 bytes" in str(batch.errors[0])
+
+
+def test_extract_keys_batch_out():
+    out = bytearray(4 * 32)
+    batch = extract_keys_batch([PEER_DID_NUMALGO_2], KEY_AGREEMENT, out=out)
+    assert batch.keys is out
+    assert bytes(out[:32]) == extract_keys(PEER_DID_NUMALGO_2)[0].public_key
+    assert out[32:] == bytes(3 * 32)
+    with pytest.raises(ValueError, match="Buffer too small"):
+        extract_keys_batch([PEER_DID_NUMALGO_2], AUTHENTICATION, out=bytearray(32))
+
+
+def test_extract_keys_batch_numpy():
+    np = pytest.importorskip("numpy")
+    peer_dids = [PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_4]
+    batch = extract_keys_batch(peer_dids, AUTHENTICATION, as_array=True)
+    assert batch.keys.shape == (3, 32)
+    assert batch.keys.dtype == np.uint8
+    assert bytes(batch.keys[0]) == extract_keys(PEER_DID_NUMALGO_2)[1].public_key
+
+    out = np.zeros((8, 32), np.uint8)
+    batch = extract_keys_batch(peer_dids, AUTHENTICATION, out=out)
+    assert batch.keys is out
+    assert bytes(out[2]) == next(
+        key.public_key
+        for key in extract_keys(PEER_DID_NUMALGO_4)
+        if key.relationship == AUTHENTICATION
+    )
+    assert not out[3:].any()
+
+
+def _numalgo_4(method: dict) -> str:
+    return create_peer_did_numalgo_4(
+        {
+            "@context": ["https://www.w3.org/ns/did/v1"],
+            "verificationMethod": [dict(method, id="#key-1")],
+            "authentication": ["#key-1"],
+        },
+        store=InMemoryShortFormStore(),
+    )
+
+
+def test_extract_keys_numalgo_4_base58():
+    key = BaseKey.from_multibase(ED25519_MULTIBASE)
+    peer_did = _numalgo_4(
+        {"type": "Ed25519VerificationKey2018", "publicKeyBase58": key.to_base58()}
+    )
+    assert extract_keys(peer_did) == (
+        ExtractedKey(key.public_key, Codec.ED25519, AUTHENTICATION),
+    )
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        {"type": "Multikey", "publicKeyMultibase": "z3M5RC"},
+        {"type": "EcdsaSecp256k1VerificationKey2019", "publicKeyBase58": "3M5RC"},
+        {"type": "Multikey"},
+    ],
+)
+def test_extract_keys_numalgo_4_invalid(method):
+    with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+        extract_keys(_numalgo_4(method))
+
+
+def test_extract_keys_numalgo_4_strict():
+    small_order = "z6Mkh59EgPEuBMugWwYWVMbZFQmHm8V1tcgLejJJTx6d8KB2"
+    peer_did = _numalgo_4({"type": "Multikey", "publicKeyMultibase": small_order})
+    assert extract_keys(peer_did)
+    enable_strict_key_validation()
+    try:
+        with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+            extract_keys(peer_did)
+    finally:
+        disable_strict_key_validation()
+
+
+def test_extract_keys_batch_empty():
+    np = pytest.importorskip("numpy")
+    batch = extract_keys_batch(["did:peer:2.Ez1"], AUTHENTICATION, as_array=True)
+    assert batch.keys.shape == (0, 32)
+    assert batch.offsets == [0, 0]
+    batch = extract_keys_batch([], AUTHENTICATION, out=np.zeros((0, 32), np.uint8))
+    assert batch.keys.shape == (0, 32)
+    assert extract_keys_batch([], AUTHENTICATION).keys == bytearray()
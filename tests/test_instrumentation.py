@@ -0,0 +1,128 @@
+import pytest
+
+from peerdid import instrumentation
+from peerdid.dids import (
+    create_peer_did_numalgo_0,
+    resolve_peer_did,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.instrumentation import (
+    HistogramRegistry,
+    HistogramSnapshot,
+    MetricsSink,
+    histogram_percentile,
+)
+from peerdid.keys import Ed25519VerificationKey
+from tests.test_vectors import PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2
+
+
+class ListSink(MetricsSink):
+    def __init__(self):
+        self.records = []
+
+    def record(self, name, seconds):
+        self.records.append(name)
+
+
+def test_instrumentation_disabled_by_default():
+    assert not instrumentation.is_enabled()
+    resolve_peer_did(PEER_DID_NUMALGO_2)
+
+
+def test_instrumentation_resolve_stages():
+    with instrumentation.instrumented() as registry:
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+        resolve_peer_did(PEER_DID_NUMALGO_0)
+    assert not instrumentation.is_enabled()
+    snapshot = registry.snapshot()
+    assert snapshot["resolve_peer_did"].count == 2
+    for stage in ("parse", "key_decode", "builder", "add_to_document", "build"):
+        assert snapshot["resolve_peer_did." + stage].count == 2
+    # numalgo 0 has no service
+    assert snapshot["resolve_peer_did.service_decode"].count == 1
+
+
+def test_instrumentation_custom_sink():
+    sink = ListSink()
+    with instrumentation.instrumented(sink):
+        resolve_peer_did_json(PEER_DID_NUMALGO_2)
+    assert sink.records == [
+        "resolve_peer_did_json.parse",
+        "resolve_peer_did_json.key_decode",
+        "resolve_peer_did_json.service_decode",
+        "resolve_peer_did_json.serialize",
+        "resolve_peer_did_json",
+    ]
+
+
+def test_instrumentation_failed_call():
+    with instrumentation.instrumented() as registry:
+        with pytest.raises(MalformedPeerDIDError):
+            resolve_peer_did("did:peer:2.Vz6Mk")
+    snapshot = registry.snapshot()
+    assert snapshot["resolve_peer_did.failed"].count == 1
+    assert "resolve_peer_did" not in snapshot
+
+
+def test_instrumentation_slow_calls():
+    slow = []
+    key = Ed25519VerificationKey.from_multibase(PEER_DID_NUMALGO_0[10:])
+    with instrumentation.instrumented(slow_threshold=0.0, on_slow=slow.append):
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+        create_peer_did_numalgo_0(key)
+    assert [(call.operation, call.peer_did) for call in slow] == [
+        ("resolve_peer_did", PEER_DID_NUMALGO_2),
+        ("create_peer_did_numalgo_0", PEER_DID_NUMALGO_0),
+    ]
+    assert set(slow[0].stages) == {
+        "parse",
+        "key_decode",
+        "service_decode",
+        "builder",
+        "add_to_document",
+        "build",
+    }
+    assert slow[0].duration >= sum(slow[0].stages.values())
+
+
+def test_instrumentation_slow_threshold():
+    slow = []
+    with instrumentation.instrumented(slow_threshold=60.0, on_slow=slow.append):
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+    assert slow == []
+
+
+def test_instrumentation_failing_callbacks(caplog):
+    def on_slow(call):
+        raise RuntimeError("on_slow failed")
+
+    class FailingSink(MetricsSink):
+        def record(self, name, seconds):
+            raise RuntimeError("sink failed")
+
+    with instrumentation.instrumented(slow_threshold=0.0, on_slow=on_slow):
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+    with instrumentation.instrumented(FailingSink()):
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+    assert [record.getMessage() for record in caplog.records] == [
+        "Slow call callback failed for resolve_peer_did",
+        "Metrics sink failed to record resolve_peer_did",
+    ]
+
+
+def test_histogram_registry():
+    registry = HistogramRegistry()
+    for seconds in (1e-6, 3e-6, 3e-6, 1e-3):
+        registry.record("op", seconds)
+    snapshot = registry.snapshot()["op"]
+    assert (snapshot.count, snapshot.min, snapshot.max) == (4, 1e-6, 1e-3)
+    assert snapshot.total == pytest.approx(1.007e-3)
+    assert histogram_percentile(snapshot, 50) == 4e-6
+    assert histogram_percentile(snapshot, 100) == 1e-3
+    registry.clear()
+    assert registry.snapshot() == {}
+
+
+def test_histogram_percentile_empty():
+    assert histogram_percentile(HistogramSnapshot(0, 0.0, 0.0, 0.0, ()), 99) == 0.0
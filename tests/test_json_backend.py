@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from pydid import DID
+
+from peerdid.core import json_backend
+from peerdid.core.json_backend import JSONBackend, OrjsonBackend
+from peerdid.core.peer_did_helper import clear_service_caches
+from peerdid.dids import create_peer_did_numalgo_2, resolve_peer_did
+from peerdid.keys import Ed25519VerificationKey, X25519KeyAgreementKey
+from tests.test_vectors import PEER_DID_NUMALGO_2
+
+VALUES = [
+    {"t": "dm", "s": "https://example.com", "r": ["did:example:a#1"], "a": []},
+    [1, -1, 2**63, -(2**64), True, False, None, ""],
+    {"float": 1.5, "exp": 1e16, "small": 1e-7},
+    {"nan": float("nan"), "inf": float("inf")},
+    {"text": "café ☃ \U0001f600", "ctrl": "".join(map(chr, range(0x80)))},
+    {1: "int key", None: "null key"},
+    (DID("did:example:123"), ("nested", [{"a": {"b": []}}])),
+]
+
+DOCUMENTS = [
+    '{"t":"dm","s":"https://example.com","r":["did:example:a#1"]}',
+    "[12345678901234567890123, -9223372036854775809, 1.5e300, 1e400]",
+    '{"a": NaN, "b": -Infinity}',
+    '"\\ud800 lone surrogate"',
+    '{"a": 1, "a": 2}',
+]
+
+
+@pytest.fixture
+def orjson_backend():
+    pytest.importorskip("orjson")
+    return OrjsonBackend()
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_orjson_dumps_compact_matches_stdlib(orjson_backend, value):
+    assert orjson_backend.dumps_compact(value) == JSONBackend().dumps_compact(value)
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_orjson_loads_matches_stdlib(orjson_backend, document):
+    expected = json.loads(document)
+    result = orjson_backend.loads(document)
+    assert json.dumps(result) == json.dumps(expected)
+    assert type(result) is type(expected)
+
+
+def test_orjson_loads_bytes(orjson_backend):
+    assert orjson_backend.loads('{"a":"é"}'.encode()) == {"a": "é"}
+    assert JSONBackend().loads('{"a":"é"}'.encode()) == {"a": "é"}
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_loads_memoryview(orjson_backend, document):
+    # as sliced from a decoded multicodec value, past the prefix
+    view = memoryview(b"\x80\x04" + document.encode())[2:]
+    expected = json.dumps(json.loads(document))
+    for backend in (orjson_backend, JSONBackend()):
+        assert json.dumps(backend.loads(view)) == expected
+
+
+@pytest.mark.parametrize(
+    "document", ["", "[1,]", '{"a":1', "\ufeff{}", b"\xef\xbb\xbf{}", b'"\xff"']
+)
+def test_loads_invalid(orjson_backend, document):
+    for backend in (orjson_backend, JSONBackend()):
+        with pytest.raises(ValueError):
+            backend.loads(document)
+
+
+def test_set_backend():
+    previous = json_backend.get_backend()
+    try:
+        json_backend.set_backend("json")
+        assert json_backend.get_backend().name == "json"
+        json_backend.set_backend(None)
+        assert isinstance(json_backend.get_backend(), JSONBackend)
+        with pytest.raises(ValueError):
+            json_backend.set_backend("yaml")
+    finally:
+        json_backend.set_backend(previous)
+
+
+def test_backends_generate_identical_peer_dids(orjson_backend):
+    keys = (
+        [X25519KeyAgreementKey(bytes(range(32)))],
+        [Ed25519VerificationKey(bytes(range(1, 33)))],
+    )
+    service = [
+        {
+            "type": "DIDCommMessaging",
+            "serviceEndpoint": "https://example.com/é",
+            "routingKeys": ["did:example:somemediator#somekey"],
+            "accept": ["didcomm/v2"],
+            "priority": 1.0,
+        },
+        {"type": "Other", "serviceEndpoint": {"uri": "https://example.com"}},
+    ]
+    previous = json_backend.get_backend()
+    results = []
+    try:
+        for backend in (JSONBackend(), orjson_backend):
+            json_backend.set_backend(backend)
+            clear_service_caches()
+            peer_did = create_peer_did_numalgo_2(*keys, service)
+            results.append((peer_did, resolve_peer_did(PEER_DID_NUMALGO_2)))
+    finally:
+        json_backend.set_backend(previous)
+        clear_service_caches()
+    assert results[0] == results[1]
@@ -0,0 +1,98 @@
+import pytest
+
+from peerdid.dids import create_peer_did_numalgo_2, resolve_peer_did
+from peerdid.index import KeyIndex
+from peerdid.keys import (
+    BaseKey,
+    KeyFormat,
+    KeyRelationshipType,
+)
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_4,
+)
+
+X25519_KEY = BaseKey.from_multibase("z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc")
+ED25519_KEY = BaseKey.from_multibase("z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V")
+
+
+def test_add_peer_did():
+    index = KeyIndex()
+    entries = index.add(PEER_DID_NUMALGO_2)
+    assert [entry.ident for entry in entries] == ["#6LSbysY2", "#6MkqRYqQ", "#6MkgoLTn"]
+    assert PEER_DID_NUMALGO_2 in index
+    (entry,) = index.lookup_key(X25519_KEY.public_key)
+    assert entry.did == PEER_DID_NUMALGO_2
+    assert entry.relationships == (KeyRelationshipType.KEY_AGREEMENT,)
+    assert index.lookup_kid("#6LSbysY2") == (entry,)
+    assert index.lookup_kid(PEER_DID_NUMALGO_2 + "#6LSbysY2") == (entry,)
+    assert index.lookup_kid(PEER_DID_NUMALGO_2 + "#6LSother") == ()
+    assert index.lookup_key(bytes(32)) == ()
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+def test_add_document(format):
+    index = KeyIndex()
+    expected = index.add(PEER_DID_NUMALGO_2)
+    assert index.add_document(resolve_peer_did(PEER_DID_NUMALGO_2, format)) == expected
+    assert len(index) == 1
+
+
+def test_shared_key_and_remove():
+    index = KeyIndex()
+    index.add(PEER_DID_NUMALGO_0)
+    index.add(PEER_DID_NUMALGO_2)
+    assert {entry.did for entry in index.lookup_key(ED25519_KEY.public_key)} == {
+        PEER_DID_NUMALGO_0,
+        PEER_DID_NUMALGO_2,
+    }
+    assert len(index.lookup_kid("#6MkqRYqQ")) == 2
+
+    index.remove(PEER_DID_NUMALGO_2)
+    assert [entry.did for entry in index.lookup_key(ED25519_KEY.public_key)] == [
+        PEER_DID_NUMALGO_0
+    ]
+    assert index.lookup_key(X25519_KEY.public_key) == ()
+    assert index.lookup_kid("#6LSbysY2") == ()
+    index.remove(PEER_DID_NUMALGO_2)
+    assert len(index) == 1
+
+
+def test_add_replaces():
+    index = KeyIndex()
+    index.add(PEER_DID_NUMALGO_2)
+    index.add(PEER_DID_NUMALGO_2)
+    assert len(index.lookup_key(X25519_KEY.public_key)) == 1
+
+
+def test_add_numalgo_4():
+    index = KeyIndex()
+    entries = index.add(PEER_DID_NUMALGO_4)
+    assert [(entry.ident, entry.relationships) for entry in entries] == [
+        ("#6LSqPZfn", (KeyRelationshipType.KEY_AGREEMENT,)),
+        ("#6MkrCD1c", (KeyRelationshipType.AUTHENTICATION,)),
+    ]
+
+
+def test_many_dids_sharing_a_key():
+    index = KeyIndex()
+    peer_dids = [
+        create_peer_did_numalgo_2(
+            [X25519_KEY], [ED25519_KEY], {"type": "example", "serviceEndpoint": str(i)}
+        )
+        for i in range(2000)
+    ]
+    for peer_did in peer_dids:
+        index.add(peer_did)
+    assert len(index.lookup_key(X25519_KEY.public_key)) == 2000
+    assert len(index.lookup_kid("#6LSbysY2")) == 2000
+    for peer_did in peer_dids[::2]:
+        index.remove(peer_did)
+    entries = index.lookup_key(X25519_KEY.public_key)
+    assert [entry.did for entry in entries] == peer_dids[1::2]
+    for peer_did in peer_dids[1::2]:
+        index.remove(peer_did)
+    assert index.lookup_key(X25519_KEY.public_key) == ()
+    assert index.lookup_kid("#6LSbysY2") == ()
+    assert len(index) == 0
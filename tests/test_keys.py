@@ -0,0 +1,216 @@
+import pickle
+
+import pytest
+
+from peerdid.core.curve25519 import check_ed25519_public_key, check_x25519_public_key
+from peerdid.core.multicodec import Codec
+from peerdid.core.multibase import to_multibase
+from peerdid.dids import create_peer_did_numalgo_0, resolve_peer_did
+from peerdid.errors import MalformedPeerDIDError
+
+from peerdid.keys import (
+    BaseKey,
+    Ed25519VerificationKey,
+    KeyFormat,
+    X25519KeyAgreementKey,
+    disable_key_interning,
+    disable_strict_key_validation,
+    enable_key_interning,
+    enable_strict_key_validation,
+    key_interning_stats,
+    strict_key_validation_stats,
+    validate_keys,
+)
+
+ED25519_MULTIBASE = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+X25519_MULTIBASE = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+# points of order 8
+ED25519_SMALL_ORDER = bytes.fromhex(
+    "26e8958fc2b227b045c3f489f2ef98f0d5dfac05d3c63339b13802886d53fc05"
+)
+X25519_SMALL_ORDER = bytes.fromhex(
+    "e0eb7a7c3b41b8ae1656e3faf19fc46ada098deb9c32b1fd866205165f49b800"
+)
+
+
+def test_from_multibase_batch():
+    values = [ED25519_MULTIBASE, X25519_MULTIBASE] * 10 + ["z3M5RC"]
+    with pytest.raises(ValueError):
+        BaseKey.from_multibase_batch(values)
+
+    keys = BaseKey.from_multibase_batch(values[:-1], format=KeyFormat.JWK)
+    expected = [BaseKey.from_multibase(value) for value in values[:-1]]
+    assert keys == expected
+    assert isinstance(keys[0], Ed25519VerificationKey)
+    assert isinstance(keys[1], X25519KeyAgreementKey)
+    assert [key.ident for key in keys[:2]] == ["#6MkqRYqQ", "#6LSbysY2"]
+    assert all(key.format == KeyFormat.JWK for key in keys)
+
+
+def test_from_multibase_batch_small():
+    assert BaseKey.from_multibase_batch([ED25519_MULTIBASE]) == [
+        BaseKey.from_multibase(ED25519_MULTIBASE)
+    ]
+
+
+def test_key_immutable():
+    key = BaseKey.from_multibase(ED25519_MULTIBASE)
+    with pytest.raises(AttributeError):
+        key.public_key = bytes(32)
+    with pytest.raises(AttributeError):
+        key.other = 1
+    with pytest.raises(AttributeError):
+        del key.ident
+    assert not hasattr(key, "__dict__")
+
+
+def test_key_hashable():
+    first = BaseKey.from_multibase(ED25519_MULTIBASE)
+    second = Ed25519VerificationKey(first.public_key, ident="#other")
+    assert first == second
+    assert len({first, second, BaseKey.from_multibase(X25519_MULTIBASE)}) == 2
+
+
+def test_key_cached_encodings():
+    key = Ed25519VerificationKey(BaseKey.from_multibase(ED25519_MULTIBASE).public_key)
+    assert key.to_multibase() == ED25519_MULTIBASE
+    assert key.to_multibase() is key.to_multibase()
+    assert key.to_base58() is key.to_base58()
+    jwk = key.to_jwk()
+    assert jwk == {"kty": "OKP", "crv": "Ed25519", "x": jwk["x"]}
+    jwk.clear()
+    assert key.to_jwk()["crv"] == "Ed25519"
+
+
+def test_key_pickle():
+    key = BaseKey.from_multibase(X25519_MULTIBASE, format=KeyFormat.BASE58)
+    copy = pickle.loads(pickle.dumps(key))
+    assert copy == key
+    assert (copy.ident, copy.format) == (key.ident, key.format)
+
+
+def test_key_interning():
+    enable_key_interning(max_entries=2)
+    try:
+        first = BaseKey.from_multibase(ED25519_MULTIBASE)
+        assert BaseKey.from_multibase(ED25519_MULTIBASE) is first
+        assert Ed25519VerificationKey.from_multibase(ED25519_MULTIBASE) is first
+        assert BaseKey.from_multibase(ED25519_MULTIBASE, ident="#1") is not first
+        assert (
+            BaseKey.from_multibase(ED25519_MULTIBASE, format=KeyFormat.JWK) is not first
+        )
+        with pytest.raises(ValueError):
+            X25519KeyAgreementKey.from_multibase(ED25519_MULTIBASE)
+        keys = BaseKey.from_multibase_batch([ED25519_MULTIBASE] * 20)
+        assert all(key is keys[0] for key in keys)
+        assert key_interning_stats().entries == 2
+    finally:
+        disable_key_interning()
+    assert key_interning_stats() is None
+    assert BaseKey.from_multibase(ED25519_MULTIBASE) is not first
+
+
+@pytest.fixture
+def strict_validation():
+    enable_strict_key_validation()
+    yield
+    disable_strict_key_validation()
+
+
+@pytest.mark.parametrize(
+    "public_key, message",
+    [
+        (ED25519_SMALL_ORDER, "small order"),
+        ((1).to_bytes(32, "little"), "small order"),
+        ((2**255 - 18).to_bytes(32, "little"), "non-canonical"),
+        ((2).to_bytes(32, "little"), "not on curve"),
+        (bytes(31), "expected 32 bytes"),
+    ],
+)
+def test_check_ed25519_public_key_invalid(public_key, message):
+    with pytest.raises(ValueError, match=message):
+        check_ed25519_public_key(public_key)
+
+
+@pytest.mark.parametrize(
+    "public_key",
+    [
+        bytes(32),
+        (1).to_bytes(32, "little"),
+        (2**255 - 20).to_bytes(32, "little"),
+        X25519_SMALL_ORDER,
+        # non-canonical encoding of 1
+        (2**255 - 18).to_bytes(32, "little"),
+        # the top bit is ignored
+        (1 | 1 << 255).to_bytes(32, "little"),
+    ],
+)
+def test_check_x25519_public_key_small_order(public_key):
+    with pytest.raises(ValueError, match="small order"):
+        check_x25519_public_key(public_key)
+
+
+def test_check_public_keys_valid():
+    check_ed25519_public_key(BaseKey.from_multibase(ED25519_MULTIBASE).public_key)
+    check_x25519_public_key(BaseKey.from_multibase(X25519_MULTIBASE).public_key)
+
+
+def test_strict_validation_opt_in():
+    assert strict_key_validation_stats() is None
+    key = Ed25519VerificationKey(ED25519_SMALL_ORDER)
+    assert key.public_key == ED25519_SMALL_ORDER
+
+
+def test_strict_validation(strict_validation):
+    with pytest.raises(ValueError, match="small order"):
+        Ed25519VerificationKey(ED25519_SMALL_ORDER)
+    with pytest.raises(ValueError, match="small order"):
+        X25519KeyAgreementKey(X25519_SMALL_ORDER)
+    with pytest.raises(ValueError, match="expected 32 bytes"):
+        X25519KeyAgreementKey(bytes(31))
+    BaseKey.from_multibase(ED25519_MULTIBASE)
+
+    # the results are memoized per public key
+    with pytest.raises(ValueError, match="small order"):
+        Ed25519VerificationKey(ED25519_SMALL_ORDER)
+    BaseKey.from_multibase(ED25519_MULTIBASE)
+    stats = strict_key_validation_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 3, 3)
+
+
+def test_strict_validation_resolution(strict_validation):
+    multibase = to_multibase(Codec.ED25519.encode_multicodec(ED25519_SMALL_ORDER))
+    with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+        resolve_peer_did("did:peer:0" + multibase)
+    peer_did = create_peer_did_numalgo_0(BaseKey.from_multibase(ED25519_MULTIBASE))
+    assert resolve_peer_did(peer_did).id == peer_did
+
+
+def test_strict_validation_drops_interned_keys():
+    enable_key_interning()
+    try:
+        multibase = to_multibase(Codec.ED25519.encode_multicodec(ED25519_SMALL_ORDER))
+        BaseKey.from_multibase(multibase)
+        enable_strict_key_validation()
+        with pytest.raises(ValueError, match="small order"):
+            BaseKey.from_multibase(multibase)
+    finally:
+        disable_strict_key_validation()
+        disable_key_interning()
+
+
+def test_validate_keys():
+    valid = BaseKey.from_multibase(ED25519_MULTIBASE)
+    invalid = Ed25519VerificationKey(ED25519_SMALL_ORDER)
+    results = validate_keys([valid, invalid, X25519KeyAgreementKey(X25519_SMALL_ORDER)])
+    assert results[0] is None
+    assert "small order" in results[1]
+    assert "small order" in results[2]
+    assert validate_keys([]) == []
+
+
+def test_validate_keys_memoized(strict_validation):
+    key = BaseKey.from_multibase(ED25519_MULTIBASE)
+    assert validate_keys([key, key]) == [None, None]
+    stats = strict_key_validation_stats()
+    assert (stats.hits, stats.misses) == (2, 1)
@@ -0,0 +1,95 @@
+import pytest
+
+from peerdid.core.multibase import (
+    decode_multibase_batch,
+    from_base58,
+    from_multibase,
+    to_base58,
+    to_multibase,
+)
+
+VECTORS = [
+    (b"", ""),
+    (b"\0", "1"),
+    (b"\0\0\x01", "112"),
+    (b"\x39", "z"),
+    (b"Hello World!", "2NEpo7TZRRrLZSi2U"),
+]
+
+
+@pytest.mark.parametrize("raw, encoded", VECTORS)
+def test_base58_vectors(raw, encoded):
+    assert to_base58(raw) == encoded
+    assert from_base58(encoded) == raw
+
+
+def test_base58_round_trip():
+    for size in range(40):
+        for value in (bytes(size), bytes(range(size)), b"\xff" * size):
+            assert from_base58(to_base58(value)) == value
+
+
+def test_base58_round_trip_long():
+    # long enough for the pairwise merge of digit groups
+    for size in (100, 101, 1000, 4099):
+        value = bytes(i * 7 % 256 for i in range(size))
+        assert from_base58(to_base58(value)) == value
+
+
+def test_base58_key():
+    key = from_base58("6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V")
+    assert len(key) == 34
+    assert key[:2] == b"\xed\x01"
+    assert to_base58(key) == "6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+
+
+def test_base58_trailing_whitespace():
+    assert from_base58("2NEpo7TZRRrLZSi2U\n") == b"Hello World!"
+
+
+@pytest.mark.parametrize("value", ["0abc", "abcO", "abcI", "abcl", "ab c", "é"])
+def test_base58_invalid(value):
+    with pytest.raises(ValueError, match="Invalid key: Invalid base58 encoding"):
+        from_base58(value)
+
+
+def test_multibase_round_trip():
+    encoded = to_multibase(b"Hello World!")
+    assert encoded == "z2NEpo7TZRRrLZSi2U"
+    assert from_multibase(encoded) == ("2NEpo7TZRRrLZSi2U", b"Hello World!")
+
+
+def test_decode_multibase_batch():
+    np = pytest.importorskip("numpy")
+    keys = [
+        "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+        "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc",
+        "z6MkqRYqQiSgvZQdnBytw86Qbs0ZWUkGv22od935YF4s8M7V",
+        "a6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+        "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7",
+        "z" + "1" * 47,
+        "z" + "z" * 47,
+    ]
+    decoded, failed = decode_multibase_batch(keys)
+    assert decoded.shape == (len(keys), 34)
+    assert decoded.dtype == np.uint8
+    assert failed.tolist() == [False, False, True, True, True, True, True]
+    for value, row in zip(keys[:2], decoded):
+        assert row.tobytes() == from_multibase(value)[1]
+    assert not decoded[failed].any()
+
+
+def test_decode_multibase_batch_leading_zeros():
+    pytest.importorskip("numpy")
+    values = ["z112", "z11z", "z121", "z2NEp"]
+    decoded, failed = decode_multibase_batch(values, length=3)
+    assert failed.tolist() == [False, False, True, True]
+    assert decoded[0].tobytes() == b"\0\0\x01"
+    assert decoded[1].tobytes() == b"\0\0\x39"
+
+
+def test_decode_multibase_batch_empty():
+    pytest.importorskip("numpy")
+    decoded, failed = decode_multibase_batch([], length=34)
+    assert decoded.shape == (0, 34)
+    assert failed.shape == (0,)
@@ -0,0 +1,87 @@
+import pytest
+
+from peerdid.core.jwk_okp import jwk_to_public_key, public_key_to_jwk
+from peerdid.core.multicodec import (
+    Codec,
+    ExtensionCodec,
+    codec_info,
+    codec_info_for_crv,
+    from_multicodec,
+    register_codec,
+)
+from peerdid.keys import BaseKey, Ed25519VerificationKey, register_key_type
+
+# a third-party key type, in the private use range of multicodec
+TEST_CODEC = ExtensionCodec("TEST", 0x300000)
+register_codec(TEST_CODEC, kty="OKP", crv="Test25519")
+
+
+@register_key_type
+class KeyForTest(BaseKey):
+    __slots__ = ()
+
+    codec = TEST_CODEC
+    key_length = 32
+
+    def verification_method(self, controller, format=None, **extra):
+        raise NotImplementedError
+
+
+def test_codec_prefix():
+    assert Codec.X25519.prefix == b"\xec\x01"
+    assert Codec.ED25519.prefix == b"\xed\x01"
+    assert Codec.ED25519.encode_multicodec(b"key") == b"\xed\x01key"
+
+
+@pytest.mark.parametrize(
+    "value", [b"\xed\x01key", bytearray(b"\xed\x01key"), memoryview(b"\xed\x01key")]
+)
+def test_from_multicodec(value):
+    public_key, codec = from_multicodec(value)
+    assert public_key == b"key"
+    assert type(public_key) is bytes
+    assert codec is Codec.ED25519
+
+
+def test_from_multicodec_unknown_prefix():
+    with pytest.raises(ValueError, match="Unknown multicodec prefix 18"):
+        from_multicodec(b"\x12\x20key")
+
+
+@pytest.mark.parametrize("value", [b"", b"\xed", b"\x80"])
+def test_from_multicodec_invalid_prefix(value):
+    with pytest.raises(ValueError, match="Invalid multicodec prefix"):
+        from_multicodec(value)
+
+
+def test_codec_registry():
+    info = codec_info(Codec.ED25519)
+    assert (info.prefix, info.kty, info.crv) == (b"\xed\x01", "OKP", "Ed25519")
+    assert info.key_type is Ed25519VerificationKey
+    assert codec_info_for_crv("X25519").codec is Codec.X25519
+    with pytest.raises(ValueError):
+        codec_info(ExtensionCodec("UNKNOWN", 0x300001))
+    with pytest.raises(ValueError):
+        codec_info_for_crv("P-384")
+
+
+def test_register_conflicts():
+    with pytest.raises(ValueError, match="prefix"):
+        register_codec(ExtensionCodec("OTHER", Codec.ED25519.value))
+    with pytest.raises(ValueError, match="curve"):
+        register_codec(ExtensionCodec("OTHER", 0x300002), kty="OKP", crv="Ed25519")
+    with pytest.raises(ValueError):
+        register_key_type(type("Unregistered", (KeyForTest,), {"codec": 1}))
+
+
+def test_extension_key_type():
+    public_key = bytes(range(32))
+    key = BaseKey.from_multibase(KeyForTest(public_key).to_multibase())
+    assert type(key) is KeyForTest
+    assert key.public_key == public_key
+    assert from_multicodec(TEST_CODEC.encode_multicodec(b"key")) == (b"key", TEST_CODEC)
+
+    jwk = public_key_to_jwk(public_key, TEST_CODEC)
+    assert jwk["crv"] == "Test25519"
+    assert jwk_to_public_key(jwk) == (public_key, TEST_CODEC)
+    assert BaseKey.from_jwk(key.to_jwk()) == key
@@ -0,0 +1,120 @@
+import pickle
+
+import pytest
+
+from peerdid.dids import (
+    create_peer_did_numalgo_3,
+    is_peer_did,
+    parse_peer_did,
+    resolve_peer_did,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError, UnknownPeerDIDError
+from peerdid.keys import KeyFormat
+from peerdid.store import (
+    DEFAULT_STORE_ENTRIES,
+    InMemoryShortFormStore,
+    get_default_store,
+)
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+UNKNOWN_SHORT_FORM = "did:peer:3zQmS19jtYDvGtKVrJhQnRFpBQAx3pJ9omx2HpNrcXFuRCz9"
+
+
+def test_create_numalgo_3():
+    store = InMemoryShortFormStore()
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    assert short_form.startswith("did:peer:3zQm")
+    assert len(short_form) == 57
+    assert store.get_long_form(short_form) == PEER_DID_NUMALGO_2
+    assert len(store) == 1
+    assert create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store) == short_form
+    assert len(store) == 1
+    assert is_peer_did(short_form)
+    assert parse_peer_did(short_form).numalgo == 3
+
+
+def test_create_numalgo_3_default_store():
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2_NO_SERVICES)
+    assert short_form in get_default_store()
+
+
+@pytest.mark.parametrize(
+    "peer_did", [PEER_DID_NUMALGO_0, UNKNOWN_SHORT_FORM, "did:peer:2"]
+)
+def test_create_numalgo_3_not_numalgo_2(peer_did):
+    with pytest.raises(MalformedPeerDIDError):
+        create_peer_did_numalgo_3(peer_did)
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+def test_resolve_numalgo_3(format):
+    store = InMemoryShortFormStore()
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    did_doc = resolve_peer_did(short_form, format, store=store)
+    long_doc = resolve_peer_did(PEER_DID_NUMALGO_2, format)
+    assert did_doc.id == short_form
+    assert did_doc.also_known_as == [PEER_DID_NUMALGO_2]
+    assert [vm.public_key_multibase for vm in did_doc.verification_method] == [
+        vm.public_key_multibase for vm in long_doc.verification_method
+    ]
+    assert all(vm.controller == short_form for vm in did_doc.verification_method)
+    assert len(did_doc.service) == len(long_doc.service)
+    assert resolve_peer_did_json(short_form, format, store=store) == did_doc.to_json()
+
+
+def test_resolve_numalgo_3_unknown():
+    with pytest.raises(UnknownPeerDIDError) as excinfo:
+        resolve_peer_did(UNKNOWN_SHORT_FORM, store=InMemoryShortFormStore())
+    assert excinfo.value.did == UNKNOWN_SHORT_FORM
+    with pytest.raises(UnknownPeerDIDError):
+        resolve_peer_did_json(UNKNOWN_SHORT_FORM, store=InMemoryShortFormStore())
+    error = pickle.loads(pickle.dumps(excinfo.value))
+    assert error.did == UNKNOWN_SHORT_FORM
+
+
+def test_resolve_numalgo_3_bad_long_form():
+    store = InMemoryShortFormStore()
+    store.set_long_form(UNKNOWN_SHORT_FORM, PEER_DID_NUMALGO_0)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(UNKNOWN_SHORT_FORM, store=store)
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        "did:peer:3",
+        "did:peer:3zQmS19jtYDvGtKVrJhQnRFpBQAx3pJ9omx2HpNrcXFuRCz",
+        "did:peer:3zQmS19jtYDvGtKVrJhQnRFpBQAx3pJ9omx2HpNrcXFuRCz9a",
+        "did:peer:3z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+    ],
+)
+def test_parse_numalgo_3_malformed(peer_did):
+    assert not is_peer_did(peer_did)
+
+
+def test_bounded_store():
+    store = InMemoryShortFormStore(max_entries=1)
+    first = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    second = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2_NO_SERVICES, store=store)
+    assert len(store) == 1
+    assert first not in store
+    assert store.get_long_form(second) == PEER_DID_NUMALGO_2_NO_SERVICES
+    with pytest.raises(UnknownPeerDIDError):
+        resolve_peer_did(first, store=store)
+
+
+def test_default_store_bounded():
+    assert get_default_store()._long_forms.max_entries == DEFAULT_STORE_ENTRIES
+
+
+def test_resolve_mismatched_long_form():
+    store = InMemoryShortFormStore()
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    store.set_long_form(short_form, PEER_DID_NUMALGO_2_NO_SERVICES)
+    with pytest.raises(MalformedPeerDIDError, match="does not match"):
+        resolve_peer_did(short_form, store=store)
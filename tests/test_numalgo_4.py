@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from peerdid import instrumentation
+from peerdid.core.peer_did_helper import decode_document
+from peerdid.dids import (
+    create_peer_did_numalgo_4,
+    is_peer_did,
+    parse_peer_did,
+    peer_did_numalgo_4_short_form,
+    resolve_peer_did,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError, UnknownPeerDIDError
+from peerdid.store import InMemoryShortFormStore
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_4,
+    PEER_DID_NUMALGO_4_SHORT,
+)
+
+
+def input_document() -> dict:
+    return decode_document(PEER_DID_NUMALGO_4.split(":")[3])
+
+
+def test_create_numalgo_4():
+    store = InMemoryShortFormStore()
+    peer_did = create_peer_did_numalgo_4(input_document(), store=store)
+    assert peer_did == PEER_DID_NUMALGO_4
+    assert store.get_long_form(PEER_DID_NUMALGO_4_SHORT) == PEER_DID_NUMALGO_4
+    assert peer_did_numalgo_4_short_form(peer_did) == PEER_DID_NUMALGO_4_SHORT
+    assert peer_did_numalgo_4_short_form(PEER_DID_NUMALGO_4_SHORT) == (
+        PEER_DID_NUMALGO_4_SHORT
+    )
+
+
+@pytest.mark.parametrize("document", [{"id": "did:example:123"}, ["a"], "a"])
+def test_create_numalgo_4_invalid(document):
+    with pytest.raises(ValueError):
+        create_peer_did_numalgo_4(document)
+
+
+def test_parse_numalgo_4():
+    assert is_peer_did(PEER_DID_NUMALGO_4)
+    assert is_peer_did(PEER_DID_NUMALGO_4_SHORT)
+    parsed = parse_peer_did(PEER_DID_NUMALGO_4)
+    assert (parsed.numalgo, parsed.keys) == (4, ())
+    assert parsed.document == PEER_DID_NUMALGO_4.split(":")[3]
+    assert parse_peer_did(PEER_DID_NUMALGO_4_SHORT).document is None
+    assert not is_peer_did(PEER_DID_NUMALGO_4_SHORT + ":")
+    assert not is_peer_did(PEER_DID_NUMALGO_4_SHORT + ":abc")
+    assert not is_peer_did(PEER_DID_NUMALGO_4_SHORT[:-1])
+    with pytest.raises(MalformedPeerDIDError):
+        peer_did_numalgo_4_short_form(PEER_DID_NUMALGO_2)
+
+
+def test_resolve_numalgo_4_long_form():
+    store = InMemoryShortFormStore()
+    did_doc = resolve_peer_did(PEER_DID_NUMALGO_4, store=store)
+    assert did_doc.id == PEER_DID_NUMALGO_4
+    assert did_doc.also_known_as == [PEER_DID_NUMALGO_4_SHORT]
+    assert [vm.id for vm in did_doc.verification_method] == ["#6LSqPZfn", "#6MkrCD1c"]
+    assert all(
+        vm.controller == PEER_DID_NUMALGO_4 for vm in did_doc.verification_method
+    )
+    assert did_doc.service[0].id == "#didcommmessaging-0"
+    assert resolve_peer_did_json(PEER_DID_NUMALGO_4, store=store) == did_doc.to_json()
+    # the verified long form is bound to its short form
+    assert store.get_long_form(PEER_DID_NUMALGO_4_SHORT) == PEER_DID_NUMALGO_4
+
+
+def test_resolve_numalgo_4_short_form():
+    store = InMemoryShortFormStore()
+    with pytest.raises(UnknownPeerDIDError):
+        resolve_peer_did(PEER_DID_NUMALGO_4_SHORT, store=store)
+    resolve_peer_did(PEER_DID_NUMALGO_4, store=store)
+
+    with instrumentation.instrumented() as registry:
+        did_doc = resolve_peer_did(PEER_DID_NUMALGO_4_SHORT, store=store)
+    assert did_doc.id == PEER_DID_NUMALGO_4_SHORT
+    assert did_doc.also_known_as == [PEER_DID_NUMALGO_4]
+    assert did_doc.verification_method[0].controller == PEER_DID_NUMALGO_4_SHORT
+    assert "resolve_peer_did.lookup" in registry.snapshot()
+    assert json.loads(resolve_peer_did_json(PEER_DID_NUMALGO_4_SHORT, store=store)) == (
+        json.loads(did_doc.to_json())
+    )
+
+
+def test_resolve_numalgo_4_hash_mismatch():
+    # same document with a different hash
+    peer_did = PEER_DID_NUMALGO_4.replace("zQmd8", "zQmd9", 1)
+    assert is_peer_did(peer_did)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(peer_did, store=InMemoryShortFormStore())
+
+
+def test_resolve_numalgo_4_bad_binding():
+    store = InMemoryShortFormStore()
+    store.set_long_form(PEER_DID_NUMALGO_4_SHORT, PEER_DID_NUMALGO_2)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(PEER_DID_NUMALGO_4_SHORT, store=store)
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        {"verificationMethod": [{"id": "#1"}]},
+        {"service": "not a list"},
+    ],
+)
+def test_resolve_numalgo_4_invalid_document(document):
+    peer_did = create_peer_did_numalgo_4(document, store=InMemoryShortFormStore())
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(peer_did)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did_json(peer_did)
+
+
+def test_resolve_numalgo_4_copies():
+    store = InMemoryShortFormStore()
+    did_doc = resolve_peer_did(PEER_DID_NUMALGO_4, store=store)
+    did_doc.verification_method.clear()
+    assert len(resolve_peer_did(PEER_DID_NUMALGO_4, store=store).verification_method)
@@ -0,0 +1,129 @@
+import pytest
+
+from peerdid.dids import (
+    KeySegment,
+    ParsedPeerDID,
+    PeerDIDLimits,
+    is_peer_did,
+    parse_peer_did,
+    resolve_peer_did,
+)
+from peerdid.errors import MalformedPeerDIDError
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+
+def test_parse_numalgo_0():
+    parsed = parse_peer_did(PEER_DID_NUMALGO_0)
+    assert isinstance(parsed, ParsedPeerDID)
+    assert parsed.numalgo == 0
+    assert parsed.keys == (
+        KeySegment(
+            None,
+            "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+            (10, len(PEER_DID_NUMALGO_0)),
+        ),
+    )
+    assert parsed.service is None
+
+
+def test_parse_numalgo_2():
+    parsed = parse_peer_did(PEER_DID_NUMALGO_2)
+    assert parsed.numalgo == 2
+    assert [key.purpose for key in parsed.keys] == ["E", "V", "V"]
+    for key in parsed.keys:
+        assert PEER_DID_NUMALGO_2[slice(*key.span)] == key.value
+        assert PEER_DID_NUMALGO_2[key.span[0] - 1] == key.purpose
+    assert parsed.service.startswith("eyJ0IjoiZG0i")
+    assert PEER_DID_NUMALGO_2[slice(*parsed.service_span)] == parsed.service
+
+
+def test_parse_numalgo_2_no_service():
+    parsed = parse_peer_did(PEER_DID_NUMALGO_2_NO_SERVICES)
+    assert len(parsed.keys) == 2
+    assert parsed.service is None
+    assert parsed.service_span is None
+
+
+def test_parse_numalgo_2_empty_service():
+    parsed = parse_peer_did("did:peer:2.Vz6Mk.S")
+    assert parsed.service == ""
+    assert parsed.service_span == (18, 18)
+
+
+def test_parsed_peer_did_hashable():
+    parsed = parse_peer_did(PEER_DID_NUMALGO_2)
+    assert parsed == parse_peer_did(PEER_DID_NUMALGO_2)
+    assert hash(parsed) == hash(parse_peer_did(PEER_DID_NUMALGO_2))
+    assert len({parsed, parse_peer_did(PEER_DID_NUMALGO_2)}) == 1
+
+
+def test_parsed_peer_did_slots():
+    parsed = parse_peer_did(PEER_DID_NUMALGO_0)
+    with pytest.raises(AttributeError):
+        parsed.extra = True
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        None,
+        "",
+        "did:peer:",
+        "did:peer:0",
+        "did:peer:0z",
+        "did:peer:0a6Mk",
+        "did:peer:0z6Mk0",
+        "did:peer:1z6Mk",
+        "did:peer:2",
+        "did:peer:2.",
+        "did:peer:2.Vz6Mk.",
+        "did:peer:2.Sabc",
+        "did:peer:2.Xz6Mk",
+        "did:peer:2.Vz6Mk.Sabc.Vz6Mk",
+        "did:peer:2.Vz6Mk.Sabc.Sabc",
+        "did:peer:2.Vz6Mk.Sab_c",
+        "did:peer:2.Vz6Mk..Vz6Mk",
+        "did:peer:0z6Mk\n",
+        "did:peer:2.Vz6Mk\n",
+    ],
+)
+def test_parse_malformed(peer_did):
+    with pytest.raises(MalformedPeerDIDError, match="Does not match peer DID"):
+        parse_peer_did(peer_did)
+
+
+def test_parse_limits_length():
+    limits = PeerDIDLimits(max_length=40, max_keys=None, max_service_length=None)
+    with pytest.raises(MalformedPeerDIDError, match="maximum length of 40"):
+        parse_peer_did(PEER_DID_NUMALGO_0, limits)
+    assert not is_peer_did(PEER_DID_NUMALGO_0, limits)
+    assert is_peer_did(PEER_DID_NUMALGO_0)
+
+
+def test_parse_limits_keys():
+    limits = PeerDIDLimits(max_length=None, max_keys=2, max_service_length=None)
+    with pytest.raises(MalformedPeerDIDError, match="maximum of 2 keys"):
+        parse_peer_did(PEER_DID_NUMALGO_2, limits)
+    with pytest.raises(MalformedPeerDIDError, match="maximum of 2 keys"):
+        parse_peer_did("did:peer:2" + ".Vz6Mk" * 3, limits)
+    with pytest.raises(MalformedPeerDIDError, match="maximum of 2 keys"):
+        parse_peer_did("did:peer:2" + ".Vz6Mk" * 1000, limits)
+    assert parse_peer_did(PEER_DID_NUMALGO_2_NO_SERVICES, limits)
+
+
+def test_parse_limits_service():
+    limits = PeerDIDLimits(max_length=None, max_keys=None, max_service_length=10)
+    with pytest.raises(MalformedPeerDIDError, match="Service exceeds"):
+        parse_peer_did(PEER_DID_NUMALGO_2, limits)
+    assert parse_peer_did("did:peer:2.Vz6Mk.S0123456789", limits)
+
+
+def test_parse_default_limits():
+    with pytest.raises(MalformedPeerDIDError, match="maximum length"):
+        resolve_peer_did("did:peer:2" + ".Vz6Mk" * 1000)
+    unlimited = PeerDIDLimits(None, None, None)
+    assert is_peer_did("did:peer:2" + ".Vz6Mk" * 1000, unlimited)
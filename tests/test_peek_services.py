@@ -0,0 +1,125 @@
+import pytest
+
+from peerdid.core.peer_did_helper import ServiceEndpoint, service_endpoint
+from peerdid.dids import (
+    PeerDIDLimits,
+    create_peer_did_numalgo_2,
+    create_peer_did_numalgo_3,
+    peek_services,
+    resolve_peer_did,
+)
+from peerdid.errors import MalformedPeerDIDError, UnknownPeerDIDError
+from peerdid.keys import BaseKey
+from peerdid.store import InMemoryShortFormStore
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+    PEER_DID_NUMALGO_4,
+    PEER_DID_NUMALGO_4_SHORT,
+)
+
+X25519_MULTIBASE = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+ED25519_MULTIBASE = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+
+
+def test_peek_services():
+    assert peek_services(PEER_DID_NUMALGO_2) == (
+        ServiceEndpoint(
+            id="#didcommmessaging-0",
+            type="DIDCommMessaging",
+            uri="https://example.com/endpoint",
+            routing_keys=("did:example:somemediator#somekey",),
+            accept=("didcomm/v2", "didcomm/aip2;env=rfc587"),
+        ),
+    )
+    endpoints = peek_services(PEER_DID_NUMALGO_2_2_SERVICES)
+    assert [endpoint.uri for endpoint in endpoints] == [
+        "https://example.com/endpoint",
+        "https://example.com/endpoint2",
+    ]
+    assert endpoints[1].routing_keys == ("did:example:somemediator#somekey2",)
+    assert peek_services(PEER_DID_NUMALGO_2_MINIMAL_SERVICES)[0].routing_keys == ()
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_2_2_SERVICES, PEER_DID_NUMALGO_4],
+)
+def test_peek_services_matches_resolution(peer_did):
+    services = resolve_peer_did(peer_did).service
+    assert peek_services(peer_did) == tuple(
+        service_endpoint(service.serialize()) for service in services
+    )
+
+
+def test_peek_services_none():
+    assert peek_services(PEER_DID_NUMALGO_0) == ()
+    assert peek_services(PEER_DID_NUMALGO_2_NO_SERVICES) == ()
+
+
+def test_peek_services_endpoint_object():
+    peer_did = create_peer_did_numalgo_2(
+        [BaseKey.from_multibase(X25519_MULTIBASE)],
+        [BaseKey.from_multibase(ED25519_MULTIBASE)],
+        {
+            "type": "DIDCommMessaging",
+            "serviceEndpoint": {
+                "uri": "https://example.com/endpoint",
+                "routingKeys": ["did:example:somemediator#somekey"],
+                "accept": ["didcomm/v2"],
+            },
+        },
+    )
+    (endpoint,) = peek_services(peer_did)
+    assert endpoint.uri == "https://example.com/endpoint"
+    assert endpoint.routing_keys == ("did:example:somemediator#somekey",)
+    assert endpoint.accept == ("didcomm/v2",)
+
+
+def test_peek_services_short_forms():
+    store = InMemoryShortFormStore()
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    assert peek_services(short_form, store=store) == peek_services(PEER_DID_NUMALGO_2)
+    with pytest.raises(UnknownPeerDIDError):
+        peek_services(short_form, store=InMemoryShortFormStore())
+
+    peek_services(PEER_DID_NUMALGO_4, store=store)
+    assert peek_services(PEER_DID_NUMALGO_4_SHORT, store=store) == peek_services(
+        PEER_DID_NUMALGO_4
+    )
+
+
+def test_peek_services_skips_keys():
+    # the key segments are not decoded
+    peer_did = (
+        "did:peer:2.Ez1111.Vz1111"
+        + PEER_DID_NUMALGO_2[PEER_DID_NUMALGO_2.rindex(".") :]
+    )
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(peer_did)
+    assert peek_services(peer_did) == peek_services(PEER_DID_NUMALGO_2)
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        "did:peer:2.SeyJ0IjoiZG0iLCJzIjoiaHR0cHM6Ly9leGFtcGxlLmNvbSJ9",
+        PEER_DID_NUMALGO_2 + "_",
+        PEER_DID_NUMALGO_2 + "==",
+        "did:peer:2.Vz6Mkj3PUd1WjvaDhNZhhhXQdz5UnZXmS7ehtx8bsPpD47kKc.Sabc",
+        "did:peer:5.Sabc",
+    ],
+)
+def test_peek_services_malformed(peer_did):
+    with pytest.raises(MalformedPeerDIDError):
+        peek_services(peer_did)
+
+
+def test_peek_services_limits():
+    with pytest.raises(MalformedPeerDIDError, match="maximum length"):
+        peek_services(PEER_DID_NUMALGO_2, limits=PeerDIDLimits(100, None, None))
+    with pytest.raises(MalformedPeerDIDError, match="Service exceeds"):
+        peek_services(PEER_DID_NUMALGO_2, limits=PeerDIDLimits(None, None, 10))
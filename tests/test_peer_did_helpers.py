@@ -3,10 +3,14 @@ import pytest
 from pydid import Service
 
 from peerdid.core.peer_did_helper import (
+    clear_service_caches,
     encode_service,
     decode_service,
+    decode_service_dicts,
     decode_multibase_numbasis,
+    service_cache_stats,
 )
+from peerdid.errors import MalformedPeerDIDError
 from peerdid.keys import (
     Ed25519VerificationKey,
     X25519KeyAgreementKey,
@@ -125,6 +129,46 @@ def test_decode_service_with_multiple_entries_list():
     assert service == expected
 
 
+def test_service_caches():
+    clear_service_caches()
+    service = {
+        "type": "DIDCommMessaging",
+        "serviceEndpoint": "https://example.com/endpoint",
+        "routingKeys": ["did:example:somemediator#somekey"],
+    }
+    encoded = encode_service(service)
+    assert encode_service(dict(service)) == encoded
+    # property order is part of the encoding
+    reordered = dict(reversed(list(service.items())))
+    assert encode_service(reordered) != encoded
+    assert encode_service(reordered) == encode_service(reordered)
+    encode_stats, _ = service_cache_stats()
+    assert (encode_stats.hits, encode_stats.misses) == (3, 2)
+
+    first = decode_service(encoded[2:])
+    first[0].routingKeys.append("did:example:other")
+    second = decode_service(encoded[2:])
+    assert second[0].routingKeys == ["did:example:somemediator#somekey"]
+    assert first[0] is not second[0]
+
+    dicts = decode_service_dicts(encoded[2:])
+    dicts[0].clear()
+    assert decode_service_dicts(encoded[2:])[0]["routingKeys"] == [
+        "did:example:somemediator#somekey"
+    ]
+    _, decode_stats = service_cache_stats()
+    assert (decode_stats.hits, decode_stats.misses, decode_stats.entries) == (3, 1, 1)
+
+
+def test_decode_service_errors_not_cached():
+    clear_service_caches()
+    invalid = encode_service({"serviceEndpoint": "https://example.com"})[2:]
+    for _ in range(2):
+        with pytest.raises(MalformedPeerDIDError):
+            decode_service(invalid)
+    assert service_cache_stats()[1].entries == 0
+
+
 @pytest.mark.parametrize(
     "input_multibase,format,expected",
     [
@@ -0,0 +1,105 @@
+import pytest
+
+from peerdid import DIDDocument
+from peerdid.cache import ResolutionCache
+from peerdid.core.lru import LRUCache
+from peerdid.dids import resolve_peer_did
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_BASE58,
+    DID_DOC_NUMALGO_2_MULTIBASE,
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (3, 1, 1, 2)
+
+
+def test_lru_cache_size_limit():
+    cache = LRUCache(max_entries=10, max_size=10)
+    cache.put("a", 1, size=6)
+    cache.put("b", 2, size=6)
+    assert "a" not in cache
+    assert cache.stats().size == 6
+    cache.put("c", 3, size=11)
+    assert "c" not in cache
+    assert "b" in cache
+
+
+def test_resolution_cache_hit():
+    cache = ResolutionCache()
+    first = cache.resolve(PEER_DID_NUMALGO_2)
+    second = cache.resolve(PEER_DID_NUMALGO_2)
+    assert first == second == DIDDocument.from_json(DID_DOC_NUMALGO_2_MULTIBASE)
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_resolution_cache_keyed_by_format():
+    cache = ResolutionCache()
+    cache.resolve(PEER_DID_NUMALGO_2)
+    did_doc = cache.resolve(PEER_DID_NUMALGO_2, KeyFormat.BASE58)
+    assert did_doc == DIDDocument.from_json(DID_DOC_NUMALGO_2_BASE58)
+    assert cache.stats.entries == 2
+
+
+def test_resolution_cache_isolates_callers():
+    cache = ResolutionCache()
+    first = cache.resolve(PEER_DID_NUMALGO_2)
+    first.verification_method.clear()
+    second = cache.resolve(PEER_DID_NUMALGO_2)
+    second.service.clear()
+    assert cache.resolve(PEER_DID_NUMALGO_2) == resolve_peer_did(PEER_DID_NUMALGO_2)
+
+
+def test_resolution_cache_byte_limit():
+    cache = ResolutionCache(max_bytes=1)
+    cache.resolve(PEER_DID_NUMALGO_0)
+    assert cache.stats.entries == 0
+
+
+def test_resolution_cache_errors_not_cached_by_default():
+    cache = ResolutionCache()
+    with pytest.raises(MalformedPeerDIDError):
+        cache.resolve("did:peer:2.Vz6Mk")
+    assert cache.error_stats is None
+
+
+def test_resolution_cache_negative():
+    cache = ResolutionCache(cache_errors=True)
+    for _ in range(2):
+        with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+            cache.resolve("did:peer:2.Vz6Mk")
+    stats = cache.error_stats
+    assert (stats.hits, stats.entries) == (1, 1)
+
+
+def test_resolution_cache_negative_fresh_errors():
+    cache = ResolutionCache(cache_errors=True)
+    errors = []
+    for _ in range(3):
+        with pytest.raises(MalformedPeerDIDError) as exc_info:
+            cache.resolve("did:peer:2.Vz6Mk")
+        errors.append(exc_info.value)
+    assert errors[1] is not errors[2]
+    assert str(errors[0]) == str(errors[1]) == str(errors[2])
+    assert errors[2].msg == errors[0].msg
+
+
+def test_resolution_cache_invalidate():
+    cache = ResolutionCache()
+    cache.resolve(PEER_DID_NUMALGO_0)
+    cache.invalidate(PEER_DID_NUMALGO_0)
+    assert cache.stats.entries == 0
@@ -0,0 +1,95 @@
+import pytest
+
+from peerdid.dids import (
+    create_peer_did_numalgo_3,
+    resolve_peer_did,
+    resolve_peer_did_formats,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError, UnknownPeerDIDError
+from peerdid.keys import KeyFormat
+from peerdid.store import InMemoryShortFormStore
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+    PEER_DID_NUMALGO_4,
+    PEER_DID_NUMALGO_4_SHORT,
+)
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        PEER_DID_NUMALGO_0,
+        PEER_DID_NUMALGO_2,
+        PEER_DID_NUMALGO_2_2_SERVICES,
+        PEER_DID_NUMALGO_2_NO_SERVICES,
+        PEER_DID_NUMALGO_4,
+    ],
+)
+def test_resolve_formats(peer_did):
+    resolved = resolve_peer_did_formats(peer_did)
+    for format in KeyFormat:
+        expected = resolve_peer_did(peer_did, format)
+        assert resolved.document(format) == expected
+        assert resolved.document_json(format) == resolve_peer_did_json(peer_did, format)
+        assert resolved.document_json(format) == expected.to_json()
+
+
+def test_resolve_formats_default_format():
+    resolved = resolve_peer_did_formats(PEER_DID_NUMALGO_2)
+    assert resolved.document() == resolve_peer_did(PEER_DID_NUMALGO_2)
+    assert resolved.document_json() == resolve_peer_did_json(PEER_DID_NUMALGO_2)
+
+
+def test_resolve_formats_cached_copies():
+    resolved = resolve_peer_did_formats(PEER_DID_NUMALGO_2)
+    document = resolved.document(KeyFormat.JWK)
+    document.verification_method.clear()
+    document.service.append(document.service[0])
+    again = resolved.document(KeyFormat.JWK)
+    assert again == resolve_peer_did(PEER_DID_NUMALGO_2, KeyFormat.JWK)
+    assert again is not resolved.document(KeyFormat.JWK)
+    assert resolved.document_json(KeyFormat.JWK) is resolved.document_json(
+        KeyFormat.JWK
+    )
+
+
+def test_resolve_formats_keys_decoded_once():
+    resolved = resolve_peer_did_formats(PEER_DID_NUMALGO_2)
+    keys = resolved.keys
+    for format in KeyFormat:
+        resolved.document(format)
+        resolved.document_json(format)
+    assert all(a is b for a, b in zip(keys, resolved.keys))
+    # the encodings of each format are cached on the keys
+    assert all(key._base58 and key._jwk for key in keys)
+
+
+def test_resolve_formats_short_forms():
+    store = InMemoryShortFormStore()
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    resolved = resolve_peer_did_formats(short_form, store=store)
+    assert resolved.also_known_as == [PEER_DID_NUMALGO_2]
+    for format in KeyFormat:
+        assert resolved.document(format) == resolve_peer_did(
+            short_form, format, store=store
+        )
+
+    resolve_peer_did_formats(PEER_DID_NUMALGO_4, store=store)
+    resolved = resolve_peer_did_formats(PEER_DID_NUMALGO_4_SHORT, store=store)
+    assert resolved.document_json(KeyFormat.BASE58) == resolve_peer_did_json(
+        PEER_DID_NUMALGO_4_SHORT, store=store
+    )
+
+
+def test_resolve_formats_errors():
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did_formats("did:peer:2.Ez6LSbysY2")
+    with pytest.raises(UnknownPeerDIDError):
+        resolve_peer_did_formats(
+            "did:peer:3zQmS19jtYDvGtKVrJhQnRFpBQAx3pJ9omx2HpNrcXFuRCz9",
+            store=InMemoryShortFormStore(),
+        )
@@ -0,0 +1,79 @@
+import pytest
+
+from peerdid.dids import (
+    create_peer_did_numalgo_2,
+    resolve_peer_did,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import Ed25519VerificationKey, KeyFormat, X25519KeyAgreementKey
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        PEER_DID_NUMALGO_0,
+        PEER_DID_NUMALGO_2,
+        PEER_DID_NUMALGO_2_2_SERVICES,
+        PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+        PEER_DID_NUMALGO_2_NO_SERVICES,
+    ],
+)
+def test_resolve_peer_did_json(peer_did, format):
+    assert (
+        resolve_peer_did_json(peer_did, format)
+        == resolve_peer_did(peer_did, format).to_json()
+    )
+
+
+def test_resolve_peer_did_json_service_extras():
+    peer_did = create_peer_did_numalgo_2(
+        encryption_keys=[
+            X25519KeyAgreementKey.from_base58(
+                "DmgBSHMqaZiYqwNMEJJuxWzsGGC8jUYADrfSdBrC6L8s"
+            )
+        ],
+        signing_keys=[
+            Ed25519VerificationKey.from_base58(
+                "ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7"
+            )
+        ],
+        service=[
+            {
+                "type": "DIDCommMessaging",
+                "serviceEndpoint": {"uri": "https://example.com", "accept": None},
+                "routingKeys": ["did:example:somemediator#somekey"],
+                "accept": ["didcomm/v2"],
+                "priority": 1,
+                "label": "é",
+                "empty": None,
+                "z": [1.5, True],
+            },
+            {"type": "other", "serviceEndpoint": ["did:example:123"]},
+        ],
+    )
+    assert resolve_peer_did_json(peer_did) == resolve_peer_did(peer_did).to_json()
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        "did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+        "did:peer:0z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7",
+        "did:peer:2.Ez6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+        "did:peer:2.Vz6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V.Sinvalid",
+        "did:peer:2.Vz6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+        ".SeyJ0IjoiZG0ifQ",
+    ],
+)
+def test_resolve_peer_did_json_malformed(peer_did):
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did_json(peer_did)
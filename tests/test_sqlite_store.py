@@ -0,0 +1,107 @@
+import pytest
+
+from peerdid.dids import (
+    create_peer_did_numalgo_3,
+    peer_did_short_form,
+    resolve_peer_did,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError, UnknownPeerDIDError
+from peerdid.sqlite_store import PeerDIDStore
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+    PEER_DID_NUMALGO_4,
+    PEER_DID_NUMALGO_4_SHORT,
+)
+
+SHARED_KEY = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+
+
+@pytest.fixture
+def store():
+    with PeerDIDStore(":memory:", batch_size=2) as store:
+        yield store
+
+
+def test_add_and_get(store):
+    store.add(PEER_DID_NUMALGO_2)
+    assert PEER_DID_NUMALGO_2 in store
+    assert len(store) == 1
+    assert store.get_document_json(PEER_DID_NUMALGO_2) == resolve_peer_did_json(
+        PEER_DID_NUMALGO_2
+    )
+    assert store.get_document(PEER_DID_NUMALGO_2) == resolve_peer_did(
+        PEER_DID_NUMALGO_2
+    )
+    assert store.get_document(PEER_DID_NUMALGO_0) is None
+    store.remove(PEER_DID_NUMALGO_2)
+    assert PEER_DID_NUMALGO_2 not in store
+    assert store.find_by_key(SHARED_KEY) == []
+
+
+def test_add_many_and_lookups(store):
+    peer_dids = [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_2_NO_SERVICES]
+    store.add_many(peer_dids[:2] + [(peer_dids[2], "{}"), PEER_DID_NUMALGO_4])
+    assert len(store) == 4
+    assert store.get_documents_json(peer_dids + ["did:peer:0z6Mkother"]) == {
+        PEER_DID_NUMALGO_0: resolve_peer_did_json(PEER_DID_NUMALGO_0),
+        PEER_DID_NUMALGO_2: resolve_peer_did_json(PEER_DID_NUMALGO_2),
+        PEER_DID_NUMALGO_2_NO_SERVICES: "{}",
+    }
+    assert sorted(store.find_by_key(SHARED_KEY)) == sorted(peer_dids)
+    found = store.find_by_keys(
+        [SHARED_KEY, "z6LSqPZfn9krvgXma2icTMKf2uVcYhKXsudCmPoUzqGYW24U", "z6Mkother"]
+    )
+    assert sorted(found[SHARED_KEY]) == sorted(peer_dids)
+    assert found["z6LSqPZfn9krvgXma2icTMKf2uVcYhKXsudCmPoUzqGYW24U"] == [
+        PEER_DID_NUMALGO_4
+    ]
+    assert "z6Mkother" not in found
+
+
+def test_replace(store):
+    store.add(PEER_DID_NUMALGO_2, "{}")
+    store.add(PEER_DID_NUMALGO_2)
+    assert len(store) == 1
+    assert store.get_document_json(PEER_DID_NUMALGO_2) != "{}"
+    assert store.find_by_key(SHARED_KEY) == [PEER_DID_NUMALGO_2]
+
+
+@pytest.mark.parametrize("peer_did", [PEER_DID_NUMALGO_4_SHORT, "did:peer:1z"])
+def test_add_invalid(store, peer_did):
+    with pytest.raises((ValueError, MalformedPeerDIDError)):
+        store.add(peer_did)
+    assert len(store) == 0
+
+
+def test_short_forms(store):
+    short_form = create_peer_did_numalgo_3(PEER_DID_NUMALGO_2, store=store)
+    assert PEER_DID_NUMALGO_2 in store
+    assert store.get_long_form(short_form) == PEER_DID_NUMALGO_2
+    assert resolve_peer_did(short_form, store=store).also_known_as == [
+        PEER_DID_NUMALGO_2
+    ]
+    with pytest.raises(UnknownPeerDIDError):
+        resolve_peer_did(PEER_DID_NUMALGO_4_SHORT, store=store)
+    resolve_peer_did(PEER_DID_NUMALGO_4, store=store)
+    assert store.get_long_forms([PEER_DID_NUMALGO_4_SHORT, short_form, "x"]) == [
+        PEER_DID_NUMALGO_4,
+        PEER_DID_NUMALGO_2,
+        None,
+    ]
+    with pytest.raises(ValueError):
+        store.set_long_form(short_form, PEER_DID_NUMALGO_2_NO_SERVICES)
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "peer_dids.db")
+    with PeerDIDStore(path) as store:
+        store.add_many([PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_4])
+    with PeerDIDStore(path) as store:
+        assert len(store) == 2
+        assert store.get_long_form(peer_did_short_form(PEER_DID_NUMALGO_2)) == (
+            PEER_DID_NUMALGO_2
+        )
+        assert store.find_by_key(SHARED_KEY) == [PEER_DID_NUMALGO_2]